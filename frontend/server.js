@@ -3,22 +3,43 @@ const axios = require('axios');
 const app = express();
 const port = 3000;
 
+// ✅ Where the simulation listens (Flask API, and the push stream next to it)
+const backendUrl = process.env.BACKEND_URL || 'http://127.0.0.1:5000';
+const streamUrl = process.env.STREAM_URL || 'http://127.0.0.1:5001';
+
 app.use(express.static('public'));
 
 // ✅ Existing getstate (no changes needed)
 app.get('/api/getstate', async (req, res) => {
     try {
-        const response = await axios.get('http://127.0.0.1:5000/getstate?x=0&y=0');
+        const response = await axios.get(`${backendUrl}/getstate`);
         res.json(response.data);
     } catch (error) {
         res.status(500).json({ error: 'Failed to fetch state from backend' });
     }
 });
 
+// ✅ Push stream: Server-Sent Events piped through from the simulation
+app.get('/api/stream', async (req, res) => {
+    try {
+        const response = await axios.get(`${streamUrl}/stream`, { params: req.query, responseType: 'stream' });
+        res.set({
+            'Content-Type': 'text/event-stream',
+            'Cache-Control': 'no-cache',
+            'Connection': 'keep-alive'
+        });
+        res.flushHeaders();
+        response.data.pipe(res);
+        req.on('close', () => response.data.destroy());
+    } catch (error) {
+        res.status(500).json({ error: 'Failed to open stream from backend' });
+    }
+});
+
 // ✅ UPDATED getSprites proxy endpoint
 app.get('/api/getsprites', async (req, res) => {
     try {
-        const response = await axios.get('http://127.0.0.1:5000/getsprites');
+        const response = await axios.get(`${backendUrl}/getsprites`, { params: req.query });
         res.json(response.data);
     } catch (error) {
         res.status(500).json({ error: 'Failed to fetch sprites from backend' });
@@ -28,7 +49,7 @@ app.get('/api/getsprites', async (req, res) => {
 // ✅ UPDATED getSprites proxy endpoint
 app.get('/api/getforces', async (req, res) => {
     try {
-        const response = await axios.get('http://127.0.0.1:5000/getforces');
+        const response = await axios.get(`${backendUrl}/getforces`);
         res.json(response.data);
     } catch (error) {
         res.status(500).json({ error: 'Failed to fetch sprites from backend' });
@@ -1,118 +1,431 @@
-from flask import Blueprint, jsonify, request, render_template
+from flask import Blueprint, Response, jsonify, request, render_template
 import uuid
 import os
+import time
 
 
 from simulation.simulation.world import world
+from simulation.simulation import wire
+from simulation.api.responses import EncodedResponse, cached, encode_json, encode_binary, send, immutable
 
 api_bp = Blueprint('api', __name__)
 
 
+def requested_cell():
+    """
+    The (x, y) of the cell named by ?x=&y=, or None when neither is given
+    (whole world). Raises IndexError for a cell outside the grid.
+    """
+    x = request.args.get('x', default=None, type=int)
+    y = request.args.get('y', default=None, type=int)
+
+    if x is None and y is None:
+        return None
+
+    x = x or 0
+    y = y or 0
+    if not (0 <= x < world.grid_cells and 0 <= y < world.grid_cells):
+        raise IndexError(f"Cell ({x}, {y}) not found")
+
+    return (x, y)
+
+
+def requested_viewport():
+    """
+    The Viewport named by ?rect=x0,y0,x1,y1 (world pixels, wrapping at the
+    edges), grown by config.VIEWPORT_MARGIN, or None when it isn't given.
+    Raises ValueError for a malformed rect, or one given alongside ?x=&y=.
+    """
+    import simulation.config as config
+    from simulation.simulation.viewport import Viewport
+
+    rect = request.args.get('rect')
+    if rect is None:
+        return None
+    if 'x' in request.args or 'y' in request.args:
+        raise ValueError("Give either a cell (x, y) or a rect, not both")
+
+    return Viewport.parse(rect, config.VIEWPORT_MARGIN)
+
+
+FORMATS = ("json", "columnar")
+
+
+def wants_binary():
+    """Whether the client prefers the binary wire format (Accept: application/octet-stream) to JSON."""
+    return request.accept_mimetypes.best_match(["application/json", wire.MIMETYPE]) == wire.MIMETYPE
+
+
+def requested_format():
+    """
+    "binary" when the client asks for it (wants_binary), otherwise ?format=:
+    "json" (a dict per creature, the default) or "columnar" (parallel arrays).
+    Raises ValueError for any other format.
+    """
+    if wants_binary():
+        return "binary"
+
+    fmt = request.args.get('format', default="json")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt}")
+    return fmt
+
+
+def published_snapshot(need_block=True):
+    """
+    The last frame the simulation published, or None before the first one
+    (or, with need_block, until the first delta block is built).
+    """
+    snapshot = world.published  # ✅ one read of an immutable object: no locks from here on
+    if snapshot is None or (need_block and snapshot.built_index is None):
+        return None
+    return snapshot
+
+
+def sprite_layouts(sprite_ids):
+    """{sprite_id: layout} for the given ids."""
+    from simulation.simulation.sprites import sprites
+
+    return {sprite_id: layout for sprite_id, layout in sprites.layouts_for(sprite_ids).items() if layout}
+
+
+def respond(snapshot, name, key, build, fmt="json"):
+    """Serve build() for this frame, encoded once per (endpoint, cell, format) and shared by every client."""
+    return send(cached(snapshot.cache, (name, key, fmt), build, encode_binary if fmt == "binary" else encode_json))
+
+
+def pending():
+    return jsonify({
+        "status": "pending",
+        "message": "Delta buffer not available yet. Please try again shortly."
+    })
+
+
 
 @api_bp.route('/viewer')
 def viewer_page():
     """Render the canvas viewer with live creature/food state injected."""
-    from simulation.simulation.creatures import Creature
+    from simulation.simulation.sprites import sprites
 
-    cell = world.cell_grid[0][0]
+    snapshot = world.published
+    state = snapshot.live_state() if snapshot is not None else {"creatures": [], "food": []}
 
-    with cell.lock:
-        creatures = [c.to_dict() for c in cell.creatures]
-        food = [f.to_dict() for f in cell.food]
-
-    return render_template("viewer.html", sprites=Creature.sprite_map, creatures=creatures, food=food)
+    return render_template("viewer.html", sprites=sprites.all(), creatures=state["creatures"], food=state["food"])
 
 
 
 @api_bp.route('/getfull', methods=['GET'])
 def get_full_state():
-    x = request.args.get('x', default=0, type=int)
-    y = request.args.get('y', default=0, type=int)
-
-    if world.get_built_index() is None:
-        return jsonify({
-            "status": "pending",
-            "message": "Delta buffer not available yet. Please try again shortly."
-        })
+    snapshot = published_snapshot()
+    if snapshot is None:
+        return pending()
 
     try:
-        cell = world.cell_grid[y][x]
+        key = requested_cell()
+        fmt = requested_format()
     except IndexError:
         return jsonify({'status': 'error', 'message': 'Cell not found'}), 404
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+    cache_key = ("getfull", key, fmt)
+    entry = snapshot.cache.get(cache_key)
+    if entry is None:
+        # ✅ Same block and same sprites as an earlier frame: reuse its bytes instead of encoding again
+        used_sprite_ids = snapshot.used_sprite_ids(key)
+        held = snapshot.block.cache.get(cache_key)
+        if held is not None and held[0] == used_sprite_ids:
+            entry = held[1]
+        else:
+            # Filter and include only relevant sprite layouts
+            sprite_data = sprite_layouts(used_sprite_ids)
+            if fmt == "binary":
+                entry = encode_binary(full_message(snapshot.block, key, sprite_data))
+            else:
+                full = snapshot.full(key) if fmt == "json" else snapshot.block.full_columns(key)
+                entry = encode_json({**full, "sprites": sprite_data})
+            snapshot.block.cache[cache_key] = (used_sprite_ids, entry)
+        snapshot.cache[cache_key] = entry
 
-    with cell.lock:
-        state_data = cell.get_full()
-        used_sprite_ids = cell.get_used_sprite_ids()
+    return send(entry)
 
-        # Filter and include only relevant sprite layouts
-        import simulation.simulation.creatures as creature_mod
-        sprite_data = {}
-        with creature_mod.Creature.sprite_lock:
-            for sprite_id in used_sprite_ids:
-                value = creature_mod.Creature.sprite_map.get(sprite_id)
-                if value is not None:
-                    layout = value.get("layout") if isinstance(value, dict) else value
-                    if layout:
-                        sprite_data[sprite_id] = layout
 
-        state_data["sprites"] = sprite_data
-        return jsonify(state_data)
+def full_message(block, key, sprite_data):
+    """/getfull in the binary format: the block's starting state, its deltas and the sprites."""
+    frame = block.buffers[key]["frame"] if key is not None else block.frame
+    return wire.message(
+        frame,
+        wire.state_section(frame, *block.columns(key)),
+        wire.deltas_section(block.record_ranges(key), frame, migrations=key is not None),
+        wire.sprites_section(sprite_data)
+    )
 
     
 @api_bp.route('/getstate', methods=['GET'])
 def get_state():
+    snapshot = published_snapshot(need_block=False)
+    if snapshot is None:
+        return pending()
 
+    try:
+        key = requested_cell()
+        fmt = requested_format()
+        viewport = requested_viewport()
+    except IndexError:
+        return jsonify({'status': 'error', 'message': 'Cell not found'}), 404
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
 
-    x = request.args.get('x', default=0, type=int)
-    y = request.args.get('y', default=0, type=int)
+    if viewport is not None:
+        return respond(snapshot, "getstate", viewport.key, lambda: state_body(snapshot.frame, *snapshot.view(viewport), fmt), fmt)
 
-    if world.get_built_index() is None:
-        return jsonify({ "status": "pending", "message": "Delta buffer not available yet. Please try again shortly." })
+    if fmt == "binary":
+        return respond(snapshot, "getstate", key, lambda: wire.message(
+            snapshot.frame, wire.state_section(snapshot.frame, *snapshot.columns(key))
+        ), fmt)
+    if fmt == "columnar":
+        return respond(snapshot, "getstate", key, lambda: snapshot.live_columnar(key), fmt)
 
-    try:
-        cell = world.cell_grid[y][x]
+    return respond(snapshot, "getstate", key, lambda: snapshot.live_state(key))
 
-    except IndexError:
-        return jsonify({'status': 'error', 'message': 'Cell not found'}), 404
 
-    with cell.lock:
-        return jsonify(cell.get_live_state())
+def state_body(frame, creatures, food, fmt):
+    """A state (CreatureColumns, food positions) in the requested format."""
+    from simulation.simulation.snapshot import format_columns
+
+    if fmt == "binary":
+        return wire.message(frame, wire.state_section(frame, creatures, food))
+    if fmt == "columnar":
+        return format_columns(creatures, food)
+    return {"creatures": creatures.rows(), "food": food.tolist()}
 
 @api_bp.route('/getdeltas', methods=['GET'])
 def get_deltas():
-    x = request.args.get('x', default=0, type=int)
-    y = request.args.get('y', default=0, type=int)
-
-    if world.get_built_index() is None:
-        return jsonify({ "status": "pending", "message": "Delta buffer not available yet. Please try again shortly." })
+    """
+    Without since: the last finished delta block. With since=FRAME (the
+    "frame" of the client's last response): every delta from that frame on,
+    or, when FRAME is no longer in the history, the latest keyframe and
+    every delta after it. JSON, or the binary wire format if the client
+    asks for it (see wire.py). With rect=x0,y0,x1,y1 only what that
+    viewport sees (see viewport.py).
+    """
+    since = request.args.get('since', default=None, type=int)
+
+    snapshot = published_snapshot(need_block=since is None)
+    if snapshot is None:
+        return pending()
 
     try:
-        cell = world.cell_grid[y][x]
+        key = requested_cell()
+        viewport = requested_viewport()
     except IndexError:
         return jsonify({'status': 'error', 'message': 'Cell not found'}), 404
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
 
-    with cell.lock:
-        return jsonify({
-            "frame": world.get_frame(),
-            "deltas": cell.get_deltas(),
-        })
+    if viewport is not None:
+        return view_deltas(snapshot, since, viewport)
 
-@api_bp.route('/getsprites', methods=['GET'])
-def get_sprites():
-    import simulation.simulation.creatures as creature_mod
+    if wants_binary():
+        if since is not None:
+            return respond(snapshot, ("getdeltas", since), key, lambda: deltas_since_message(snapshot, since, key), "binary")
+
+        block = snapshot.block
+        return respond(snapshot, "getdeltas", key, lambda: wire.message(
+            snapshot.frame, wire.deltas_section(block.record_ranges(key), block.frame, migrations=key is not None)
+        ), "binary")
+
+    if since is not None:
+        return respond(snapshot, ("getdeltas", since), key, lambda: deltas_since(snapshot, since, key))
+
+    return respond(snapshot, "getdeltas", key, lambda: {
+        "frame": snapshot.frame,
+        "deltas": {"frame": snapshot.block.frame, "deltas": snapshot.deltas(key)},
+    })
 
-    sprite_data = {}
-    with creature_mod.Creature.sprite_lock:
-        for sprite_id, value in creature_mod.Creature.sprite_map.items():
-            layout = value.get("layout") if isinstance(value, dict) else value
-            sprite_data[sprite_id] = layout
 
-    return jsonify(sprite_data)
+def deltas_since(snapshot, since, key):
+    deltas = snapshot.deltas_since(since, key)
+    if deltas is not None:
+        return {"frame": snapshot.frame, "since": since, "deltas": deltas}
+
+    # ✅ Cursor too old (or from the future): start the client over from the latest keyframe
+    keyframe = snapshot.keyframe
+    return {
+        "frame": snapshot.frame,
+        "since": since,
+        "keyframe": {"frame": keyframe.frame, "state": keyframe.state(key)},
+        "deltas": snapshot.deltas_since(keyframe.frame, key),
+        "sprites": sprite_layouts(snapshot.used_sprite_ids(key))
+    }
+
+
+def deltas_since_message(snapshot, since, key):
+    """deltas_since() in the binary format."""
+    migrations = key is not None
+
+    ranges = snapshot.ranges_since(since, key)
+    if ranges is not None:
+        return wire.message(snapshot.frame, wire.since_section(since), wire.deltas_section(ranges, since, migrations))
+
+    keyframe = snapshot.keyframe
+    return wire.message(
+        snapshot.frame,
+        wire.since_section(since),
+        wire.state_section(keyframe.frame, *keyframe.columns(key)),
+        wire.deltas_section(snapshot.ranges_since(keyframe.frame, key), keyframe.frame, migrations),
+        wire.sprites_section(sprite_layouts(snapshot.used_sprite_ids(key)))
+    )
+
+
+def view_deltas(snapshot, since, viewport):
+    """/getdeltas for a viewport: the same answers, with only the records it sees."""
+    fmt = "binary" if wants_binary() else "json"
+    name = ("getdeltas", since) if since is not None else "getdeltas"
+
+    if since is None:
+        block = snapshot.block
+        if fmt == "binary":
+            build = lambda: wire.message(snapshot.frame, wire.deltas_section(snapshot.view_ranges(viewport), block.frame))
+        else:
+            build = lambda: {"frame": snapshot.frame, "deltas": {"frame": block.frame, "deltas": snapshot.view_deltas(viewport)}}
+        return respond(snapshot, name, viewport.key, build, fmt)
+
+    if fmt == "binary":
+        return respond(snapshot, name, viewport.key, lambda: view_deltas_since_message(snapshot, since, viewport), fmt)
+
+    return respond(snapshot, name, viewport.key, lambda: view_deltas_since(snapshot, since, viewport))
+
+
+def view_deltas_since(snapshot, since, viewport):
+    """deltas_since() for a viewport."""
+    deltas = snapshot.view_deltas(viewport, since)
+    if deltas is not None:
+        return {"frame": snapshot.frame, "since": since, "deltas": deltas}
+
+    keyframe = snapshot.keyframe
+    return {
+        "frame": snapshot.frame,
+        "since": since,
+        "keyframe": {"frame": keyframe.frame, "state": state_body(keyframe.frame, *keyframe.view(viewport), "json")},
+        "deltas": snapshot.view_deltas(viewport, keyframe.frame),
+        "sprites": sprite_layouts(snapshot.view_sprite_ids(viewport))
+    }
+
+
+def view_deltas_since_message(snapshot, since, viewport):
+    """view_deltas_since() in the binary format."""
+    selected = snapshot.view_ranges(viewport, since)
+    if selected is not None:
+        return wire.message(snapshot.frame, wire.since_section(since), wire.deltas_section(selected, since))
+
+    keyframe = snapshot.keyframe
+    return wire.message(
+        snapshot.frame,
+        wire.since_section(since),
+        wire.state_section(keyframe.frame, *keyframe.view(viewport)),
+        wire.deltas_section(snapshot.view_ranges(viewport, keyframe.frame), keyframe.frame),
+        wire.sprites_section(sprite_layouts(snapshot.view_sprite_ids(viewport)))
+    )
+
+@api_bp.route('/getsprites', methods=['GET'])
+def get_sprites():
+    """
+    Every {sprite_id: layout}. With since_version=V (the "version" of the
+    client's last response): only the layouts added since V, and the ids
+    evicted since; "reset" means V was too old or from before a restart, and
+    "sprites" is everything.
+    """
+    from simulation.simulation.sprites import sprites
+
+    since_version = request.args.get('since_version', default=None)
+    if since_version is None:
+        return jsonify(sprites.all())
+
+    version, added, evicted, reset = sprites.changes_since(since_version)
+    body = {"version": version, "sprites": added, "evicted": evicted}
+    if reset:
+        body["reset"] = True
+    return jsonify(body)
+
+def send_sprite(sprite_id, entry):
+    """
+    A sprite's response. Sprite ids are hashes of their layout, so the answer
+    never changes and is cached for good, unless the id was handed out in a
+    hash clash (SpriteRegistry.clashed): then it is revalidated like the rest.
+    """
+    from simulation.simulation.sprites import sprites
+
+    if sprites.is_clashed(sprite_id):
+        return send(entry)
+    return immutable(Response(entry.body, mimetype=entry.mimetype))
+
+@api_bp.route('/sprite/<int:sprite_id>', methods=['GET'])
+def get_sprite(sprite_id):
+    """One layout (see send_sprite for how long it may be cached)."""
+    from simulation.simulation.sprites import sprites
+
+    layout = sprites.get(sprite_id)
+    if layout is None:
+        return jsonify({'status': 'error', 'message': 'Sprite not found'}), 404
+
+    return send_sprite(sprite_id, encode_json({"id": sprite_id, "layout": layout}))
+
+@api_bp.route('/sprite/<int:sprite_id>.svg', methods=['GET'])
+def get_sprite_svg(sprite_id):
+    """One layout drawn as SVG, cached like /sprite/<id>."""
+    import simulation.config as config
+    from simulation.simulation.sprites import sprites, render_svg
+
+    layout = sprites.get(sprite_id)
+    if layout is None:
+        return jsonify({'status': 'error', 'message': 'Sprite not found'}), 404
+
+    return send_sprite(sprite_id, EncodedResponse(render_svg(layout, config.BODY_RADIUS).encode(), mimetype="image/svg+xml"))
+
+@api_bp.route('/getstats', methods=['GET'])
+def get_stats():
+    """Scheduler timing: measured FPS, frame time, frame lateness and dropped frames."""
+    from simulation.simulation.simulation import scheduler
+    from simulation.api import stream
+
+    stats = scheduler.stats()
+    stats["frame"] = world.get_frame()
+    if stream.stream_server is not None:
+        stats["stream"] = {"subscribers": len(stream.stream_server.subscribers), "dropped": stream.stream_server.dropped}
+    return jsonify(stats)
+
+@api_bp.route('/control', methods=['POST'])
+def control():
+    """Pause, resume, single-step or unthrottle the simulation. Disabled unless config.ALLOW_CONTROL."""
+    import simulation.config as config
+    from simulation.simulation.simulation import scheduler
+
+    if not config.ALLOW_CONTROL:
+        return jsonify({'status': 'error', 'message': 'Control is disabled'}), 403
+
+    action = request.args.get('action', default="")
+
+    if action == "pause":
+        scheduler.pause()
+    elif action == "resume":
+        scheduler.resume()
+    elif action == "step":
+        scheduler.step(request.args.get('frames', default=1, type=int))
+    elif action == "unthrottle":
+        scheduler.set_unthrottled(True)
+    elif action == "throttle":
+        scheduler.set_unthrottled(False)
+    else:
+        return jsonify({'status': 'error', 'message': f'Unknown action: {action}'}), 400
+
+    return jsonify(scheduler.stats())
 
 @api_bp.route('/getforces', methods=['GET'])
 def get_forces():
-    """Get all forces applied to creatures in the last frame."""
-    
+    """Forces applied to creatures, recorded only while creatures.DEBUG is on (and not in worker processes)."""
+    from simulation.simulation.creatures import Creature
+
     with Creature.creatures_lock:
         return jsonify({
             "forces": Creature.force_log  # ✅ Returns all forces recorded for the last frame
@@ -120,54 +433,97 @@ def get_forces():
 
 @api_bp.route('/getcreatures', methods=['GET'])
 def get_creatures():
-    """Return organ data and names for creatures."""
-    creature_ids = request.args.getlist('id')
+    """Names and organs of the creatures in the last published frame (every one, or those given as ?id=)."""
+    from simulation.simulation.sprites import sprites, layout_organs
 
-    with Creature.creatures_lock:
-        if creature_ids:
-            models = [{'id': c.id, 'name': c.name, 'organs': [o.to_dict() for o in c.organs]} for c in Creature.creatures if str(c.id) in creature_ids]
-        else:
-            models = [{'id': c.id, 'name': c.name, 'organs': [o.to_dict() for o in c.organs]} for c in Creature.creatures]
+    snapshot = published_snapshot(need_block=False)
+    if snapshot is None:
+        return pending()
+
+    creatures, _ = snapshot.columns()
+    creature_ids = set(request.args.getlist('id'))
+    layouts = sprites.layouts_for(set(creatures.sprite_ids.tolist()))
+
+    models = [
+        {'id': creature_id, 'name': name, 'organs': layout_organs(layouts[sprite_id]) if layouts.get(sprite_id) else []}
+        for creature_id, name, sprite_id in zip(creatures.ids.tolist(), creatures.names, creatures.sprite_ids.tolist())
+        if not creature_ids or str(creature_id) in creature_ids
+    ]
 
     return jsonify(models)
 
 
 
+def upload_spec(data):
+    """Creature() arguments from one /uploadcreature body."""
+    return {
+        "position": data.get("position", None),  # optional
+        "organs": data.get("organs", []),
+        "name": data.get("name", None),
+        "creator": data.get("creator", None)
+    }
+
+
+def upload_result(future, deadline):
+    """(body, status) for one queued upload, waiting until deadline for the simulation to create it."""
+    from concurrent.futures import TimeoutError
+
+    try:
+        created = future.result(timeout=max(0, deadline - time.monotonic()))
+    except TimeoutError:
+        # ✅ Still queued (e.g. the simulation is paused): it will be created on a later tick
+        return {"message": "Creature queued"}, 202
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    except Exception as e:
+        return {"error": str(e)}, 500
+
+    return {"message": "✅ Creature created", **created}, 200
+
+
 @api_bp.route('/uploadcreature', methods=['POST'])
 def upload_creature():
+    import simulation.config as config
 
-    import simulation.simulation.creatures as creature_mod
-
-    cell = world.cell_grid[0][0]
     data = request.get_json()
 
-    print("Received creature:", data)
+    if config.PRINT: print("Received creature:", data)
 
-    position = data.get("position", None)  # optional
-    organs = data.get("organs", [])
-    name = data.get("name", None)
-    creator = data.get("creator", None)
+    # ✅ The creature is built on the simulation thread when it drains the queue
+    future, = world.commands.push_many("upload", [upload_spec(data)])
+
+    body, status = upload_result(future, time.monotonic() + config.UPLOAD_TIMEOUT)
+    return jsonify(body), status
+
+
+@api_bp.route('/uploadcreatures', methods=['POST'])
+def upload_creatures():
+    """Bulk upload: a JSON list of /uploadcreature bodies (or {"creatures": [...]}), queued together."""
+    import simulation.config as config
+
+    data = request.get_json()
+    if isinstance(data, dict):
+        data = data.get("creatures")
+
+    if not isinstance(data, list):
+        return jsonify({"error": "Expected a list of creatures"}), 400
+    if len(data) > config.MAX_UPLOAD_BATCH:
+        return jsonify({"error": f"At most {config.MAX_UPLOAD_BATCH} creatures per upload"}), 413
 
     try:
-        new_creature = creature_mod.Creature(
-            position=position,  # may be None
-            organs=organs,
-            name=name,
-            creator=creator
-        )
-
-        with cell.lock:
-            if new_creature.isAlive:
-                cell.add(new_creature)
-            else:
-                return jsonify({"error": "Creature creation failed (invalid organs or dead)"}), 400
+        specs = [upload_spec(item) for item in data]
+    except AttributeError:
+        return jsonify({"error": "Every creature must be an object"}), 400
 
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    futures = world.commands.push_many("upload", specs)
+
+    deadline = time.monotonic() + config.UPLOAD_TIMEOUT
+    results = []
+    for future in futures:
+        body, status = upload_result(future, deadline)
+        results.append({**body, "status": status})
 
     return jsonify({
-        "message": "✅ Creature created",
-        "creature_id": new_creature.id,
-        "position": new_creature.position,
-        "organs": [o.to_dict() for o in new_creature.organs]
+        "created": sum(1 for r in results if r["status"] == 200),
+        "results": results
     })
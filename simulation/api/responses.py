@@ -0,0 +1,79 @@
+"""
+Encoded responses, shared by every client that asks for the same thing.
+
+A response body only depends on the snapshot it was read from, the cell and
+the format (JSON, columnar JSON, or the binary wire.py format), so it is encoded (and gzipped) once and kept on that snapshot:
+FrameSnapshot.cache for anything that changes every frame, BlockSnapshot.cache
+for anything that only changes when the delta buffers swap. Every later
+request for it is a dictionary lookup. The ETag is a hash of the body, so a
+client that already has it gets a 304 even across frames that changed nothing.
+"""
+import gzip
+import hashlib
+import json
+
+from flask import Response, request
+
+from simulation.simulation import wire
+
+GZIP_MIN_SIZE = 500  # same threshold as flask_compress (COMPRESS_MIN_SIZE)
+GZIP_LEVEL = 6
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+class EncodedResponse:
+    __slots__ = ("body", "mimetype", "etag", "_gzipped")
+
+    def __init__(self, body, mimetype="application/json"):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = hashlib.blake2b(body, digest_size=12).hexdigest()
+        self._gzipped = None
+
+    @property
+    def gzipped(self):
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=GZIP_LEVEL, mtime=0)
+        return self._gzipped
+
+
+def encode_json(data):
+    return EncodedResponse(json.dumps(data, separators=(",", ":")).encode())
+
+
+def encode_binary(data):
+    """data is already a wire.py message."""
+    return EncodedResponse(data, mimetype=wire.MIMETYPE)
+
+
+def cached(cache, cache_key, build, encoder=encode_json):
+    """cache[cache_key], encoding build() into it the first time."""
+    entry = cache.get(cache_key)
+    if entry is None:
+        # ✅ Two threads may race to fill it; they build identical bytes, so either wins
+        entry = cache[cache_key] = encoder(build())
+    return entry
+
+
+def send(entry):
+    """Response for a cached entry: 304 when the client has it, gzipped bytes when it accepts them."""
+    if request.if_none_match.contains(entry.etag):
+        response = Response(status=304)
+    elif len(entry.body) >= GZIP_MIN_SIZE and request.accept_encodings.quality("gzip") > 0:
+        response = Response(entry.gzipped, mimetype=entry.mimetype)
+        response.headers["Content-Encoding"] = "gzip"  # ✅ flask_compress leaves it alone
+    else:
+        response = Response(entry.body, mimetype=entry.mimetype)
+
+    response.set_etag(entry.etag)
+    response.headers["Vary"] = "Accept, Accept-Encoding"  # JSON or binary (wire.py), gzipped or not
+    response.cache_control.no_cache = True  # may be stored, but revalidate (If-None-Match) every time
+    return response
+
+
+def immutable(response):
+    """Let anything cache a response for good: its URL can never name other content (a sprite id)."""
+    response.cache_control.public = True
+    response.cache_control.max_age = IMMUTABLE_MAX_AGE
+    response.cache_control.immutable = True
+    return response
@@ -0,0 +1,281 @@
+"""
+Push stream of per-frame deltas, as Server-Sent Events.
+
+An asyncio server on config.STREAM_PORT, next to the Flask app. GET /stream
+(or /stream?x=&y= for one cell) answers with text/event-stream: a "keyframe"
+event holding the live state (as /getstate), then one "delta" event per
+frame holding that frame's creatures/new_food/deleted_food strings (as
+/getdeltas). Clients that send Accept-Encoding: gzip get it gzipped.
+
+The server is a broadcaster: the simulation thread only hands it each new
+snapshot. On the event loop's thread, every event is encoded (and
+compressed) once per frame, cell and encoding (FrameSnapshot.cache), and
+the same bytes are queued for every subscriber that wants them. Each
+subscriber has its own bounded queue drained by its own writer, so a slow
+one never holds up the others or the simulation: when its queue fills it
+is resynced with a keyframe, and when it cannot even take that in time it
+is dropped.
+"""
+import asyncio
+import json
+import multiprocessing
+import threading
+import zlib
+from urllib.parse import urlsplit, parse_qs
+
+import simulation.config as config
+from simulation.simulation.world import world
+
+HEADERS = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Content-Type: text/event-stream\r\n"
+    b"Cache-Control: no-cache\r\n"
+    b"Connection: keep-alive\r\n"
+    b"Access-Control-Allow-Origin: *\r\n"
+)
+
+GZIP_LEVEL = 6
+GZIP_HEADER = b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff"  # no name, no mtime, unknown OS
+
+
+def error_response(status, message):
+    body = json.dumps({"status": "error", "message": message}).encode()
+    return (
+        f"HTTP/1.1 {status}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: close\r\n\r\n"
+    ).encode() + body
+
+
+def encode_event(kind, data):
+    return f"event: {kind}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+
+def compress_event(data):
+    """
+    An event as raw deflate blocks ending on a sync flush. Compressed on its
+    own, so the same bytes can follow any other event in any subscriber's
+    gzip stream (after GZIP_HEADER), and the client can decode it at once.
+    """
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+def keyframe_event(snapshot, key):
+    cache_key = ("sse-keyframe", key)
+    if cache_key not in snapshot.cache:
+        snapshot.cache[cache_key] = encode_event("keyframe", {"frame": snapshot.frame, **snapshot.live_state(key)})
+    return snapshot.cache[cache_key]
+
+
+def delta_event(snapshot, key):
+    cache_key = ("sse-delta", key)
+    if cache_key not in snapshot.cache:
+        snapshot.cache[cache_key] = encode_event("delta", {"frame": snapshot.frame, **snapshot.frame_delta(key)})
+    return snapshot.cache[cache_key]
+
+
+def encoded_event(snapshot, keyframe, key, gzipped):
+    """keyframe_event or delta_event, compressed (compress_event) when gzipped."""
+    event = keyframe_event(snapshot, key) if keyframe else delta_event(snapshot, key)
+    if not gzipped:
+        return event
+
+    cache_key = ("sse-gzip", keyframe, key)
+    if cache_key not in snapshot.cache:
+        snapshot.cache[cache_key] = compress_event(event)
+    return snapshot.cache[cache_key]
+
+
+def requested_cell(query):
+    """(x, y) from ?x=&y=, None for the whole world. Raises ValueError for anything else."""
+    if "x" not in query and "y" not in query:
+        return None
+
+    x = int(query.get("x", ["0"])[0])
+    y = int(query.get("y", ["0"])[0])
+    if not (0 <= x < world.grid_cells and 0 <= y < world.grid_cells):
+        raise ValueError(f"Cell ({x}, {y}) not found")
+
+    return (x, y)
+
+
+def accepts_gzip(accept_encoding):
+    """Whether an Accept-Encoding header value allows gzip."""
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        if name.strip().lower() == "gzip":
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+class Subscriber:
+    """One connected client: what it streams, and the events queued for its writer."""
+
+    def __init__(self, writer, key, gzipped, backlog):
+        self.writer = writer
+        self.key = key
+        self.gzipped = gzipped
+        self.queue = asyncio.Queue(maxsize=backlog)  # (bytes, is keyframe); None closes the stream
+        self.last = None  # frame of the last event queued
+        self.resyncing = False  # a keyframe is queued but not written yet
+
+
+class StreamServer:
+    def __init__(self, host, port, backlog):
+        self.host = host
+        self.port = port
+        self.backlog = backlog
+
+        # ✅ Only touched on the event loop's thread
+        self.subscribers = set()
+        self.latest = None  # the last snapshot broadcast
+        self.dropped = 0  # subscribers disconnected for falling behind
+
+        self.loop = None
+        self.error = None
+
+    def start(self):
+        ready = threading.Event()
+        threading.Thread(target=self._run, args=(ready,), daemon=True).start()
+        ready.wait()
+
+        if self.error is not None:
+            raise self.error
+
+        world.on_publish.append(self.publish)
+        print(f"📡 Streaming deltas on http://{self.host}:{self.port}/stream")
+
+    def _run(self, ready):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+        try:
+            self.loop.run_until_complete(asyncio.start_server(self.handle, self.host, self.port))
+        except OSError as e:
+            self.error = e
+            ready.set()
+            return
+
+        ready.set()
+        self.loop.run_forever()
+
+    def publish(self, snapshot):
+        """World.on_publish callback, on the simulation thread: everything else happens on the loop's."""
+        self.loop.call_soon_threadsafe(self.broadcast, snapshot)
+
+    def broadcast(self, snapshot):
+        """Queue snapshot's events for every subscriber; each distinct event is encoded once."""
+        self.latest = snapshot
+        for subscriber in list(self.subscribers):
+            # ✅ A gap in the frames (or a first frame) can only be bridged by a keyframe
+            keyframe = subscriber.last is None or snapshot.frame != subscriber.last + 1
+            self.offer(subscriber, snapshot, keyframe)
+
+    def offer(self, subscriber, snapshot, keyframe):
+        queue = subscriber.queue
+        if queue.full():
+            if subscriber.resyncing:
+                # Could not even take the keyframe it was resynced with: let it go
+                self.drop(subscriber)
+                return
+
+            # ✅ Fell a whole backlog behind: skip what it missed and start over from a keyframe
+            while not queue.empty():
+                queue.get_nowait()
+            keyframe = True
+
+        queue.put_nowait((encoded_event(snapshot, keyframe, subscriber.key, subscriber.gzipped), keyframe))
+        subscriber.last = snapshot.frame
+        subscriber.resyncing = subscriber.resyncing or keyframe
+
+    def drop(self, subscriber):
+        self.subscribers.discard(subscriber)
+        self.dropped += 1
+
+        queue = subscriber.queue
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+        # ✅ Its writer may be stuck in drain() on a client that stopped reading
+        subscriber.writer.transport.abort()
+
+    async def handle(self, reader, writer):
+        subscriber = None
+        try:
+            request_line = await reader.readline()
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            parts = request_line.decode("latin-1").split()
+            if len(parts) < 2 or parts[0] != "GET":
+                writer.write(error_response("405 Method Not Allowed", "Only GET is supported"))
+                return
+
+            url = urlsplit(parts[1])
+            if url.path.rstrip("/") != "/stream":
+                writer.write(error_response("404 Not Found", "Not found"))
+                return
+
+            try:
+                key = requested_cell(parse_qs(url.query))
+            except ValueError:
+                writer.write(error_response("404 Not Found", "Cell not found"))
+                return
+
+            gzipped = accepts_gzip(headers.get("accept-encoding", ""))
+            subscriber = Subscriber(writer, key, gzipped, self.backlog)
+
+            snapshot = self.latest or world.published
+            if snapshot is not None:
+                self.offer(subscriber, snapshot, keyframe=True)
+            self.subscribers.add(subscriber)
+
+            if gzipped:
+                writer.write(HEADERS + b"Content-Encoding: gzip\r\n\r\n" + GZIP_HEADER)
+            else:
+                writer.write(HEADERS + b"\r\n")
+            await self.stream(writer, subscriber)
+
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # subscriber went away
+        finally:
+            self.subscribers.discard(subscriber)
+            writer.close()
+
+    async def stream(self, writer, subscriber):
+        """Write a subscriber's queued events as fast as the client takes them."""
+        while True:
+            item = await subscriber.queue.get()
+            if item is None:
+                return
+
+            data, keyframe = item
+            writer.write(data)
+            await writer.drain()  # ✅ waits on this client only; the queue absorbs frames meanwhile
+
+            if keyframe:
+                subscriber.resyncing = False
+
+
+stream_server = None
+
+
+def start_stream():
+    """Start the push stream once, in the main process, unless config.STREAM_PORT is None."""
+    global stream_server
+
+    if stream_server is not None or config.STREAM_PORT is None:
+        return
+    if multiprocessing.parent_process() is not None:
+        return
+
+    stream_server = StreamServer(config.STREAM_HOST, config.STREAM_PORT, config.STREAM_BACKLOG)
+    try:
+        stream_server.start()
+    except OSError as e:
+        print(f"❌ Push stream not started: {e}")
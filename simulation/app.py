@@ -1,5 +1,9 @@
+import argparse
+
 from flask import Flask
+import simulation.config as config
 from simulation.api.endpoints import api_bp
+from simulation.api.stream import start_stream
 from flask_compress import Compress
 
 from simulation.simulation.simulation import start_simulation
@@ -12,7 +16,19 @@ CORS(app)
 # Register API routes
 app.register_blueprint(api_bp)
 
-start_simulation()
+
+def command_line():
+    parser = argparse.ArgumentParser(description="Run the simulation and its API.")
+    parser.add_argument("--restore", nargs="?", const=config.CHECKPOINT_PATH, metavar="PATH",
+                        help=f"start from a checkpoint instead of a new world (default {config.CHECKPOINT_PATH}); "
+                             "worker processes (config.WORKERS) restart their RNGs from the seed")
+    # ✅ Known flags only: this module is also imported by other entry points (flask run, worker processes)
+    args, _ = parser.parse_known_args()
+    return args
+
+
+start_simulation(restore_from=command_line().restore)
+start_stream()
 
 if __name__ == '__main__':
     print("✅ Simulation initialized.")
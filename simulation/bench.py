@@ -0,0 +1,171 @@
+"""
+Headless benchmark: build a seeded world and step it as fast as possible.
+
+    python -m simulation.bench --creatures 300 --food 500 --frames 1000 --seed 1
+
+Reports frames/sec, per-phase timing, the final population and a digest
+of the final state. The same seed and upload file always give the same
+digest, so optimised engines can be checked against this one.
+"""
+import argparse
+import json
+import time
+
+import simulation.config as config
+
+
+def random_organs(rng):
+    from simulation.simulation.creatures import Creature
+
+    return [
+        {
+            "type": rng.choice(Creature.ORGANS),
+            "position": [rng.randint(-30, 30), rng.randint(-30, 30)],
+            "size": rng.randint(5, 12)
+        }
+        for _ in range(rng.randint(1, 4))
+    ]
+
+
+def populate(world, creatures, rng, uploads=None):
+    """Add the uploaded creatures, then `creatures` random valid ones."""
+    from simulation.simulation.creatures import Creature
+
+    for data in uploads or []:
+        creature = Creature(
+            position=data.get("position", None),
+            organs=data.get("organs", []),
+            name=data.get("name", None),
+            creator=data.get("creator", None)
+        )
+        if creature.isAlive:
+            world.add_creature(creature, log_spawn=False)
+
+    added = 0
+
+    while added < creatures:
+        creature = Creature(organs=random_organs(rng), name=f"Bench_{added}")
+        if creature.isAlive:
+            world.add_creature(creature, log_spawn=False)
+            added += 1
+
+
+def fill_food(world, rng, total):
+    """Add food at random places until the world holds `total`; any landing in a full cell is dropped."""
+    from simulation.simulation.food import Food
+
+    count = world.count_food()
+    while count < total:
+        world.add_food(Food(position=[rng.randint(0, 499), rng.randint(0, 499)]))
+        count += 1
+
+
+def run(creatures=200, food=200, frames=1000, seed=0, uploads=None, workers=0, restore=None, checkpoint=None):
+    """
+    Build the world (or load it from the checkpoint file restore) and step
+    it; with checkpoint, the final state is saved to that file. food is both
+    the food a new world starts with and the most each cell may hold.
+    """
+    from simulation.simulation import checkpoint as checkpoints
+    from simulation.simulation.creatures import Creature
+    from simulation.simulation.world import world
+
+    world.max_food = food  # ✅ this world's cap; config.MAX_FOOD stays as it is
+
+    restore_seconds = None
+    if restore:
+        start = time.perf_counter()
+        checkpoints.restore(world, restore)
+        restore_seconds = round(time.perf_counter() - start, 3)
+    else:
+        world.reseed(seed)
+
+        populate(world, creatures, world.rng, uploads)
+        fill_food(world, world.rng, food)
+
+    stepper = None
+    if workers > 0:
+        from simulation.simulation.parallel import ParallelStepper
+        stepper = ParallelStepper(world, workers).start()
+
+    phases = {}
+
+    start = time.perf_counter()
+
+    for _ in range(frames):
+        timings = {}
+        world.step(timings)
+
+        for name, seconds in timings.items():
+            phases.setdefault(name, []).append(seconds)
+
+    elapsed = time.perf_counter() - start
+
+    digest = world.digest()
+    if checkpoint:
+        checkpoints.save(checkpoints.capture(world), checkpoint)
+    if stepper is not None:
+        stepper.stop()
+
+    return {
+        "frames": frames,
+        "seed": seed,
+        "workers": workers,
+        "seconds": round(elapsed, 3),
+        "fps": round(frames / elapsed, 2) if elapsed > 0 else None,
+        "phases_ms": {
+            name: {
+                "avg": round(sum(times) / len(times) * 1000, 3) if times else 0,
+                "max": round(max(times) * 1000, 3) if times else 0
+            }
+            for name, times in phases.items()
+        },
+        "restore_seconds": restore_seconds,
+        "final": {
+            "frame": world.get_frame(),
+            "creatures": world.count_creatures(),
+            "food": world.count_food(),
+            "creatures_ever": Creature.counter,
+            "digest": digest
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run N frames of a seeded world headless and report timing.")
+    parser.add_argument("--creatures", type=int, default=200, help="initial population")
+    parser.add_argument("--food", type=int, default=config.MAX_FOOD, help="starting food, and the most each cell holds (default: config.MAX_FOOD)")
+    parser.add_argument("--frames", type=int, default=1000, help="frames to simulate")
+    parser.add_argument("--seed", type=int, default=0, help="world RNG seed")
+    parser.add_argument("--upload", help="JSON file with a list of creatures in /uploadcreature format")
+    parser.add_argument("--workers", type=int, default=0, help="step cells in this many worker processes (0: one thread)")
+    parser.add_argument("--restore", metavar="PATH", help="start from this checkpoint instead of a new world (--creatures, --seed and --upload are ignored); "
+                        "with --workers, their RNGs restart from the seed, so only one-thread runs carry on exactly")
+    parser.add_argument("--checkpoint", metavar="PATH", help="save a checkpoint of the final state to PATH")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    uploads = None
+    if args.upload:
+        with open(args.upload) as f:
+            uploads = json.load(f)
+
+    report = run(creatures=args.creatures, food=args.food, frames=args.frames, seed=args.seed, uploads=uploads,
+                 workers=args.workers, restore=args.restore, checkpoint=args.checkpoint)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    if report["restore_seconds"] is not None:
+        print(f"📂 Restored in {report['restore_seconds']}s")
+    print(f"🏁 {report['frames']} frames in {report['seconds']}s — {report['fps']} frames/sec (seed {report['seed']}, {report['workers']} workers)")
+    for name, timing in report["phases_ms"].items():
+        print(f"   {name:<14} avg {timing['avg']:>9.3f} ms   max {timing['max']:>9.3f} ms")
+    final = report["final"]
+    print(f"   final: frame {final['frame']}, {final['creatures']} creatures, {final['food']} food")
+    print(f"   digest: {final['digest']}")
+
+
+if __name__ == '__main__':
+    main()
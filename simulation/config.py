@@ -12,18 +12,44 @@ PRINT = 0
 
 SVG = False
 
+# World Settings
+WORLD_SIZE = 500 # pixels, wraps on both axes
+GRID_CELLS = 10 # world is split into GRID_CELLS x GRID_CELLS cells
+COLLISION_CELL_SIZE = 50 # broadphase bucket size in pixels
+FOOD_CELL_SIZE = 25 # food index bucket size in pixels
+
 # Simulation Settings
+SEED = None # world RNG seed; None seeds from the OS
 
 FPS = 30.0
 SIMULATION_SPEED = 0
 if FPS > 0: SIMULATION_SPEED = 1.0/FPS
+UNTHROTTLED = False # run frames back to back instead of at FPS (also when FPS <= 0)
+MAX_CATCHUP_FRAMES = 5 # frames run back to back when behind before the backlog is dropped
+ALLOW_CONTROL = False # expose /control (pause, step, unthrottle)
+UPLOAD_TIMEOUT = 2.0 # seconds an upload waits for the simulation to create its creature before answering "queued"
+MAX_UPLOAD_BATCH = 1000 # creatures accepted by one /uploadcreatures request
+STREAM_HOST = '127.0.0.1'
+STREAM_PORT = 5001 # Server-Sent Events push stream (api/stream.py); None disables it
+VIEWPORT_MARGIN = 50 # pixels a ?rect= viewport is grown by on every side, so what is about to come into view is already known
+STREAM_BACKLOG = 60 # frames queued per subscriber; one that falls this far behind is resent a keyframe, and dropped if it falls behind again before taking it
+WORKERS = 0 # worker processes stepping strips of cells in parallel, kept only if a trial finds them faster; 0 steps everything on the simulation thread
+HALO_CAPACITY = 4096 # border creatures each worker can share per frame
+HALO_FOOD_CAPACITY = 16384 # food near its strip's edges each worker can share per frame
+PARALLEL_TRIAL_FRAMES = 300 # with WORKERS > 0: frames timed on one thread, then as many in the workers, before settling on one
+PARALLEL_MIN_SPEEDUP = 1.2 # the workers are kept only if they step a frame at least this many times faster than one thread
+KEYFRAME_INTERVAL = 300 # frames per delta block: a keyframe (full state) is taken this often
+DELTA_CAPACITY = 512 # delta records preallocated per cell and block; doubles when a busy cell runs out
+SPRITE_GRACE_FRAMES = 4 * KEYFRAME_INTERVAL # frames an unused sprite layout is kept; must outlast the three delta blocks a cell's used_sprite_ids cover
+CHECKPOINT_PATH = 'checkpoint.evc' # world checkpoint (simulation/checkpoint.py), written periodically and loaded by --restore
+CHECKPOINT_INTERVAL = 30 * KEYFRAME_INTERVAL # frames between checkpoints; a multiple of KEYFRAME_INTERVAL, so restored worlds start on a delta block. None disables them
 BASE_REPRODUCTION_CHANCE = 0.05
 REPRODUCE = True
 MAX_AV = 2 #radians per frame
 BMR = 0.01 #energy per frame
 
 # Food Settings
-MAX_FOOD = 200
+MAX_FOOD = 200 # food each cell holds at most, however it arrives
 #FOOD_SPAWN_INTERVAL = 40
 FOOD_STEP = 0.01
 
@@ -1,18 +1,20 @@
 import threading
-import random
 import math
 import simulation.config as config
-import json
+import numpy as np
+from . import deltas
 
 class Cell:
 
-    BUFFER_FRAMES = 300
+    BUFFER_FRAMES = config.KEYFRAME_INTERVAL
 
     def __init__(self, x, y):
         self.x = x
         self.y = y
+        from .food import FoodStore
+
         self.creatures = []
-        self.food = []
+        self.food = FoodStore(config.WORLD_SIZE, config.WORLD_SIZE, config.FOOD_CELL_SIZE)
         self.lock = threading.RLock()
         #print(f"🧱 Created Cell({x}, {y})")
 
@@ -20,49 +22,43 @@ class Cell:
         self.building = 0
         self.snapshot = ""
 
-        self.delta_frames = [None] * Cell.BUFFER_FRAMES
-
+        # ✅ Typed delta records (see deltas.py): the block being logged, the
+        # published one and the one before it, recycled in turn like used_sprite_ids
+        self.delta_blocks = [deltas.DeltaBlock(config.DELTA_CAPACITY) for _ in range(3)]
+        self.log = self.delta_blocks[0]
 
-        self.current_delta = {
-            i: {
-                "frame": i,
-                "new_food": "",
-                "deleted_food": "",
-                "creatures": ""
-            } for i in range(Cell.BUFFER_FRAMES)
-        }
+        # Creatures whose position left this cell during integrate(), moved by World.migrate()
+        self.emigrants = []
 
         self.used_sprite_ids = [set(), set(), set()]
         self.sprite_buffer_index = 0
 
     def swap_buffers(self, frame):
         """
-        Called at the end of a delta block (e.g., at frame X + 300),
-        to finalize the current buffer (which has deltas from X+1 to X+300),
-        and start building the next one from a new snapshot at X+300.
+        Called at the end of a delta block (e.g., at frame X + BUFFER_FRAMES),
+        to finalize the current buffer (which has deltas from X to X+BUFFER_FRAMES-1),
+        and start building the next one from a new snapshot at X+BUFFER_FRAMES.
         """
-        import copy
-
-        # Finalize the current build buffer
-        self.state_buffer[self.building]["frame"] = frame - Cell.BUFFER_FRAMES  # snapshot corresponds to frame X
-        self.state_buffer[self.building]["state"] = self.snapshot
-        self.state_buffer[self.building]["deltas"] = copy.deepcopy(self.current_delta)
+        # Finalize the current build buffer. ✅ Always a new dict: a finished
+        # buffer may already be published (see snapshot.py) and is never changed.
+        # The delta block is handed over as it is; nothing more is logged to it
+        self.state_buffer[self.building] = {
+            "frame": frame - Cell.BUFFER_FRAMES,  # snapshot corresponds to frame X
+            "state": self.snapshot,
+            "deltas": self.log,
+            "count": len(self.log)
+        }
 
         # Switch buffers
         self.building = 1 - self.building
         self.sprite_buffer_index = (self.sprite_buffer_index + 1) % 3
 
-        # New snapshot starts at frame X+300
-        self.snapshot = {
-            "creatures": [c.to_dict() for c in self.creatures],
-            "food": [f.to_dict() for f in self.food]
-        }
+        # New snapshot starts at frame X+BUFFER_FRAMES
+        self.snapshot = self.take_snapshot()
 
-        # Reset deltas for the next block
-        for i in range(Cell.BUFFER_FRAMES):
-            self.current_delta[i]["new_food"] = ""
-            self.current_delta[i]["deleted_food"] = ""
-            self.current_delta[i]["creatures"] = ""
+        # Log the next block into the oldest one; snapshots only hold copies of it (snapshot.log_copy)
+        self.log = self.delta_blocks[self.sprite_buffer_index]
+        self.log.clear()
 
 
         self.used_sprite_ids[self.sprite_buffer_index] = {
@@ -73,71 +69,66 @@ class Cell:
 
         #print (self.used_sprite_ids)
 
-    def get_full(self):
-        from simulation.simulation.world import world
+    def mirror(self, frame, records, creatures, food=None):
+        """
+        Load one frame of this cell as reported by the worker process stepping
+        it (see parallel.py). records come from DeltaBlock.export(); creatures
+        are read-only views; food is a list of positions, or None when it did
+        not change this frame.
+        """
+        from .food import Food, FoodStore
 
-        state = self.state_buffer[1 - self.building]
-        base_frame = world.get_built_index()
-
-        snapshot = {
-            "creatures": [
-                {
-                    **dict(c),
-                    "position": [round(c["position"][0]), round(c["position"][1])],
-                    "direction": round(c["direction"], 2),
-                    "id": c["id"],
-                    "name": c["name"]
-                }
-                for c in state.get("state", {}).get("creatures", [])
-            ],
-            "food": state.get("state", {}).get("food", [])
-        }
+        with self.lock:
+            self.log.extend(records)
 
-        filtered_deltas = {
-            str(int(frame) + base_frame): {
-                k: v for k, v in delta.items() if k != "frame"
-            }
-            for frame, delta in state.get("deltas", {}).items()
-            if delta.get("creatures") or delta.get("new_food") or delta.get("deleted_food")
+            self.creatures = creatures
+            for creature in creatures:
+                self.used_sprite_ids[self.sprite_buffer_index].add(creature.sprite_id)
+
+            if food is not None:
+                self.food = FoodStore(config.WORLD_SIZE, config.WORLD_SIZE, config.FOOD_CELL_SIZE)
+                for position in food:
+                    self.food.add(Food(position=position))
+
+    def take_snapshot(self):
+        return {
+            "creatures": [c.to_dict() for c in self.creatures],
+            "food": [f.to_dict() for f in self.food]
         }
 
+    def get_full(self):
+        from .snapshot import format_state, format_deltas
+
+        state = self.state_buffer[1 - self.building]
+
         return {
             "frame": state["frame"],
-            "state": snapshot,
-            "deltas": filtered_deltas
+            "state": format_state(state),
+            "deltas": format_deltas(state)
         }
     
     def get_state(self):
-        state = self.state_buffer[1 - self.building]
+        from .snapshot import format_state
 
-        return {
-            "creatures": [
-                {
-                    **dict(c),
-                    "position": [round(c["position"][0]), round(c["position"][1])],
-                    "direction": round(c["direction"], 2),
-                    "id": c["id"],
-                    "name": c["name"]
-                }
-                for c in state.get("state", {}).get("creatures", [])
-            ],
-            "food": state.get("state", {}).get("food", [])
-        }
+        return format_state(self.state_buffer[1 - self.building])
     
+    def get_live_creatures(self):
+        return [
+            {
+                "id": c.id,
+                "name": c.name,
+                "position": [round(c.position[0]), round(c.position[1])],
+                "direction": round(c.direction, 2),
+                "energy": c.energy,
+                "sprite_id": c.sprite_id
+            }
+            for c in self.creatures
+            if c.isAlive  # optionally skip dead creatures
+        ]
+
     def get_live_state(self):
         return {
-            "creatures": [
-                {
-                    "id": c.id,
-                    "name": c.name,
-                    "position": [round(c.position[0]), round(c.position[1])],
-                    "direction": round(c.direction, 2),
-                    "energy": c.energy,
-                    "sprite_id": c.sprite_id
-                }
-                for c in self.creatures
-                if c.isAlive  # optionally skip dead creatures
-            ],
+            "creatures": self.get_live_creatures(),
             "food": [
                 [round(f.position[0]), round(f.position[1])]
                 for f in self.food
@@ -145,42 +136,30 @@ class Cell:
         }
     
     def get_deltas(self):
-        from simulation.simulation.world import world
+        from .snapshot import format_deltas
 
         state = self.state_buffer[1 - self.building]
-        base_frame = world.get_built_index()
-
-        filtered_deltas = {
-            str(int(frame) + base_frame): {
-                k: v for k, v in delta.items() if k != "frame"
-            }
-            for frame, delta in state.get("deltas", {}).items()
-            if delta.get("creatures") or delta.get("new_food") or delta.get("deleted_food")
-        }
 
         return {
             "frame": state["frame"],
-            "deltas": filtered_deltas
+            "deltas": format_deltas(state)
         }
 
 
 
     
-    def get_current_delta(self):
+    def frame_delta(self, frame):
+        """(block, lo, hi) of the records logged during frame, or None if there were none."""
+        lo, hi = self.log.frame_range(frame)
+        if lo == hi:
+            return None
+        return (self.log, lo, hi)
+
+    def log_record(self, kind, id=0, a=deltas.NAN, b=deltas.NAN, c=deltas.NAN, payload=None):
+        """Append one delta record for the current frame."""
         from simulation.simulation.world import world
-        frame_count = world.get_frame()
-        index = frame_count % Cell.BUFFER_FRAMES
-
-        # Wipe if this slot is from a past frame
-        if self.delta_frames[index] != frame_count:
-            self.current_delta[index] = {
-                "new_food": "",
-                "deleted_food": "",
-                "creatures": ""
-            }
-            self.delta_frames[index] = frame_count
 
-        return self.current_delta[index]
+        self.log.append(world.get_frame(), kind, id, a, b, c, payload)
 
 
 
@@ -189,8 +168,6 @@ class Cell:
         from .food import Food
 
         with self.lock:
-            delta = self.get_current_delta()
-
             if isinstance(obj, Creature):
                 self.creatures.append(obj)
                 obj.cell = self
@@ -200,42 +177,63 @@ class Cell:
 
                 #print ("new")
                 if log_spawn:
-                    creature_dict = {
-                        "id": obj.id,
-                        "position": obj.position,
-                        "direction": obj.direction,
-                        "sprite_id": obj.sprite_id,
-                        "name": obj.name,
-                        "parent_ids": obj.parent_ids,
-                        "creator": obj.creator
-                    }
-                    delta["creatures"] += f"j{json.dumps(creature_dict)},"
+                    self.log_record(deltas.SPAWN, obj.id, payload=self.spawn_record(obj))
             elif isinstance(obj, Food):
+                # ✅ However food arrives (spawns, death drops), a cell holds at most world.max_food
+                if len(self.food) >= self.world.max_food:
+                    return
 
-                self.food.append(obj)
+                self.food.add(obj)
                 obj.cell = self
-                delta["new_food"] += f"[{obj.position[0]},{obj.position[1]}],"
+                self.log_record(deltas.FOOD_ADD, a=obj.position[0], b=obj.position[1])
 
 
 
 
+    def spawn_record(self, creature):
+        """Payload of a SPAWN / MIGRATE_IN record."""
+        return {
+            "id": creature.id,
+            "position": creature.position.tolist(),
+            "direction": float(creature.direction),
+            "sprite_id": creature.sprite_id,
+            "name": creature.name,
+            "parent_ids": list(creature.parent_ids),
+            "creator": creature.creator
+        }
+
+    def transfer(self, creature, target):
+        """
+        Hand a creature over to a neighbouring cell. Logged under "migrations"
+        on both sides: a removal here and a spawn there, so per-cell viewers
+        see it leave and arrive while whole-world views see nothing.
+        """
+        with self.lock:
+            try:
+                self.creatures.remove(creature)
+            except ValueError:
+                return
+            self.log_record(deltas.MIGRATE_OUT, creature.id)
+
+        with target.lock:
+            target.add(creature, log_spawn=False)
+            target.log_record(deltas.MIGRATE_IN, creature.id, payload=target.spawn_record(creature))
+
     def remove(self, obj):
         from .creatures import Creature
         from .food import Food
 
         with self.lock:
             try:
-                delta = self.get_current_delta()
-
                 if isinstance(obj, Creature):
                     self.creatures.remove(obj)
                     obj.cell = None
-                    delta["creatures"] += f"r[{obj.id}],"
+                    self.log_record(deltas.REMOVE, obj.id)
 
                 elif isinstance(obj, Food):
                     self.food.remove(obj)
                     obj.cell = None
-                    delta["deleted_food"] += f"[{obj.position[0]},{obj.position[1]}],"
+                    self.log_record(deltas.FOOD_REMOVE, a=obj.position[0], b=obj.position[1])
             except ValueError:
                 pass  # Already removed
 
@@ -245,8 +243,30 @@ class Cell:
     def add_food(self):
         
         from .food import Food
+        from simulation.simulation.world import world
 
-        self.food.append(Food(position=[random.randint(0, 499), random.randint(0, 499)]))
+        self.food.add(Food(position=[world.rng.randint(0, 499), world.rng.randint(0, 499)]))
+
+    def add_food_batch(self, positions):
+        """
+        Add food at every [x, y] in positions, logged as one FOOD_BATCH record.
+        Positions beyond the cell's cap (world.max_food) are dropped.
+        """
+        from .food import Food
+        from simulation.simulation.world import world
+
+        with self.lock:
+            positions = positions[:max(0, self.world.max_food - len(self.food))]
+            if not positions:
+                return
+
+            for position in positions:
+                food_obj = Food(position=position)
+                self.food.add(food_obj)
+                food_obj.cell = self
+
+            xy = np.asarray(positions, dtype=np.float64)
+            self.log.append(world.get_frame(), deltas.FOOD_BATCH, len(positions), payload=xy)
 
 
     def get_used_sprite_ids(self):
@@ -254,7 +274,8 @@ class Cell:
 
     def run_creatures(self):
         """Handles all creature updates in one place."""
-        
+        from simulation.simulation.world import world
+
         with self.lock:
 
             for creature in self.creatures:
@@ -264,156 +285,216 @@ class Cell:
 
                     offspring = creature.reproduce()
                     if offspring and offspring.isAlive:
-                        #offspring.sprite_id = offspring.compute_sprite_id()
-                        self.add(offspring)
-                    
-                    creature.update_position()
+                        # ✅ Joins this cell once the frame's creatures are done (World.apply_commands)
+                        world.commands.push("birth", (self, offspring))
 
+            # ✅ Move the whole population in one vectorised step
+            self.integrate([c for c in self.creatures if c.isAlive])
 
+    def integrate(self, creatures):
+        """Integrate creatures through the world's PhysicsStore, then log moves and deaths."""
+        from simulation.simulation.world import world
 
+        if not creatures:
+            return
 
-    def run_collisions(self, apply_momentum=False):
-        """Handles all creature and organ collisions, applying scaled push forces and optionally momentum transfer."""
+        slots = np.fromiter((c.slot for c in creatures), dtype=np.intp, count=len(creatures))
+        moved_x, moved_y, moved_d, dead = world.physics.integrate(slots, world.get_frame())
 
-        BASE_REPULSION_FORCE = 40
-        MAX_REPULSION_FORCE = 80
+        # ✅ Rotate every creature's organs into world space once for this frame
+        direction = world.physics.direction[slots]
+        for creature, cos_theta, sin_theta in zip(creatures, np.cos(direction).tolist(), np.sin(direction).tolist()):
+            creature.refresh_transform(cos_theta, sin_theta)
 
         with self.lock:
-            local_creatures = self.creatures[:]  # shallow copy
+            # ✅ One record per creature that moved, appended in one go; unmoved components are nan
+            moved = np.flatnonzero(moved_x | moved_y | moved_d)
+            if moved.size:
+                ids = np.fromiter((creatures[k].id for k in moved.tolist()), dtype=np.int64, count=moved.size)
+                position = world.physics.position[slots[moved]]
+                self.log.append_many(
+                    world.get_frame(), deltas.MOVE, ids,
+                    np.where(moved_x[moved], position[:, 0], np.nan),
+                    np.where(moved_y[moved], position[:, 1], np.nan),
+                    np.where(moved_d[moved], direction[moved], np.nan)
+                )
 
-        for i, creature in enumerate(local_creatures):
+            for k in np.flatnonzero(dead):
+                creatures[k].die()
 
-            cos_theta_a = math.cos(creature.direction)
-            sin_theta_a = math.sin(creature.direction)
+        # ✅ Note anything that left this cell; World.migrate() moves it once every cell has stepped
+        position = world.physics.position[slots]
+        cols = (position[:, 0] // world.cell_size).astype(np.intp) % world.grid_cells
+        rows = (position[:, 1] // world.cell_size).astype(np.intp) % world.grid_cells
 
-            body_rx_a = creature.body_pos[0] * cos_theta_a - creature.body_pos[1] * sin_theta_a
-            body_ry_a = creature.body_pos[0] * sin_theta_a + creature.body_pos[1] * cos_theta_a
+        for k in np.flatnonzero((cols != self.x) | (rows != self.y)):
+            if creatures[k].isAlive:
+                self.emigrants.append(creatures[k])
 
-            body_a = [
-                creature.position[0] + body_rx_a,
-                creature.position[1] + body_ry_a
-            ]
-
-            for j in range(i + 1, len(local_creatures)):
-                other = local_creatures[j]
-
-
-                cos_theta_b = math.cos(other.direction)
-                sin_theta_b = math.sin(other.direction)
-
-                body_rx_b = other.body_pos[0] * cos_theta_b - other.body_pos[1] * sin_theta_b
-                body_ry_b = other.body_pos[0] * sin_theta_b + other.body_pos[1] * cos_theta_b
-
-                body_b = [
-                    other.position[0] + body_rx_b,
-                    other.position[1] + body_ry_b
-                ]
-
-                # 1️⃣ Body-to-Body Collision
-                dx = body_b[0] - body_a[0]
-                dy = body_b[1] - body_a[1]
-                distance = math.hypot(dx, dy)
-                min_distance = config.BODY_RADIUS * 2
-                overlap = max(0, min_distance - distance)
-
-                if overlap > 0:
-                    contact_point = [(body_a[0] + body_b[0]) / 2, (body_a[1] + body_b[1]) / 2]
-                    repulsion_force = min(BASE_REPULSION_FORCE + overlap * 2, MAX_REPULSION_FORCE)
-                    force_direction = math.atan2(dy, dx)
 
-                    creature.apply_force(force_direction + math.pi, repulsion_force, contact_point)
-                    other.apply_force(force_direction, repulsion_force, contact_point)
 
-                # 2️⃣ Organ-to-Organ Collision
-                for organ_a in creature.organs:
-                    if not organ_a.isAlive: continue
-                    pos_a = organ_a.get_absolute_position()
-
-                    for organ_b in other.organs:
-                        if not organ_b.isAlive: continue
-                        pos_b = organ_b.get_absolute_position()
+    def run_collisions(self, apply_momentum=False, halo=()):
+        """
+        Handles all creature and organ collisions, applying scaled push forces and optionally momentum transfer.
 
-                        dx = pos_b[0] - pos_a[0]
-                        dy = pos_b[1] - pos_a[1]
-                        distance = math.hypot(dx, dy)
-                        min_distance = organ_a.size + organ_b.size
-                        overlap = max(0, min_distance - distance)
+        halo holds creatures owned by neighbouring cells that may touch ours. A pair
+        spanning two cells is resolved by the cell owning the lower creature id, so
+        every pair is resolved exactly once across the world. Ghosts from another
+        worker process (parallel.py) are always resolved here: their own worker
+        resolves the same pair from its side.
+        """
 
-                        if overlap > 0:
-                            contact_point = [(pos_a[0] + pos_b[0]) / 2, (pos_a[1] + pos_b[1]) / 2]
-                            repulsion_force = min(BASE_REPULSION_FORCE + overlap * 2, MAX_REPULSION_FORCE)
-                            force_direction = math.atan2(dy, dx)
+        with self.lock:
+            local_creatures = self.creatures[:]  # shallow copy
 
-                            creature.apply_force(force_direction + math.pi, repulsion_force, contact_point)
-                            other.apply_force(force_direction, repulsion_force, contact_point)
+        own = len(local_creatures)
+        participants = local_creatures + list(halo)
 
-                            # 🧠 Spike Damage Check
-                            if organ_a.type == "spike" and organ_b.type != "spike":
-                                organ_b.die()
+        # Broadphase: bucket every creature once, then only pair up neighbours.
+        # ✅ One grid shared by every cell: cells collide one after another
+        grid = self.world.collision_grid
+        grid.clear()
 
-                            if organ_b.type == "spike" and organ_a.type != "spike":
-                                organ_a.die()
+        entries = []
+        for i, creature in enumerate(participants):
+            if creature.isAlive:
+                x, y = creature.position.tolist()
+                entry = (i, creature, x, y)
+                if i < own:
+                    entries.append(entry)
+                grid.insert(entry, x, y, creature.radius)
 
-                # 3️⃣ Other’s Organ vs Creature Body
-                for organ in other.organs:
-                    if not organ.isAlive: continue
-                    pos_organ = organ.get_absolute_position()
+        def owns_pair(i, creature, j, other):
+            if j < own:
+                return j > i
+            if getattr(other, "ghost", False):
+                return True
+            return creature.id < other.id
 
-                    dx = body_a[0] - pos_organ[0]
-                    dy = body_a[1] - pos_organ[1]
-                    distance = math.hypot(dx, dy)
-                    min_distance = config.BODY_RADIUS + organ.size
-                    overlap = max(0, min_distance - distance)
+        for i, creature, x, y in entries:
+            if not creature.isAlive: continue
 
-                    if overlap > 0:
-                        contact_point = [(body_a[0] + pos_organ[0]) / 2, (body_a[1] + pos_organ[1]) / 2]
-                        repulsion_force = min(BASE_REPULSION_FORCE + overlap * 2, MAX_REPULSION_FORCE)
-                        force_direction = math.atan2(dy, dx)
+            candidates = sorted(
+                (entry for entry in grid.query(x, y, creature.radius + grid.max_radius) if owns_pair(i, creature, entry[0], entry[1])),
+                key=lambda entry: entry[0]
+            )
 
-                        other.apply_force(force_direction + math.pi, repulsion_force, contact_point)
-                        creature.apply_force(force_direction, repulsion_force, contact_point)
+            for j, other, other_x, other_y in candidates:
+                if not creature.isAlive: break
+                if not other.isAlive: continue
 
-                        # 💀 Spike vs Body
-                        if organ.type == "spike":
-                            if config.PRINT: print(f"creature {i} spiked by creature {j}")
-                            
-                            creature.die()
+                # Shift other onto the image nearest to creature across the wrap
+                ox, oy = grid.wrap_offset(x, y, other_x, other_y)
 
-                # 4️⃣ Creature’s Organ vs Other Body
-                for organ in creature.organs:
-                    if not organ.isAlive: continue
-                    pos_organ = organ.get_absolute_position()
+                dx = other_x + ox - x
+                dy = other_y + oy - y
+                reach = creature.radius + other.radius
 
-                    dx = body_b[0] - pos_organ[0]
-                    dy = body_b[1] - pos_organ[1]
-                    distance = math.hypot(dx, dy)
-                    min_distance = config.BODY_RADIUS + organ.size
-                    overlap = max(0, min_distance - distance)
+                if dx * dx + dy * dy > reach * reach:
+                    continue
 
-                    if overlap > 0:
-                        contact_point = [(body_b[0] + pos_organ[0]) / 2, (body_b[1] + pos_organ[1]) / 2]
-                        repulsion_force = min(BASE_REPULSION_FORCE + overlap * 2, MAX_REPULSION_FORCE)
-                        force_direction = math.atan2(dy, dx)
+                self.collide_pair(creature, other, i, j, ox, oy)
 
-                        creature.apply_force(force_direction + math.pi, repulsion_force, contact_point)
-                        other.apply_force(force_direction, repulsion_force, contact_point)
+    def collide_pair(self, creature, other, i, j, ox=0, oy=0):
+        """Narrowphase for one pair. other's world coordinates are shifted by (ox, oy)."""
 
-            
-                        # 💀 Spike vs Body
-                        if organ.type == "spike":
-                            if config.PRINT: print(f"creature {j} spiked by creature {i}")
-                            
-                            other.die()
+        BASE_REPULSION_FORCE = 40
+        MAX_REPULSION_FORCE = 80
 
+        def push(first, second, force_direction, overlap, contact_point):
+            """Push first away from the contact and second towards it. Contact is in creature's frame."""
+            repulsion_force = min(BASE_REPULSION_FORCE + overlap * 2, MAX_REPULSION_FORCE)
+            contact_a = contact_point
+            contact_b = [contact_point[0] - ox, contact_point[1] - oy]
 
+            first.apply_force(force_direction + math.pi, repulsion_force, contact_a if first is creature else contact_b)
+            second.apply_force(force_direction, repulsion_force, contact_a if second is creature else contact_b)
 
+        body_a = creature.get_body_position()
 
+        body_b = other.get_body_position()
+        body_b = [body_b[0] + ox, body_b[1] + oy]
 
+        # 1️⃣ Body-to-Body Collision
+        dx = body_b[0] - body_a[0]
+        dy = body_b[1] - body_a[1]
+        distance = math.hypot(dx, dy)
+        min_distance = config.BODY_RADIUS * 2
+        overlap = max(0, min_distance - distance)
 
+        if overlap > 0:
+            contact_point = [(body_a[0] + body_b[0]) / 2, (body_a[1] + body_b[1]) / 2]
+            push(creature, other, math.atan2(dy, dx), overlap, contact_point)
 
+        # 2️⃣ Organ-to-Organ Collision
+        for organ_a in creature.organs:
+            if not organ_a.isAlive: continue
+            pos_a = organ_a.get_absolute_position()
 
+            for organ_b in other.organs:
+                if not organ_b.isAlive: continue
+                pos_b = organ_b.get_absolute_position()
+                pos_b = [pos_b[0] + ox, pos_b[1] + oy]
 
+                dx = pos_b[0] - pos_a[0]
+                dy = pos_b[1] - pos_a[1]
+                distance = math.hypot(dx, dy)
+                min_distance = organ_a.size + organ_b.size
+                overlap = max(0, min_distance - distance)
 
+                if overlap > 0:
+                    contact_point = [(pos_a[0] + pos_b[0]) / 2, (pos_a[1] + pos_b[1]) / 2]
+                    push(creature, other, math.atan2(dy, dx), overlap, contact_point)
+
+                    # 🧠 Spike Damage Check
+                    if organ_a.type == "spike" and organ_b.type != "spike":
+                        organ_b.die()
+
+                    if organ_b.type == "spike" and organ_a.type != "spike":
+                        organ_a.die()
+
+        # 3️⃣ Other’s Organ vs Creature Body
+        for organ in other.organs:
+            if not organ.isAlive: continue
+            pos_organ = organ.get_absolute_position()
+            pos_organ = [pos_organ[0] + ox, pos_organ[1] + oy]
+
+            dx = body_a[0] - pos_organ[0]
+            dy = body_a[1] - pos_organ[1]
+            distance = math.hypot(dx, dy)
+            min_distance = config.BODY_RADIUS + organ.size
+            overlap = max(0, min_distance - distance)
+
+            if overlap > 0:
+                contact_point = [(body_a[0] + pos_organ[0]) / 2, (body_a[1] + pos_organ[1]) / 2]
+                push(other, creature, math.atan2(dy, dx), overlap, contact_point)
+
+                # 💀 Spike vs Body
+                if organ.type == "spike":
+                    if config.PRINT: print(f"creature {i} spiked by creature {j}")
+
+                    creature.die()
+
+        # 4️⃣ Creature’s Organ vs Other Body
+        for organ in creature.organs:
+            if not organ.isAlive: continue
+            pos_organ = organ.get_absolute_position()
+
+            dx = body_b[0] - pos_organ[0]
+            dy = body_b[1] - pos_organ[1]
+            distance = math.hypot(dx, dy)
+            min_distance = config.BODY_RADIUS + organ.size
+            overlap = max(0, min_distance - distance)
+
+            if overlap > 0:
+                contact_point = [(body_b[0] + pos_organ[0]) / 2, (body_b[1] + pos_organ[1]) / 2]
+                push(creature, other, math.atan2(dy, dx), overlap, contact_point)
+
+                # 💀 Spike vs Body
+                if organ.type == "spike":
+                    if config.PRINT: print(f"creature {j} spiked by creature {i}")
+
+                    other.die()
 
 
 
@@ -0,0 +1,359 @@
+"""
+World checkpoints: the whole simulation in one compact binary file.
+
+    "EVCP"  u32 version  u32 header length  header (JSON)  arrays
+
+The header holds the scalars (frame, id counter, RNG states, food budget)
+and a directory of the arrays: dtype, shape and offset of each. The arrays
+follow raw and 64-byte aligned, so restore() maps the file and reads them
+in place. Creatures, organs, food and sprite layouts are columns, in cell
+order; strings are one UTF-8 blob per column plus lengths (-1 for None).
+
+capture() copies the state out on the simulation thread, between frames;
+save() encodes and writes it, on a thread of its own (see Checkpointer),
+to a temporary file renamed over the old checkpoint once complete. A world
+restored from a checkpoint carries on exactly as the original would have
+when stepped on one thread. With worker processes, their RNGs restart from
+the seed (see ParallelStepper). Uploads still queued are not saved.
+
+Sprite layouts are saved with the frame each unused one fell out of use,
+so its grace period carries on. The registry's version is not: a restored
+process numbers versions in an epoch of its own, and clients asking for
+changes since an older one are sent every layout (SpriteRegistry).
+"""
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+
+import numpy as np
+
+import simulation.config as config
+
+MAGIC = b"EVCP"
+VERSION = 1
+ALIGN = 64
+
+ORGAN_TYPES = ("mouth", "eye", "flipper", "spike")
+
+log = logging.getLogger(__name__)
+
+ALIVE, X_INT, Y_INT, SIZE_INT = 1, 2, 4, 8  # organ_flags; food_flags use X_INT | Y_INT
+
+
+def padding(size):
+    return -size % ALIGN
+
+
+def pack_strings(values):
+    """(UTF-8 blob, lengths) of a list of strings; None has length -1."""
+    encoded = [None if v is None else v.encode() for v in values]
+    lengths = np.fromiter((-1 if e is None else len(e) for e in encoded), np.int64, len(encoded))
+    blob = b"".join(e for e in encoded if e is not None)
+    return np.frombuffer(blob, dtype=np.uint8), lengths
+
+
+def unpack_strings(blob, lengths):
+    blob = blob.tobytes()
+    out = []
+    start = 0
+    for length in lengths.tolist():
+        if length < 0:
+            out.append(None)
+        else:
+            out.append(blob[start:start + length].decode())
+            start += length
+    return out
+
+
+def number_flags(values, flag):
+    """flag for every value that is a Python int (so it is restored as one, not as a float)."""
+    return np.fromiter((flag if isinstance(v, int) else 0 for v in values), np.uint8, len(values))
+
+
+def restored_number(value, is_int):
+    return int(value) if is_int else value
+
+
+def capture_cells(cells, physics):
+    """
+    {name: array} of every live creature and food item in cells, in order.
+    Also runs in worker processes, for the cells they own.
+    """
+    creatures = []
+    cell_creatures = []
+    food = []
+    food_ranks = []
+    cell_food = []
+
+    for cell in cells:
+        with cell.lock:
+            alive = [c for c in cell.creatures if c.isAlive]
+            creatures.extend(alive)
+            cell_creatures.append(len(alive))
+
+            food.extend(cell.food)
+            food_ranks.extend(cell.food.bucket_ranks())
+            cell_food.append(len(cell.food))
+
+    n = len(creatures)
+    slots = np.fromiter((c.slot for c in creatures), np.intp, n)
+    organs = [o for c in creatures for o in c.organs]
+
+    names, name_lengths = pack_strings([c.name for c in creatures])
+    creators, creator_lengths = pack_strings([c.creator for c in creatures])
+
+    def ints(values):
+        return np.fromiter(values, np.int64, n)
+
+    return {
+        "cell_creatures": np.array(cell_creatures, dtype=np.int64),
+        "cell_food": np.array(cell_food, dtype=np.int64),
+
+        "id": ints(c.id for c in creatures),
+        "sprite_id": ints(c.sprite_id for c in creatures),
+        "age": ints(c.age for c in creatures),
+        "mutation_rate": ints(c.mutation_rate for c in creatures),
+        "generation": ints(c.generation for c in creatures),
+        "offspringcounter": ints(c.offspringcounter for c in creatures),
+        "name": names,
+        "name_length": name_lengths,
+        "creator": creators,
+        "creator_length": creator_lengths,
+        "parent_count": ints(len(c.parent_ids) for c in creatures),
+        "parent_id": np.array([p for c in creatures for p in c.parent_ids], dtype=np.int64),
+        "body_pos": np.array([c.body_pos for c in creatures], dtype=np.float64).reshape(n, 2),
+
+        # ✅ Physics columns are sliced out of the PhysicsStore in one go
+        **{name: getattr(physics, name)[slots] for name in physics.COLUMNS},
+
+        "organ_count": ints(len(c.organs) for c in creatures),
+        "organ_type": np.fromiter((ORGAN_TYPES.index(o.type) for o in organs), np.uint8, len(organs)),
+        "organ_position": np.array([o.position for o in organs], dtype=np.float64).reshape(len(organs), 2),
+        "organ_size": np.fromiter((o.size for o in organs), np.float64, len(organs)),
+        "organ_flags": (
+            np.fromiter((ALIVE if o.isAlive else 0 for o in organs), np.uint8, len(organs))
+            | number_flags([o.position[0] for o in organs], X_INT)
+            | number_flags([o.position[1] for o in organs], Y_INT)
+            | number_flags([o.size for o in organs], SIZE_INT)
+        ),
+
+        "food_position": np.array([f.position for f in food], dtype=np.float64).reshape(len(food), 2),
+        "food_flags": (
+            number_flags([f.position[0] for f in food], X_INT) | number_flags([f.position[1] for f in food], Y_INT)
+        ),
+        "food_rank": np.array(food_ranks, dtype=np.int64)
+    }
+
+
+def merge(parts):
+    """capture_cells() of consecutive runs of cells, as one."""
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+
+def capture(world):
+    """(scalars, arrays): everything save() writes, copied out between frames on the simulation thread."""
+    from .creatures import Creature
+    from .sprites import sprites
+
+    counter = Creature.counter
+    if world.stepper is not None:
+        arrays, counters = world.stepper.checkpoint_cells()
+        counter = max([counter] + counters)
+    else:
+        arrays = capture_cells(world.cells(), world.physics)
+
+    layouts = sprites.all()
+    layout_blob, layout_lengths = pack_strings(list(layouts.values()))
+    arrays["sprite_ids"] = np.fromiter(layouts, np.int64, len(layouts))
+    arrays["layout"] = layout_blob
+    arrays["layout_length"] = layout_lengths
+
+    unused = sprites.unused_since()
+    arrays["unused_sprite_ids"] = np.fromiter(unused, np.int64, len(unused))
+    arrays["unused_since"] = np.fromiter(unused.values(), np.int64, len(unused))
+
+    version, state, gauss = world.rng.getstate()
+    scalars = {
+        "frame": world.frame,
+        "world_size": config.WORLD_SIZE,
+        "grid_cells": world.grid_cells,
+        "seed": world.seed,
+        "rng": [version, list(state), gauss],
+        "np_rng": world.np_rng.bit_generator.state,
+        "food_accumulator": world.food_accumulator,
+        "counter": counter
+    }
+    return scalars, arrays
+
+
+def save(checkpoint, path):
+    """Write a capture() to path, atomically: readers see the old file or the new one, never half of one."""
+    scalars, arrays = checkpoint
+
+    directory = {}
+    offset = 0
+    for name, array in arrays.items():
+        directory[name] = [array.dtype.str, list(array.shape), offset]
+        offset += array.nbytes + padding(array.nbytes)
+
+    header = json.dumps({**scalars, "arrays": directory}, separators=(",", ":")).encode()
+    prefix = MAGIC + struct.pack("<II", VERSION, len(header)) + header
+
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(prefix + bytes(padding(len(prefix))))
+        for array in arrays.values():
+            f.write(np.ascontiguousarray(array).data)
+            f.write(bytes(padding(array.nbytes)))
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(temporary, path)
+
+
+def restore(world, path):
+    """
+    Rebuild an empty world (before it is first stepped or published) from
+    the checkpoint at path. Raises ValueError if the file is not one this
+    world can load.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        header, arrays = parse(data, path)
+        if header["world_size"] != config.WORLD_SIZE or header["grid_cells"] != world.grid_cells:
+            raise ValueError("Checkpoint is of a world with another size or grid")
+
+        try:
+            load(world, header, arrays)
+        finally:
+            arrays.clear()  # ✅ no views into the map may outlive it
+
+
+def read(path):
+    """(header, arrays) of the checkpoint at path, copied out, without loading it into a world."""
+    with open(path, "rb") as f:
+        header, arrays = parse(f.read(), path)
+    return header, {name: array.copy() for name, array in arrays.items()}
+
+
+def parse(data, path):
+    """(header, {name: array viewing data}) of a checkpoint's bytes. Raises ValueError if they are not one."""
+    if data[:4] != MAGIC:
+        raise ValueError(f"{path} is not a checkpoint")
+    version, length = struct.unpack_from("<II", data, 4)
+    if version != VERSION:
+        raise ValueError(f"Checkpoint version {version} is not supported (expected {VERSION})")
+
+    header = json.loads(data[12:12 + length])
+    start = 12 + length + padding(12 + length)
+    arrays = {
+        name: np.frombuffer(data, dtype=np.dtype(dtype), count=int(np.prod(shape)), offset=start + offset).reshape(shape)
+        for name, (dtype, shape, offset) in header["arrays"].items()
+    }
+    return header, arrays
+
+
+def load(world, header, arrays):
+    from .creatures import Creature
+    from .food import Food
+    from .sprites import sprites
+
+    sprites.update(zip(arrays["sprite_ids"].tolist(), unpack_strings(arrays["layout"], arrays["layout_length"])))
+
+    names = unpack_strings(arrays["name"], arrays["name_length"])
+    creators = unpack_strings(arrays["creator"], arrays["creator_length"])
+    parents = np.split(arrays["parent_id"], np.cumsum(arrays["parent_count"])[:-1]) if len(names) else []
+
+    organ_starts = np.concatenate(([0], np.cumsum(arrays["organ_count"]))).tolist()
+    organs = [
+        (ORGAN_TYPES[t], [restored_number(x, flags & X_INT), restored_number(y, flags & Y_INT)],
+         restored_number(size, flags & SIZE_INT), bool(flags & ALIVE))
+        for t, (x, y), size, flags in zip(arrays["organ_type"].tolist(), arrays["organ_position"].tolist(),
+                                           arrays["organ_size"].tolist(), arrays["organ_flags"].tolist())
+    ]
+
+    creatures = [
+        Creature.rebuild(id, name, age, mutation_rate, creator, parent_ids.tolist(), generation, offspringcounter,
+                         organs[organ_starts[i]:organ_starts[i + 1]], body_pos, sprite_id)
+        for i, (id, name, age, mutation_rate, creator, parent_ids, generation, offspringcounter, body_pos, sprite_id)
+        in enumerate(zip(arrays["id"].tolist(), names, arrays["age"].tolist(), arrays["mutation_rate"].tolist(),
+                         creators, parents, arrays["generation"].tolist(), arrays["offspringcounter"].tolist(),
+                         arrays["body_pos"].tolist(), arrays["sprite_id"].tolist()))
+    ]
+
+    # ✅ Physics columns go back into the PhysicsStore in one go
+    slots = np.fromiter((c.slot for c in creatures), np.intp, len(creatures))
+    for name in world.physics.COLUMNS:
+        getattr(world.physics, name)[slots] = arrays[name]
+
+    food = [
+        Food([restored_number(x, flags & X_INT), restored_number(y, flags & Y_INT)])
+        for (x, y), flags in zip(arrays["food_position"].tolist(), arrays["food_flags"].tolist())
+    ]
+    food_ranks = arrays["food_rank"].tolist()
+
+    creature_ends = np.cumsum(arrays["cell_creatures"]).tolist()
+    food_ends = np.cumsum(arrays["cell_food"]).tolist()
+    for cell, creature_end, creature_count, food_end, food_count in zip(
+            world.cells(), creature_ends, arrays["cell_creatures"].tolist(), food_ends, arrays["cell_food"].tolist()):
+        for creature in creatures[creature_end - creature_count:creature_end]:
+            cell.add(creature, log_spawn=False)
+
+        with cell.lock:
+            for f in food[food_end - food_count:food_end]:
+                cell.food.add(f)
+                f.cell = cell
+            cell.food.order_buckets(food_ranks[food_end - food_count:food_end])
+
+    # ✅ After the creatures have acquired theirs: what is left unused carries on with its grace period
+    sprites.restore_unused(dict(zip(arrays["unused_sprite_ids"].tolist(), arrays["unused_since"].tolist())), header["frame"])
+
+    world.frame = header["frame"]
+    world.seed = header["seed"]
+    version, state, gauss = header["rng"]
+    world.rng.setstate((version, tuple(state), gauss))
+    world.np_rng.bit_generator.state = header["np_rng"]
+    world.food_accumulator = header["food_accumulator"]
+    Creature.counter = header["counter"]
+
+
+class Checkpointer:
+    """
+    Saves a checkpoint every interval frames. The state is captured on the
+    simulation thread (tick(), after each frame) and written on a thread of
+    its own; a checkpoint falls due while the last is still being written
+    is skipped. Nothing that goes wrong with a checkpoint stops the
+    simulation: failures are logged, and the next one is tried as usual.
+    """
+
+    def __init__(self, world, path, interval):
+        self.world = world
+        self.path = path
+        self.interval = interval
+        self.writer = None
+
+    def tick(self):
+        frame = self.world.frame
+        if not self.interval or frame == 0 or frame % self.interval:
+            return
+        if self.writer is not None and self.writer.is_alive():
+            if config.PRINT: print(f"⚠️ Checkpoint at frame {frame} skipped: the last one is still being written")
+            return
+
+        try:
+            checkpoint = capture(self.world)
+        except Exception:
+            log.exception("Checkpoint at frame %d not captured", frame)
+            return
+
+        self.writer = threading.Thread(target=self._write, args=(checkpoint, frame), daemon=True)
+        self.writer.start()
+
+    def _write(self, checkpoint, frame):
+        try:
+            save(checkpoint, self.path)
+        except Exception:
+            # ✅ Disk full, unwritable path, a value that will not encode...: the old checkpoint stays
+            log.exception("Checkpoint at frame %d not written to %s", frame, self.path)
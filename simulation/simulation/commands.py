@@ -0,0 +1,42 @@
+import threading
+from concurrent.futures import Future
+
+
+class CommandQueue:
+    """
+    World mutations waiting for the simulation thread. Any thread may push;
+    only the simulation thread drains, once per tick (see World.apply_commands),
+    so nothing is added to or removed from a cell while it is being stepped.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = []
+
+    def __len__(self):
+        return len(self.pending)
+
+    def push(self, kind, payload, future=None):
+        with self.lock:
+            self.pending.append((kind, payload, future))
+        return future
+
+    def push_many(self, kind, payloads):
+        """Queue one command per payload under a single lock. Returns their futures."""
+        futures = [Future() for _ in payloads]
+
+        with self.lock:
+            self.pending.extend((kind, payload, future) for payload, future in zip(payloads, futures))
+
+        return futures
+
+    def drain(self):
+        """Yield every queued command, including any queued while draining."""
+        while True:
+            with self.lock:
+                batch, self.pending = self.pending, []
+
+            if not batch:
+                return
+
+            yield from batch
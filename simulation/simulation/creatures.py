@@ -1,6 +1,8 @@
-import random
 import math
 from .organs import Organ
+from .world import world
+from . import deltas
+from .sprites import sprites, render_svg
 import threading
 import string
 
@@ -9,24 +11,34 @@ import os
 from simulation.config import *
 
 
-sprite_lock = threading.Lock()
-
-
 class Creature:
 
     ORGANS = ["mouth", "eye", "flipper", "spike"]
     MAX_ORGANS = 5
     counter = 0
+    id_stride = 1  # creature ids step by this, see use_id_lane()
 
-    sprite_map = {}  # {sprite_id: serialized_organs}
-    sprite_counter = 0  # For assigning unique sprite IDs
-    sprite_lock = threading.Lock()
+    sprites = sprites  # {sprite_id: serialized_organs}, see SpriteRegistry
 
     creatures = []  # ✅ Static list for all creatures
     creatures_lock = threading.Lock()  # ✅ Thread-safe locking
 
     force_log = {}
 
+    @classmethod
+    def use_id_lane(cls, lane, lanes, counter=None):
+        """
+        Hand out creature ids from lane `lane` of `lanes`: every id
+        is congruent to lane mod lanes. Processes stepping parts of the same
+        world each take their own lane, so their ids never collide.
+        """
+        def first_in_lane(start):
+            start = ((start + lanes - 1) // lanes) * lanes
+            return start + lane
+
+        cls.id_stride = lanes
+        cls.counter = first_in_lane(cls.counter if counter is None else counter)
+
     @classmethod
     def get_creature_count(cls):
         with cls.creatures_lock:
@@ -291,10 +303,25 @@ class Creature:
 
 
     def __init__(self, position=None, mutation_rate=1, creator=None, name=None, organs=None):
+        # ✅ Physics state lives in a slot of the world's PhysicsStore
+        self.physics = world.physics
+        self.slot = self.physics.allocate(self)
+
         self.id = Creature.counter
-        Creature.counter += 1
+        Creature.counter += Creature.id_stride
+
+        try:
+            self._setup(position, mutation_rate, creator, name, organs)
+        except Exception:
+            # ✅ Bad payload (unknown organ type, malformed position...): give back the slot and the id
+            self.physics.release(self.slot)
+            Creature.counter -= Creature.id_stride
+            raise
+
+    def _setup(self, position, mutation_rate, creator, name, organs):
+        """The rest of __init__, once the creature has a slot and an id."""
         self.name = name if name else f"Creature_{self.id}"
-        self.position = position[:] if position else [random.randint(1,500), random.randint(1,500)] # Now represents the center of mass
+        self.position = position[:] if position is not None else [world.rng.randint(1,500), world.rng.randint(1,500)] # Now represents the center of mass
         self.energy = 50
         self.age = 0
         self.mutation_rate = mutation_rate
@@ -304,15 +331,17 @@ class Creature:
         self.direction = 0  # radians
         self.isAlive = True
         self.organs = []
-        from .world import world
-        self.cell = world.cell_grid[0][0]
+        self.sprite_id = None
 
         self.velocity = [0, 0]
         self.angular_velocity = 0
 
-        self.last_sent_x = self.position[0]
-        self.last_sent_y = self.position[1]
-        self.last_sent_direction = self.direction
+        # ✅ Per-frame transform cache (see refresh_transform)
+        self.transform_valid = False
+        self.rotation = (1.0, 0.0)
+        self.body_world = [0.0, 0.0]
+
+        self.physics.last_sent[self.slot] = (self.position[0], self.position[1], self.direction)
 
         self.offspringcounter = 1
 
@@ -353,6 +382,9 @@ class Creature:
         self.position[0] += self.body_pos[0]
         self.position[1] += self.body_pos[1]
 
+        # ✅ Belongs to the cell it stands in (Cell.add confirms this)
+        self.cell = world.cell_at(self.position)
+
         # ✅ Validate organ layout
         if not self.validate_organs():
             self.die()
@@ -361,8 +393,11 @@ class Creature:
         # ✅ Now recalculate rotational inertia (based on new COM-relative organ positions)
         self.rotational_inertia = self.calculate_rotational_inertia()
 
+        # ✅ Bounding radius for the collision broadphase
+        self.radius = self.calculate_radius()
+
         # ✅ Sprite generation (after validation and adjustment)
-        self.sprite_id = self.compute_sprite_id()
+        self.update_sprite()
 
         if PRINT:
             
@@ -373,6 +408,66 @@ class Creature:
 
                 print(f"✅ organ_pos: {organ.position}")
 
+    # ---- Views into the PhysicsStore slot ----
+
+    @property
+    def position(self):
+        return self.physics.position[self.slot]
+
+    @position.setter
+    def position(self, value):
+        self.physics.position[self.slot] = value
+        self.transform_valid = False
+
+    @property
+    def velocity(self):
+        return self.physics.velocity[self.slot]
+
+    @velocity.setter
+    def velocity(self, value):
+        self.physics.velocity[self.slot] = value
+
+    @property
+    def direction(self):
+        return float(self.physics.direction[self.slot])
+
+    @direction.setter
+    def direction(self, value):
+        self.physics.direction[self.slot] = value
+        self.transform_valid = False
+
+    @property
+    def angular_velocity(self):
+        return float(self.physics.angular_velocity[self.slot])
+
+    @angular_velocity.setter
+    def angular_velocity(self, value):
+        self.physics.angular_velocity[self.slot] = value
+
+    @property
+    def mass(self):
+        return float(self.physics.mass[self.slot])
+
+    @mass.setter
+    def mass(self, value):
+        self.physics.mass[self.slot] = value
+
+    @property
+    def rotational_inertia(self):
+        return float(self.physics.inertia[self.slot])
+
+    @rotational_inertia.setter
+    def rotational_inertia(self, value):
+        self.physics.inertia[self.slot] = value
+
+    @property
+    def energy(self):
+        return float(self.physics.energy[self.slot])
+
+    @energy.setter
+    def energy(self, value):
+        self.physics.energy[self.slot] = value
+
     def print_info(self):
         print(f"\n📘 Creature Info: {self.name} (ID: {self.id})")
         print(f"├── Alive: {self.isAlive}")
@@ -451,58 +546,31 @@ class Creature:
         return f"body,{bx},{by}|{organ_str}"
 
 
+    def update_sprite(self):
+        """Recompute sprite_id from the current layout, moving this creature's use over to the new id."""
+        sprite_id = self.compute_sprite_id()
+        if sprite_id == self.sprite_id:
+            return
+
+        if self.isAlive:
+            Creature.sprites.acquire(sprite_id)
+            Creature.sprites.release(self.sprite_id)
+        self.sprite_id = sprite_id
+
     def compute_sprite_id(self):
         """Assign or reuse sprite ID based on serialized organ layout, and optionally generate SVG."""
         serialized = self.serialize_organs()
 
-        with sprite_lock:
-            for sid, layout in Creature.sprite_map.items():
-                if layout == serialized:
-                    return sid  # ✅ Reuse existing layout
-
-            sprite_id = Creature.sprite_counter
-            Creature.sprite_map[sprite_id] = serialized
-            Creature.sprite_counter += 1
+        sprite_id, created = Creature.sprites.id_for(serialized)
+        if not created:
+            return sprite_id  # ✅ Reuse existing layout
         
         if SVG:
 
             # ✅ Create SVG visualization
-            svg = []
-            canvas_size = 150
-            half = canvas_size // 2
-
-            svg.append(f'<svg xmlns="http://www.w3.org/2000/svg" width="{canvas_size}" height="{canvas_size}" viewBox="{-half} {-half} {canvas_size} {canvas_size}">')
-
-            bx, by = self.body_pos if hasattr(self, 'body_pos') else (0, 0)
-
-            # ➤ Draw connection lines first
-            for organ in self.organs:
-                if getattr(organ, 'isAlive', True):
-                    ox, oy = organ.position
-                    svg.append(f'<line x1="{bx}" y1="{by}" x2="{ox}" y2="{oy}" stroke="black" stroke-width="1"/>')
-
-            # ➤ Draw body center
-            svg.append(f'<circle cx="{bx}" cy="{by}" r="{BODY_RADIUS}" fill="blue" stroke="black" stroke-width="1"/>')
-
-            # ➤ Draw organs
-            for organ in self.organs:
-                if getattr(organ, 'isAlive', True):
-                    ox, oy = organ.position
-                    r = organ.size
-                    color = {
-                        "mouth": "yellow",
-                        "eye": "white",
-                        "flipper": "orange",
-                        "spike": "red"
-                    }.get(organ.type, "gray")
-
-                    svg.append(f'<circle cx="{ox}" cy="{oy}" r="{r}" fill="{color}" stroke="black" stroke-width="1"/>')
-
-            svg.append('</svg>')
-
             os.makedirs("sprites", exist_ok=True)
             with open(f"sprites/sprite_{sprite_id}.svg", "w") as f:
-                f.write("\n".join(svg))
+                f.write(render_svg(serialized, BODY_RADIUS))
 
         return sprite_id
     
@@ -542,8 +610,48 @@ class Creature:
         inertia += body_mass * (r_body ** 2)
 
         return inertia if inertia > 0 else 1
+
+    def calculate_radius(self):
+        """Radius around the center of mass that encloses the body and every living organ."""
+
+        radius = math.hypot(self.body_pos[0], self.body_pos[1]) + BODY_RADIUS
+
+        for organ in self.organs:
+            if not organ.isAlive: continue
+            radius = max(radius, math.hypot(organ.position[0], organ.position[1]) + organ.size)
+
+        return radius
     
     
+    def refresh_transform(self, cos_theta=None, sin_theta=None):
+        """Cache this frame's rotation and the world positions of the body and living organs."""
+
+        if cos_theta is None:
+            cos_theta = math.cos(self.direction)
+            sin_theta = math.sin(self.direction)
+
+        px, py = self.position.tolist()
+
+        bx, by = self.body_pos
+        self.rotation = (cos_theta, sin_theta)
+        self.body_world = [px + bx * cos_theta - by * sin_theta, py + bx * sin_theta + by * cos_theta]
+
+        for organ in self.organs:
+            if not organ.isAlive: continue
+            ox, oy = organ.position
+            organ.world_position = [px + ox * cos_theta - oy * sin_theta, py + ox * sin_theta + oy * cos_theta]
+
+        self.transform_valid = True
+
+    def invalidate_transform(self):
+        """Mark the cached transform stale, e.g. after an organ dies or the layout mutates."""
+        self.transform_valid = False
+
+    def get_body_position(self):
+        if not self.transform_valid:
+            self.refresh_transform()
+        return self.body_world
+
     def apply_force(self, angle, magnitude, world_position):
         """Apply force in world space, using center-of-mass as origin."""
 
@@ -586,7 +694,7 @@ class Creature:
 
     
     def random_direction(self):
-        angle = random.uniform(0, 2 * math.pi)
+        angle = world.rng.uniform(0, 2 * math.pi)
         return angle
 
     def move(self):
@@ -600,71 +708,13 @@ class Creature:
             organ.simulate()
 
     def update_position(self):
-        """Apply stored velocity & rotation to move creature each frame."""
-        import math
-        from simulation.simulation.world import world
-        frame_count = world.get_frame()
-
-        # ✅ Move using full float precision
-        self.position[0] = (self.position[0] + self.velocity[0]) % 500
-        self.position[1] = (self.position[1] + self.velocity[1]) % 500
+        """Apply stored velocity & rotation to move this creature one frame.
 
-        if self.id == 0 and False:
-        
-            print (world.get_frame(), self.position, self.direction)
-
-        # ✅ Update direction, normalize, and clamp angle
-        self.direction = (self.direction + self.angular_velocity) % (2 * math.pi)
-
-
-        # ✅ Log movement only distance from last sent position over threshold
+        Cells integrate their whole population in one vectorised step
+        (Cell.integrate); this is the single-creature version of that.
+        """
         if self.cell:
-            dx = abs(self.position[0] - self.last_sent_x)
-            dy = abs(self.position[1] - self.last_sent_y)
-            dtheta = abs(self.direction - self.last_sent_direction)
-
-            # Wrap direction diff to [0, π] if needed
-            if dtheta > math.pi:
-                dtheta = 2 * math.pi - dtheta
-
-            parts = []
-            if dx > 0.5:
-                parts.append(f"x{round(self.position[0], 1)}")
-                self.last_sent_x = self.position[0]
-            if dy > 0.5:
-                parts.append(f"y{round(self.position[1], 1)}")
-                self.last_sent_y = self.position[1]
-            if dtheta > 0.005:
-                parts.append(f"d{round(self.direction, 3)}")
-                self.last_sent_direction = self.direction
-
-            if parts:
-                move_str = f"m[{self.id}," + ",".join(parts) + "],"
-                delta = self.cell.get_current_delta()
-                with self.cell.lock:
-                    delta["creatures"] += move_str
-                    
-
-                # ✅ Apply friction periodically
-                if frame_count % FRICTION_STEP == 0:
-                    self.velocity[0] *= FRICTION
-                    self.velocity[1] *= FRICTION
-                    self.angular_velocity *= ANGULAR_FRICTION
-
-            # ✅ Kill if spinning too fast
-            if abs(self.angular_velocity) > MAX_AV:
-                self.die()
-
-        # ✅ Energy drain
-        self.energy -= BMR
-        if self.energy <= 0:
-            self.die()
-
-        # ✅ Optionally: Snap to integer *after* logic for visuals only
-        #self.position[0] = round(self.position[0])
-        #self.position[1] = round(self.position[1])
-
-
+            self.cell.integrate([self])
 
     def reproduce(self):
         """Creates a new creature by cloning, with passive mutations (e.g., organs mutate on copy)."""
@@ -684,16 +734,21 @@ class Creature:
             organs=[organ.copy() for organ in self.organs if organ.isAlive]
         )
 
+        # ✅ A layout that no longer validates dies in __init__ and has already given up its physics slot
+        if not offspring.isAlive:
+            return None
+
         for organ in offspring.organs:
             organ.set_parent(offspring)
 
         # Spawn nearby
-        angle = random.uniform(0, 2 * math.pi)
+        angle = world.rng.uniform(0, 2 * math.pi)
         offset_x = math.cos(angle) * 100
         offset_y = math.sin(angle) * 100
 
         offspring.position[0] = (self.position[0] + offset_x) % 500
         offspring.position[1] = (self.position[1] + offset_y) % 500
+        offspring.invalidate_transform()
 
         # Inherit traits
         offspring.generation = self.generation + 1
@@ -705,8 +760,6 @@ class Creature:
         offspring.name = self.name
         self.offspringcounter += 1
 
-        offspring.isAlive = True
-
         offspring.mutate()
 
         return offspring
@@ -714,29 +767,44 @@ class Creature:
 
 
     def die(self):
-        """Handle creature death by spawning food proportionate to its energy."""
+        """
+        Stop the creature now. Leaving its cell and dropping food wait for the
+        world's command queue (see bury), so no cell's creature list changes
+        while it is being stepped.
+        """
+        if not self.isAlive:
+            return
+
         if PRINT:
             print(f"💀 Creature {self.id} has died.")
 
+        # ✅ Free the shared physics slot; the dead creature keeps a private copy
+        self.physics, self.slot = self.physics.detach(self.slot)
+        self.isAlive = False
+        Creature.sprites.release(self.sprite_id)
+
+        world.commands.push("death", self)
+
+    def bury(self):
+        """Handle creature death by spawning food proportionate to its energy."""
         num_food = int(math.floor(self.energy / 25))  # How much food to spawn
 
         if self.cell:
                 
             for _ in range(num_food):
-                offset_x = random.randint(-10, 10)
-                offset_y = random.randint(-10, 10)
+                offset_x = world.rng.randint(-10, 10)
+                offset_y = world.rng.randint(-10, 10)
 
                 food_x = min(max(self.position[0] + offset_x, 0), 499)
                 food_y = min(max(self.position[1] + offset_y, 0), 499)
 
                 from simulation.simulation.food import Food  # safe here to avoid circular imports
                 food = Food([int(food_x), int(food_y)])
-                self.cell.add(food)  # ✅ uses delta-logging add()
+                world.add_food(food)  # ✅ into whichever cell it lands in, with delta logging
 
             self.cell.remove(self)  # ✅ remove self with delta logging
 
         self.cell = None
-        self.isAlive = False
 
     def mutate(self):
         """Applies mutations based on mutation rate."""
@@ -746,10 +814,10 @@ class Creature:
         mutation_options = ["organs", "mutation_rate"]
 
         for _ in range(num_mutations):
-            mutation_type = random.choice(mutation_options)
+            mutation_type = world.rng.choice(mutation_options)
 
             if mutation_type == "mutation_rate":
-                self.mutation_rate = random.randint(1, max(1, self.mutation_rate + random.randint(-1, 1)))
+                self.mutation_rate = world.rng.randint(1, max(1, self.mutation_rate + world.rng.randint(-1, 1)))
 
 
             elif mutation_type == "organs":
@@ -763,7 +831,7 @@ class Creature:
             return
 
         # ✅ Recompute sprite_id because organs may have changed
-        self.sprite_id = self.compute_sprite_id()
+        self.update_sprite()
 
         # Recompute physics variables
         self.mass = self.calculate_mass()
@@ -772,12 +840,14 @@ class Creature:
 
         self.rotational_inertia = self.calculate_rotational_inertia()
 
+        self.radius = self.calculate_radius()
+
+        self.invalidate_transform()
+
     def change_energy(self, amount):
         self.energy += amount
         if self.cell:
-            delta = self.cell.get_current_delta()
-            
-            delta["creatures"] += (f"e[{self.id},{self.energy}]")
+            self.cell.log_record(deltas.ENERGY, self.id, a=self.energy)
 
     def mutate_organs(self):
         """Randomly add, delete, or modify an organ."""
@@ -791,32 +861,32 @@ class Creature:
         if not actions:
             return  # No valid actions
 
-        action = random.choice(actions)
+        action = world.rng.choice(actions)
 
         if action == "add":
-            organ_type = random.choice(Creature.ORGANS)
-            position = [random.randint(-30, 30), random.randint(-30, 30)]  # Pixel coordinates
-            size = random.randint(5, 15)  # Sizes in pixels
+            organ_type = world.rng.choice(Creature.ORGANS)
+            position = [world.rng.randint(-30, 30), world.rng.randint(-30, 30)]  # Pixel coordinates
+            size = world.rng.randint(5, 15)  # Sizes in pixels
 
             new_organ = Organ.create_organ(organ_type, position, size, parent=self)
             self.organs.append(new_organ)
             if PRINT: print(f"🧬 {self.id}: Added organ {organ_type} at {position} size {size}")
 
         elif action == "delete":
-            removed_organ = self.organs.pop(random.randint(0, len(self.organs) - 1))
+            removed_organ = self.organs.pop(world.rng.randint(0, len(self.organs) - 1))
             if PRINT: print(f"🗑️ {self.id}: Removed organ {removed_organ.type} at {removed_organ.position}")
 
         elif action == "modify":
-            organ = random.choice(self.organs)
+            organ = world.rng.choice(self.organs)
             old_position = organ.position[:]
             old_size = organ.size
 
             # Mutate position slightly (±5 pixels)
-            organ.position[0] += random.randint(-5, 5)
-            organ.position[1] += random.randint(-5, 5)
+            organ.position[0] += world.rng.randint(-5, 5)
+            organ.position[1] += world.rng.randint(-5, 5)
 
             # Mutate size slightly (±3 pixels), but not smaller than 1
-            organ.size = max(1, organ.size + random.randint(-3, 3))
+            organ.size = max(1, organ.size + world.rng.randint(-3, 3))
 
             if PRINT: print(f"🔧 {self.id}: Modified organ {organ.type} from position {old_position}, size {old_size} "
                 f"to position {organ.position}, size {organ.size}")
@@ -824,35 +894,130 @@ class Creature:
     def mutate_name(self):
         name_list = list(self.name)
 
-        mutation_type = random.choice(['add', 'delete', 'change', 'case'])
+        mutation_type = world.rng.choice(['add', 'delete', 'change', 'case'])
 
         # Enforce limits
         if len(name_list) >= 10:
-            mutation_type = random.choice(['delete', 'change', 'case'])
+            mutation_type = world.rng.choice(['delete', 'change', 'case'])
         elif len(name_list) <= 1:
-            mutation_type = random.choice(['add', 'change', 'case'])
+            mutation_type = world.rng.choice(['add', 'change', 'case'])
 
         if mutation_type == 'add':
-            pos = random.randint(0, len(name_list))
-            new_char = random.choice(string.ascii_lowercase)
+            pos = world.rng.randint(0, len(name_list))
+            new_char = world.rng.choice(string.ascii_lowercase)
             name_list.insert(pos, new_char)
 
         elif mutation_type == 'delete':
-            pos = random.randint(0, len(name_list) - 1)
+            pos = world.rng.randint(0, len(name_list) - 1)
             del name_list[pos]
 
         elif mutation_type == 'change':
-            pos = random.randint(0, len(name_list) - 1)
-            new_char = random.choice(string.ascii_lowercase)
+            pos = world.rng.randint(0, len(name_list) - 1)
+            new_char = world.rng.choice(string.ascii_lowercase)
             name_list[pos] = new_char
 
         elif mutation_type == 'case':
-            pos = random.randint(0, len(name_list) - 1)
+            pos = world.rng.randint(0, len(name_list) - 1)
             c = name_list[pos]
             name_list[pos] = c.upper() if c.islower() else c.lower()
 
         self.name = ''.join(name_list)
 
+    def to_record(self):
+        """Everything needed to rebuild this creature in another process (see from_record)."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "position": self.position.tolist(),
+            "velocity": self.velocity.tolist(),
+            "direction": self.direction,
+            "angular_velocity": self.angular_velocity,
+            "energy": self.energy,
+            "mass": self.mass,
+            "rotational_inertia": self.rotational_inertia,
+            "last_sent": self.physics.last_sent[self.slot].tolist(),
+            "age": self.age,
+            "mutation_rate": self.mutation_rate,
+            "creator": self.creator,
+            "parent_ids": self.parent_ids,
+            "generation": self.generation,
+            "offspringcounter": self.offspringcounter,
+            "body_pos": list(self.body_pos),
+            "organs": [(o.type, list(o.position), o.size, o.isAlive) for o in self.organs],
+            "sprite_id": self.sprite_id,
+            "layout": Creature.sprites.get(self.sprite_id)
+        }
+
+    @classmethod
+    def from_record(cls, record):
+        """
+        Rebuild a creature from to_record() into this process's world. Unlike
+        __init__ nothing is re-centred or re-validated: the creature carries on
+        exactly where it left off.
+        """
+        if record["layout"] is not None:
+            Creature.sprites.add(record["sprite_id"], record["layout"])
+
+        creature = cls.rebuild(
+            record["id"], record["name"], record["age"], record["mutation_rate"], record["creator"],
+            record["parent_ids"], record["generation"], record["offspringcounter"],
+            record["organs"], record["body_pos"], record["sprite_id"]
+        )
+
+        creature.position = record["position"]
+        creature.velocity = record["velocity"]
+        creature.direction = record["direction"]
+        creature.angular_velocity = record["angular_velocity"]
+        creature.energy = record["energy"]
+        creature.mass = record["mass"]
+        creature.rotational_inertia = record["rotational_inertia"]
+        creature.physics.last_sent[creature.slot] = record["last_sent"]
+
+        return creature
+
+    @classmethod
+    def rebuild(cls, id, name, age, mutation_rate, creator, parent_ids, generation, offspringcounter,
+                organs, body_pos, sprite_id):
+        """
+        A live creature with the given identity and organs ((type, position,
+        size, alive) each) in a fresh physics slot, which the caller fills in
+        (from_record, checkpoint.restore). Its sprite layout must already be
+        registered.
+        """
+        creature = cls.__new__(cls)
+        creature.physics = world.physics
+        creature.slot = creature.physics.allocate(creature)
+
+        creature.id = id
+        creature.name = name
+        creature.age = age
+        creature.mutation_rate = mutation_rate
+        creature.creator = creator
+        creature.parent_ids = list(parent_ids)
+        creature.generation = generation
+        creature.offspringcounter = offspringcounter
+        creature.isAlive = True
+        creature.cell = None
+
+        creature.organs = []
+        for organ_type, position, size, alive in organs:
+            organ = Organ.create_organ(organ_type, list(position), size, parent=creature)
+            organ.isAlive = alive
+            creature.organs.append(organ)
+
+        creature.body_pos = list(body_pos)
+        creature.transform_valid = False
+        creature.rotation = (1.0, 0.0)
+        creature.body_world = [0.0, 0.0]
+
+        creature.radius = creature.calculate_radius()
+
+        # ✅ Keep the sprite id it was given; it is the hash of the layout it carries
+        creature.sprite_id = sprite_id
+        Creature.sprites.acquire(sprite_id)
+
+        return creature
+
     def to_dict(self):
-        return {"id": self.id, "name": self.name, "position": self.position, "direction": self.direction, "sprite_id": self.sprite_id, "energy": round(self.energy), "isAlive": self.isAlive, "parent_ids": self.parent_ids, "creator": self.creator}
+        return {"id": self.id, "name": self.name, "position": self.position.tolist(), "direction": self.direction, "sprite_id": self.sprite_id, "energy": round(self.energy), "isAlive": self.isAlive, "parent_ids": self.parent_ids, "creator": self.creator}
 
@@ -0,0 +1,299 @@
+"""
+Typed delta records.
+
+Every change a cell logs (a creature moving, spawning, dying, food appearing
+or being eaten, ...) is one record in a DeltaBlock: a set of preallocated
+numpy columns that are only ever appended to. Nothing is formatted while
+the simulation runs; encode() turns a range of records into the wire
+strings (/getdeltas, /getfull, the push stream) when someone asks for them.
+
+    kind          id           a          b          c          payload
+    SPAWN         creature     -          -          -          spawn dict
+    MOVE          creature     x or nan   y or nan   d or nan   -
+    REMOVE        creature     -          -          -          -
+    ORGAN_DEATH   creature     sprite id  -          -          -
+    ENERGY        creature     energy     -          -          -
+    FOOD_ADD      -            x          y          -          -
+    FOOD_REMOVE   -            x          y          -          -
+    MIGRATE_OUT   creature     -          -          -          -
+    MIGRATE_IN    creature     -          -          -          spawn dict
+    FOOD_BATCH    count        -          -          -          (count, 2) x, y array
+
+A FOOD_BATCH is a whole batch of spawned food (Cell.add_food_batch) in one
+record. Readers see it as the FOOD_ADD records it stands for: encode() and
+expand_batches() write it out as those.
+"""
+import itertools
+import json
+import math
+import numpy as np
+
+SPAWN, MOVE, REMOVE, ORGAN_DEATH, ENERGY, FOOD_ADD, FOOD_REMOVE, MIGRATE_OUT, MIGRATE_IN, FOOD_BATCH = range(10)
+FOOD_KINDS = (FOOD_ADD, FOOD_REMOVE, FOOD_BATCH)
+
+NAN = float("nan")
+COLUMNS = (("frame", np.int64), ("kind", np.uint8), ("id", np.int64), ("a", np.float64),
+           ("b", np.float64), ("c", np.float64), ("ref", np.int32))
+
+
+class DeltaBlock:
+    """
+    One cell's records for one delta block, in the order they were logged.
+    Records are never changed once written, so a reader that remembers
+    count can keep reading the first count records while more are appended.
+    Running out of room doubles the columns; earlier records are copied over.
+    """
+
+    def __init__(self, capacity):
+        for name, dtype in COLUMNS:
+            setattr(self, name, np.empty(capacity, dtype=dtype))
+        self.payloads = []
+        self.count = 0
+        self.generation = 0  # bumped by clear(), so a copy can tell whether it still has the same records
+
+        # Finished frames' wire strings, {frame: encode(...)}, filled by readers
+        self.encoded = {}
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        """Start over. Readers never hold a block that is cleared: snapshots copy them (snapshot.log_copy)."""
+        self.count = 0
+        self.payloads = []
+        self.encoded = {}
+        self.generation += 1
+
+    def _reserve(self, n):
+        needed = self.count + n
+        capacity = len(self.frame)
+        if needed <= capacity:
+            return
+
+        while capacity < needed:
+            capacity *= 2
+
+        for name, dtype in COLUMNS:
+            column = np.empty(capacity, dtype=dtype)
+            column[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, column)
+
+    def append(self, frame, kind, id=0, a=NAN, b=NAN, c=NAN, payload=None):
+        self._reserve(1)
+        i = self.count
+
+        self.frame[i] = frame
+        self.kind[i] = kind
+        self.id[i] = id
+        self.a[i] = a
+        self.b[i] = b
+        self.c[i] = c
+        if payload is not None:
+            self.ref[i] = len(self.payloads)
+            self.payloads.append(payload)
+        else:
+            self.ref[i] = -1
+
+        self.count = i + 1
+
+    def append_many(self, frame, kind, ids=0, a=NAN, b=NAN, c=NAN, n=None):
+        """Append n records of one kind; the column arguments are arrays or scalars."""
+        if n is None:
+            n = len(ids)
+        if n == 0:
+            return
+
+        self._reserve(n)
+        lo, hi = self.count, self.count + n
+
+        self.frame[lo:hi] = frame
+        self.kind[lo:hi] = kind
+        self.id[lo:hi] = ids
+        self.a[lo:hi] = a
+        self.b[lo:hi] = b
+        self.c[lo:hi] = c
+        self.ref[lo:hi] = -1
+
+        self.count = hi
+
+    def frame_range(self, frame, count=None):
+        """(lo, hi) of frame's records among the first count."""
+        frames = self.frame[:self.count if count is None else count]
+        return int(np.searchsorted(frames, frame, "left")), int(np.searchsorted(frames, frame, "right"))
+
+    def first_at(self, frame, count=None):
+        """Index of the first record logged in or after frame, among the first count."""
+        return int(np.searchsorted(self.frame[:self.count if count is None else count], frame, "left"))
+
+    def export(self, lo=0, hi=None):
+        """A picklable copy of records lo..hi, for DeltaBlock.extend in another process."""
+        hi = self.count if hi is None else hi
+        columns = tuple(getattr(self, name)[lo:hi].copy() for name, _ in COLUMNS)
+
+        refs = columns[-1]
+        payloads = [self.payloads[r] for r in refs[refs >= 0].tolist()]
+        return columns, payloads
+
+    def extend(self, exported):
+        columns, payloads = exported
+        n = len(columns[0])
+        if n == 0:
+            return
+
+        self._reserve(n)
+        lo, hi = self.count, self.count + n
+
+        for (name, _), values in zip(COLUMNS, columns):
+            getattr(self, name)[lo:hi] = values
+
+        # Payload references are renumbered into this block's list
+        refs = self.ref[lo:hi]
+        has_payload = refs >= 0
+        refs[has_payload] = np.arange(len(self.payloads), len(self.payloads) + len(payloads))
+        self.payloads.extend(payloads)
+
+        self.count = hi
+
+    def catch_up(self, block, count):
+        """
+        Make this block's records the first count of block, whose first
+        records are the ones this already has (snapshot.log_copy). Payload
+        references stay as they are: the payload lists line up too.
+        """
+        lo = self.count
+        if count <= lo:
+            return
+
+        self._reserve(count - lo)
+        for name, _ in COLUMNS:
+            getattr(self, name)[lo:count] = getattr(block, name)[lo:count]
+        self.payloads.extend(block.payloads[len(self.payloads):])
+
+        self.count = count
+
+    def kinds(self, lo=0, hi=None):
+        return set(self.kind[lo:self.count if hi is None else hi].tolist())
+
+
+def number(value):
+    """Food coordinates are whole numbers; print them without a trailing .0."""
+    return int(value) if value.is_integer() else value
+
+
+def batch_positions(block, ref, inside=None):
+    """A FOOD_BATCH record's (n, 2) positions; with inside (Viewport.contains), only those it keeps."""
+    xy = block.payloads[ref]
+    if inside is not None:
+        xy = xy[inside(xy[:, 0], xy[:, 1])]
+    return xy
+
+
+def expand_batches(block, lo, hi, keep=None, inside=None):
+    """
+    Columns (as COLUMNS) of records lo..hi that keep (a boolean per record)
+    leaves in, with every FOOD_BATCH written out as one FOOD_ADD per
+    position (per position inside, when given). Copies.
+    """
+    columns = [getattr(block, name)[lo:hi] for name, _ in COLUMNS]
+    if keep is not None:
+        columns = [column[keep] for column in columns]
+
+    kind, refs = columns[1], columns[-1]
+    batches = np.flatnonzero(kind == FOOD_BATCH)
+    if not len(batches):
+        return [column.copy() for column in columns]
+
+    xy = [batch_positions(block, ref, inside) for ref in refs[batches].tolist()]
+    counts = np.ones(len(kind), dtype=np.intp)
+    counts[batches] = [len(positions) for positions in xy]
+
+    expanded = np.repeat(kind == FOOD_BATCH, counts)
+    columns = [np.repeat(column, counts) for column in columns]
+    if expanded.any():
+        xy = np.concatenate(xy)
+        columns[1][expanded] = FOOD_ADD
+        columns[3][expanded] = xy[:, 0]
+        columns[4][expanded] = xy[:, 1]
+        columns[-1][expanded] = -1
+
+    return columns
+
+
+def encode(block, lo, hi, keep=None, fold_migrations=False, inside=None):
+    """
+    Records lo..hi of block as the wire strings: {"creatures", "new_food",
+    "deleted_food", "migrations"}. keep, a boolean per record, leaves some
+    out, and inside leaves out the positions of food batches it rejects.
+    fold_migrations writes migrations into "creatures" as the removals and
+    spawns they are to a viewer of several cells, in record order.
+    """
+    creatures = []
+    new_food = []
+    deleted_food = []
+    migrations = creatures if fold_migrations else []
+
+    rows = zip(block.kind[lo:hi].tolist(), block.id[lo:hi].tolist(), block.a[lo:hi].tolist(),
+               block.b[lo:hi].tolist(), block.c[lo:hi].tolist(), block.ref[lo:hi].tolist())
+    if keep is not None:
+        rows = itertools.compress(rows, keep.tolist())
+
+    for kind, id, a, b, c, ref in rows:
+        if kind == MOVE:
+            parts = []
+            if not math.isnan(a):
+                parts.append(f"x{round(a, 1)}")
+            if not math.isnan(b):
+                parts.append(f"y{round(b, 1)}")
+            if not math.isnan(c):
+                parts.append(f"d{round(c, 3)}")
+            creatures.append(f"m[{id}," + ",".join(parts) + "],")
+        elif kind == FOOD_ADD:
+            new_food.append(f"[{number(a)},{number(b)}],")
+        elif kind == FOOD_BATCH:
+            new_food.extend(f"[{number(x)},{number(y)}]," for x, y in batch_positions(block, ref, inside).tolist())
+        elif kind == FOOD_REMOVE:
+            deleted_food.append(f"[{number(a)},{number(b)}],")
+        elif kind == SPAWN:
+            creatures.append(f"j{json.dumps(block.payloads[ref])},")
+        elif kind == REMOVE:
+            creatures.append(f"r[{id}],")
+        elif kind == ORGAN_DEATH:
+            creatures.append(f"o[{id},{int(a)}],")
+        elif kind == ENERGY:
+            creatures.append(f"e[{id},{a}],")
+        elif kind == MIGRATE_OUT:
+            migrations.append(f"r[{id}],")
+        elif kind == MIGRATE_IN:
+            migrations.append(f"j{json.dumps(block.payloads[ref])},")
+
+    return {
+        "new_food": "".join(new_food),
+        "deleted_food": "".join(deleted_food),
+        "creatures": "".join(creatures),
+        "migrations": "" if fold_migrations else "".join(migrations)
+    }
+
+
+def encode_frames(block, count=None, lo=0):
+    """
+    Records lo..count of block encoded frame by frame: {frame: encode(...)}.
+    Every frame in that range must be over; their strings are kept on the
+    block, since the records behind them never change.
+    """
+    count = block.count if count is None else count
+    if count <= lo:
+        return {}
+
+    frames = block.frame[lo:count]
+    starts = np.flatnonzero(np.diff(frames)) + 1
+    bounds = (np.concatenate(([0], starts, [count - lo])) + lo).tolist()
+
+    encoded = {}
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        frame = int(block.frame[start])
+        delta = block.encoded.get(frame)
+        if delta is None:
+            delta = block.encoded[frame] = encode(block, start, end)
+        encoded[frame] = delta
+
+    return encoded
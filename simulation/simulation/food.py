@@ -1,94 +1,148 @@
-import random
-import time
-import threading
-import traceback
 import math
+import numpy as np
 import simulation.config as config
+from .grid import SpatialGrid
 
 
 class Food:
     def __init__(self, position):
         self.position = position
 
+        # Handle into the FoodStore holding this food, if any
+        self.store = None
+        self.index = None
+        self.bucket = None
+
     def to_dict(self):
         return self.position
 
 
-def food_spawning_loop(world):
-
-    time.sleep(1)
-
-    cell = world.cell_grid[0][0]
-
-    while True:
-        if len(cell.food) < config.MAX_FOOD:
-
-            new_food = Food(position=[
-                random.randint(0, 499),
-                random.randint(0, 499)
-            ])
-            
-            with cell.lock:
-                cell.add(new_food)
-
-        time.sleep(0.05 * (len(cell.creatures) ** 1.5) * (30/config.FPS))
-
-def food_spawning_loop2():
-    return
-    import simulation.simulation.world as world
-
-    food_spawn_accumulator = 0.0
-    loop_counter = 0
-
-    while True:
-        try:
-            # ✅ Accumulate spawn potential
-            food_spawn_accumulator += 10
-            spawn_count = int(food_spawn_accumulator)
-            food_spawn_accumulator -= spawn_count
-
-            new_food_list = []
-
-            # ✅ Create food objects without holding locks
-            for _ in range(spawn_count):
-                if len(world.food) >= config.MAX_FOOD:
-                    break
-
-                new_food = Food(position=[
-                    random.randint(0, 499),
-                    random.randint(0, 499)
-                ])
-                new_food_list.append(new_food)
-
-            # ✅ Append to global food list (quick lock)
-            if new_food_list:
-                with world.food_lock:
-                    world.food.extend(new_food_list)
-
-            # ✅ Add to cell (separately)
-            for food_obj in new_food_list:
-                try:
-                    if world.cell_grid:
-                        x = min(int(food_obj.position[0] // 50), len(world.cell_grid) - 1)
-                        y = min(int(food_obj.position[1] // 50), len(world.cell_grid[0]) - 1)
-                        cell = world.cell_grid[x][y]
-                        with cell.lock:
-                            cell.add(food_obj)
-                            food_obj.cell = cell
-                    else:
-                        print("⚠️ cell_grid not initialized yet")
-                except Exception as e:
-                    print(f"❌ Error adding food to cell: {e}")
-                    traceback.print_exc()
-
-            # ✅ Print every second
-            loop_counter += 1
-            if loop_counter % 10 == 0:
-                print(f"🍏 Total food: {len(world.food)}")
-
-        except Exception as e:
-            print("🔥 CRITICAL: food_spawning_loop crashed")
-            traceback.print_exc()
-
-        time.sleep(0.1)
-
+class FoodStore:
+    """
+    A cell's food: a dense list for iteration plus a uniform bucket grid for
+    neighbourhood queries. Each Food keeps its own index and bucket, so
+    removal is a constant-time swap-remove.
+    """
+
+    def __init__(self, width, height, cell_size):
+        self.items = []
+        self.version = 0  # bumped on every change, so snapshots can tell the contents are unchanged
+        # dict buckets: O(1) delete, and insertion-ordered so scans stay deterministic
+        self.grid = SpatialGrid(width, height, cell_size, bucket_factory=dict)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def __contains__(self, food):
+        return getattr(food, "store", None) is self
+
+    def add(self, food):
+        food.store = self
+        food.index = len(self.items)
+        self.items.append(food)
+        self.version += 1
+
+        food.bucket = self.grid.bucket(food.position[0], food.position[1])
+        food.bucket[food] = None
+
+    def remove(self, food):
+        if food.store is not self:
+            raise ValueError("Food is not in this store")
+
+        # ✅ Swap-remove: move the last item into the hole
+        last = self.items.pop()
+        if last is not food:
+            self.items[food.index] = last
+            last.index = food.index
+
+        del food.bucket[food]
+        self.version += 1
+
+        food.store = None
+        food.index = None
+        food.bucket = None
+
+    def bucket_ranks(self):
+        """Each item's place in its bucket, in items order: what order_buckets() needs to scan them as now."""
+        ranks = {}
+        for food in self.items:
+            if food not in ranks:
+                ranks.update((f, rank) for rank, f in enumerate(food.bucket))
+        return [ranks[food] for food in self.items]
+
+    def order_buckets(self, ranks):
+        """Put every bucket back in the order bucket_ranks() gave (ranks are in items order)."""
+        buckets = {}
+        for food, rank in zip(self.items, ranks):
+            buckets.setdefault(id(food.bucket), (food.bucket, []))[1].append((rank, food.index, food))
+
+        for bucket, entries in buckets.values():
+            entries.sort()
+            bucket.clear()
+            bucket.update((food, None) for _, _, food in entries)
+
+    def query(self, x, y, radius):
+        """Yield food within radius of (x, y), measuring distance across the wrap."""
+        width = self.grid.width
+        height = self.grid.height
+        radius_sq = radius * radius
+
+        for food in self.grid.query(x, y, radius):
+            dx = abs(food.position[0] - x) % width
+            dy = abs(food.position[1] - y) % height
+            dx = min(dx, width - dx)
+            dy = min(dy, height - dy)
+
+            if dx * dx + dy * dy <= radius_sq:
+                yield food
+
+
+def spawn_food(world):
+    """
+    Called once per simulation tick. The frame's food budget accrues at the
+    rate the old food thread spawned (one every 0.05 * n^1.5 seconds at 30
+    FPS, with n creatures); whole units of it are spent in one batch.
+
+    The batch's positions are drawn together from the world's numpy RNG,
+    grouped by cell, and each cell takes as many as fit under its cap of
+    world.max_food (Cell.add_food_batch), logged as a single delta record.
+    The budget never exceeds the room left under the cells' caps.
+    """
+
+    # ✅ max_food caps each cell, as on every other add path (death drops included)
+    headroom = sum(max(0, world.max_food - len(cell.food)) for cell in world.cells())
+
+    if headroom == 0:
+        world.food_accumulator = 0.0
+        return
+
+    n = world.count_creatures()
+    if n == 0:
+        world.food_accumulator = headroom  # nothing eating: fill up
+    else:
+        world.food_accumulator += 1 / (1.5 * n ** 1.5)
+
+    budget = min(int(world.food_accumulator), headroom)
+    if budget <= 0:
+        return
+    world.food_accumulator -= budget
+
+    # ✅ Whole batch at once, then one group per cell
+    positions = world.np_rng.integers(0, config.WORLD_SIZE, size=(budget, 2))
+    cols = positions[:, 0] * world.grid_cells // config.WORLD_SIZE
+    rows = positions[:, 1] * world.grid_cells // config.WORLD_SIZE
+    keys = rows * world.grid_cells + cols
+
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    positions = positions[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+
+    for group in np.split(positions, starts[1:]):
+        world.add_food_batch(group.tolist())
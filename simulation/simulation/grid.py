@@ -1,11 +1,85 @@
-import creatures
-
+import math
 import threading
 
+
 class SpatialGrid:
-    def __init__(self, width, height, cell_size):
+    """Uniform bucket grid over the toroidal world, used as a broadphase."""
+
+    def __init__(self, width, height, cell_size, bucket_factory=list):
+        self.width = width
+        self.height = height
         self.cell_size = cell_size
-        self.cols = width // cell_size
-        self.rows = height // cell_size
-        self.grid = [[[] for _ in range(self.cols)] for _ in range(self.rows)]
-        self.lock = threading.Lock()
\ No newline at end of file
+        self.cols = max(1, width // cell_size)
+        self.rows = max(1, height // cell_size)
+        self.grid = [[bucket_factory() for _ in range(self.cols)] for _ in range(self.rows)]
+        self.lock = threading.Lock()
+
+        # Buckets stretch slightly if the world isn't a multiple of cell_size
+        self.bucket_w = width / self.cols
+        self.bucket_h = height / self.rows
+
+        self.max_radius = 0
+        self.used = []  # buckets insert() has filled since the last clear()
+
+    def clear(self):
+        for bucket in self.used:
+            bucket.clear()
+        self.used.clear()
+        self.max_radius = 0
+
+    def bucket_of(self, x, y):
+        col = int(x // self.bucket_w) % self.cols
+        row = int(y // self.bucket_h) % self.rows
+        return col, row
+
+    def bucket(self, x, y):
+        col, row = self.bucket_of(x, y)
+        return self.grid[row][col]
+
+    def insert(self, obj, x, y, radius=0):
+        """Insert obj once, into the bucket containing its centre."""
+        col, row = self.bucket_of(x, y)
+        bucket = self.grid[row][col]
+        if not bucket:
+            self.used.append(bucket)
+        bucket.append(obj)
+
+        if radius > self.max_radius:
+            self.max_radius = radius
+
+    def _span(self, centre, reach, count):
+        # Full axis once the search wraps onto itself, so nothing is visited twice
+        if 2 * reach + 1 >= count:
+            return range(count)
+        return [(centre + k) % count for k in range(-reach, reach + 1)]
+
+    def query(self, x, y, radius):
+        """Yield every object whose bucket lies within radius of (x, y), wrapping at the edges."""
+        col, row = self.bucket_of(x, y)
+
+        cols = self._span(col, int(math.ceil(radius / self.bucket_w)), self.cols)
+        rows = self._span(row, int(math.ceil(radius / self.bucket_h)), self.rows)
+
+        for r in rows:
+            grid_row = self.grid[r]
+            for c in cols:
+                yield from grid_row[c]
+
+    def wrap_offset(self, ax, ay, bx, by):
+        """Offset to add to b's coordinates so it is the nearest image of b to a."""
+        ox = 0
+        oy = 0
+
+        dx = bx - ax
+        if dx > self.width / 2:
+            ox = -self.width
+        elif dx < -self.width / 2:
+            ox = self.width
+
+        dy = by - ay
+        if dy > self.height / 2:
+            oy = -self.height
+        elif dy < -self.height / 2:
+            oy = self.height
+
+        return ox, oy
@@ -1,6 +1,7 @@
-import random
 import math
 from simulation.config import *
+from .world import world
+from . import deltas
 
 
 class Organ:
@@ -12,6 +13,7 @@ class Organ:
         self.type = "generic"
         self.parent = parent
         self.isAlive = True
+        self.world_position = None  # cached by the parent's refresh_transform()
 
     def set_parent(self, creature):
         self.parent = creature
@@ -20,9 +22,9 @@ class Organ:
         pass
 
     def mutate(self):
-        self.position[0] += random.randint(-5, 5)
-        self.position[1] += random.randint(-5, 5)
-        self.size = max(1, self.size + random.randint(-3, 3))
+        self.position[0] += world.rng.randint(-5, 5)
+        self.position[1] += world.rng.randint(-5, 5)
+        self.size = max(1, self.size + world.rng.randint(-3, 3))
 
     def create_organ(organ_type, position, size, parent=None):
         organ_classes = {
@@ -39,31 +41,20 @@ class Organ:
         return self.__class__(self.position[:], self.size)  # Make sure position is copied (new list)
     
     def copy_mutate(self):
-        new_pos = [self.position[0] + random.randint(-2, 2),
-                self.position[1] + random.randint(-2, 2)]
-        new_size = max(1, self.size + random.randint(-1, 1))
+        new_pos = [self.position[0] + world.rng.randint(-2, 2),
+                self.position[1] + world.rng.randint(-2, 2)]
+        new_size = max(1, self.size + world.rng.randint(-1, 1))
         return self.__class__(new_pos, new_size)
 
     def get_absolute_position(self):
-        """Calculate absolute position using parent's position and single-angle direction."""
+        """Absolute position from the parent's per-frame transform cache."""
         if not self.parent:
             raise ValueError("Organ has no parent creature assigned!")
 
-        ox, oy = self.position  # Relative organ position
+        if not self.parent.transform_valid or self.world_position is None:
+            self.parent.refresh_transform()
 
-        # ✅ Convert parent's direction (radians) into cosine & sine values
-        cos_theta = math.cos(self.parent.direction)
-        sin_theta = math.sin(self.parent.direction)
-
-        # ✅ Rotate the organ's position based on the parent's facing angle
-        rotated_x = ox * cos_theta - oy * sin_theta
-        rotated_y = ox * sin_theta + oy * cos_theta
-
-        # ✅ Compute absolute world position
-        abs_x = self.parent.position[0] + rotated_x
-        abs_y = self.parent.position[1] + rotated_y
-
-        return [abs_x, abs_y]
+        return self.world_position
     
     def die(self):
         
@@ -104,19 +95,18 @@ class Organ:
 
         # ✅ Now recalculate rotational inertia (based on new COM-relative organ positions)
         self.parent.rotational_inertia = self.parent.calculate_rotational_inertia()
+        self.parent.radius = self.parent.calculate_radius()
+
+        # ✅ Organ positions and the creature's position moved, so cached world positions are stale
+        self.parent.invalidate_transform()
 
         # ✅ Sprite generation (after validation and adjustment)
-        self.parent.sprite_id = self.parent.compute_sprite_id()
+        self.parent.update_sprite()
 
         self.parent.cell.used_sprite_ids[self.parent.cell.sprite_buffer_index].add(self.parent.sprite_id)
 
         with self.parent.cell.lock:
-
-            delta = self.parent.cell.get_current_delta()
-
-            delta["creatures"] += (
-                f"o[{self.parent.id},{self.parent.sprite_id}],"
-            )
+            self.parent.cell.log_record(deltas.ORGAN_DEATH, self.parent.id, a=self.parent.sprite_id)
 
         if PRINT: print(f"🩸 Organ {self.type} destroyed on Creature {self.parent.id}")
 
@@ -126,6 +116,7 @@ class Organ:
 # ----- Specific Organ Types -----
 class Mouth(Organ):
 
+    REACH = 4  # food within the mouth's size plus this is eaten
 
     def __init__(self, position, size, parent=None):
         super().__init__(position, size, parent)
@@ -151,37 +142,19 @@ class Mouth(Organ):
 
         #print(f"[Mouth] Cell has lock? {'lock' in dir(self.parent.cell)}")
 
-        cell = self.parent.cell
-
+        # ✅ Only food in the buckets around the mouth is checked, in this cell or a neighbour
         try:
-            with cell.lock:
-                food_list = cell.food[:]
-        except Exception as e:
-            #print(f"[Mouth] Lock failed: {e}")
-            return
+            found = world.find_food(mouth_pos[0], mouth_pos[1], self.size + Mouth.REACH)
 
-        for food_obj in food_list:
-            food_pos = food_obj.position
-            dist = math.hypot(mouth_pos[0] - food_pos[0], mouth_pos[1] - food_pos[1])
-            #print(f"[Mouth] Distance to food: {dist}")
-
-            if dist <= self.size + 4:
-                from simulation.config import frame_count
-                try:
-                    with cell.lock:
-                        if food_obj in cell.food:
-
-                            #delta = self.cell.get_current_delta(frame_count)
-            
-                            #delta["deleted_food"] += f"[{food_obj.position[0]},{food_obj.position[1]}],"
-                            cell.remove(food_obj)
-
-                            self.parent.change_energy(20)
-                            #print(f"[Mouth] Ate food at {food_pos}")
-                            #print (f"e[{self.parent.id}, {round(self.parent.energy)}],")
-                    break
-                except Exception as e:
-                    print(f"[Mouth] Error removing food: {e}")
+            if found is not None:
+                cell, food_obj = found
+                with cell.lock:
+                    cell.remove(food_obj)
+
+                self.parent.change_energy(20)
+                #print(f"[Mouth] Ate food at {food_obj.position}")
+        except Exception as e:
+            print(f"[Mouth] Error removing food: {e}")
 
 class Eye(Organ):
     def __init__(self, position, size, parent=None):
@@ -0,0 +1,843 @@
+import atexit
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+import traceback
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import simulation.config as config
+from . import deltas
+from .organs import Mouth, Organ
+from .world import world
+
+
+class CreatureView:
+    """Read-only stand-in for a creature stepped in a worker process, holding just what the views read."""
+
+    def __init__(self, creature_id, name, x, y, direction, sprite_id, energy, parent_ids, creator):
+        self.id = creature_id
+        self.name = name
+        self.position = [x, y]
+        self.direction = direction
+        self.sprite_id = sprite_id
+        self.energy = energy
+        self.parent_ids = parent_ids
+        self.creator = creator
+        self.isAlive = True
+
+    @staticmethod
+    def fields(creature):
+        """The tuple a worker sends for one creature; CreatureView(*fields) rebuilds it."""
+        x, y = creature.position.tolist()
+        return (creature.id, creature.name, x, y, creature.direction, creature.sprite_id,
+                creature.energy, creature.parent_ids, creature.creator)
+
+    def to_dict(self):
+        return {"id": self.id, "name": self.name, "position": self.position, "direction": self.direction, "sprite_id": self.sprite_id, "energy": round(self.energy), "isAlive": self.isAlive, "parent_ids": self.parent_ids, "creator": self.creator}
+
+
+class GhostOrgan:
+    def __init__(self, organ_type, size, world_position):
+        self.type = organ_type
+        self.size = size
+        self.world_position = world_position
+        self.isAlive = True
+
+    def get_absolute_position(self):
+        return self.world_position
+
+    def die(self):
+        self.isAlive = False
+
+
+class Ghost:
+    """
+    A border creature owned by another worker, read back from its HaloTable.
+    Collisions treat it like a neighbour, but forces on it go nowhere: its
+    own worker resolves the same pair from its side and pushes it there.
+    """
+
+    ghost = True
+
+    def __init__(self, creature_id, x, y, radius, body_world, organs):
+        self.id = creature_id
+        self.position = np.array([x, y])
+        self.radius = radius
+        self.body_world = body_world
+        self.organs = organs
+        self.isAlive = True
+
+    def get_body_position(self):
+        return self.body_world
+
+    def apply_force(self, angle, magnitude, world_position):
+        pass
+
+    def die(self):
+        self.isAlive = False
+
+
+class HaloTable:
+    """
+    One worker's border creatures for the current frame, in shared memory:
+    a row per creature and a row per living organ, rewritten every frame,
+    and a flag per cell row holding any of them (so workers with none near
+    can skip the table). The food in the worker's cells near its strip's
+    edges goes in a section of its own, rewritten at the start of each frame.
+    """
+
+    CREATURE_FIELDS = 8  # id, x, y, radius, body x, body y, first organ row, organ count
+    ORGAN_FIELDS = 4  # world x, world y, size, type (index into Organ.allowed_types)
+    ORGANS_PER_CREATURE = 8  # average the organ rows are sized for
+    FOOD_FIELDS = 3  # x, y, place in its bucket (FoodStore.bucket_ranks)
+
+    def __init__(self, name=None, capacity=None, food_capacity=None):
+        self.capacity = capacity or config.HALO_CAPACITY
+        self.food_capacity = food_capacity or config.HALO_FOOD_CAPACITY
+        organ_capacity = self.capacity * HaloTable.ORGANS_PER_CREATURE
+
+        creature_bytes = self.capacity * HaloTable.CREATURE_FIELDS * 8
+        organ_bytes = organ_capacity * HaloTable.ORGAN_FIELDS * 8
+        food_bytes = self.food_capacity * HaloTable.FOOD_FIELDS * 8
+        food_offset = 24 + creature_bytes + organ_bytes
+
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=food_offset + food_bytes + config.GRID_CELLS)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+
+        buf = self.shm.buf
+        self.header = np.ndarray((3,), dtype=np.float64, buffer=buf)  # creature rows, organ rows, food rows
+        self.creatures = np.ndarray((self.capacity, HaloTable.CREATURE_FIELDS), dtype=np.float64, buffer=buf, offset=24)
+        self.organs = np.ndarray((organ_capacity, HaloTable.ORGAN_FIELDS), dtype=np.float64, buffer=buf, offset=24 + creature_bytes)
+        self.food = np.ndarray((self.food_capacity, HaloTable.FOOD_FIELDS), dtype=np.float64, buffer=buf, offset=food_offset)
+        self.rows = np.ndarray((config.GRID_CELLS,), dtype=bool, buffer=buf, offset=food_offset + food_bytes)
+
+    def write(self, creatures):
+        if len(creatures) > self.capacity:
+            raise RuntimeError(f"{len(creatures)} border creatures do not fit in the halo table; raise config.HALO_CAPACITY")
+
+        organ_rows = 0
+        self.rows[:] = False
+        for k, creature in enumerate(creatures):
+            x, y = creature.position.tolist()
+            bx, by = creature.get_body_position()
+            self.rows[world.cell_index(x, y)[1]] = True
+
+            first = organ_rows
+            for organ in creature.organs:
+                if not organ.isAlive: continue
+                if organ_rows == len(self.organs):
+                    raise RuntimeError("Border creature organs do not fit in the halo table; raise config.HALO_CAPACITY")
+
+                ox, oy = organ.get_absolute_position()
+                self.organs[organ_rows] = (ox, oy, organ.size, Organ.allowed_types.index(organ.type))
+                organ_rows += 1
+
+            self.creatures[k] = (creature.id, x, y, creature.radius, bx, by, first, organ_rows - first)
+
+        self.header[:2] = (len(creatures), organ_rows)
+
+    def read(self):
+        rows, organ_rows = (int(n) for n in self.header[:2])
+        organs = self.organs[:organ_rows].tolist()
+
+        ghosts = []
+        for creature_id, x, y, radius, bx, by, first, count in self.creatures[:rows].tolist():
+            first = int(first)
+            ghost_organs = [
+                GhostOrgan(Organ.allowed_types[int(organ_type)], size, [ox, oy])
+                for ox, oy, size, organ_type in organs[first:first + int(count)]
+            ]
+            ghosts.append(Ghost(int(creature_id), x, y, radius, [bx, by], ghost_organs))
+
+        return ghosts
+
+    def write_food(self, cells):
+        """Every food item of cells, each cell's in FoodStore order with its place in its bucket."""
+        rows = 0
+        for cell in cells:
+            count = len(cell.food)
+            if not count: continue
+            if rows + count > self.food_capacity:
+                raise RuntimeError("Border food does not fit in the halo table; raise config.HALO_FOOD_CAPACITY")
+
+            self.food[rows:rows + count, :2] = [f.position for f in cell.food]
+            self.food[rows:rows + count, 2] = cell.food.bucket_ranks()
+            rows += count
+
+        self.header[2] = rows
+
+    def read_food(self):
+        """[x, y, rank] rows, as write_food() left them."""
+        return self.food[:int(self.header[2])].tolist()
+
+    def close(self):
+        # The array views hold the buffer open, so drop them first
+        del self.header, self.creatures, self.organs, self.food, self.rows
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def receive(creatures, food):
+    """Add creature records and food positions routed by ParallelStepper to this process's world."""
+    from .creatures import Creature
+    from .food import Food
+
+    for kind, record in creatures:
+        creature = Creature.from_record(record)
+        cell = world.cell_at(creature.position)
+
+        with cell.lock:
+            cell.add(creature, log_spawn=(kind == "spawn"))
+            if kind == "migrate":
+                cell.log_record(deltas.MIGRATE_IN, creature.id, payload=cell.spawn_record(creature))
+
+    batches = {}
+    for kind, position in food:
+        if kind == "load":
+            world.cell_at(position).food.add(Food(position=position))
+        else:
+            batches.setdefault(world.cell_at(position), []).append(position)
+
+    for cell, positions in batches.items():
+        cell.add_food_batch(positions)
+
+
+class CellWorker:
+    """
+    Runs inside a worker process and steps one horizontal strip of cell rows
+    of that process's own world. Creatures that wander out of the strip sit
+    in the (otherwise empty) cells beyond it until the end of the frame, then
+    go back to the main process to be handed to their new owner.
+
+    While the creatures step, the cells just beyond the strip hold copies of
+    the neighbours' food there, so mouths near the edge see the same food as
+    on one thread. Copies eaten here are settled by their owner in collide().
+    """
+
+    def __init__(self, index, rows, tables, barrier):
+        self.rows = set(rows)
+        self.table = HaloTable(tables[index])
+        self.others = [HaloTable(name) for i, name in enumerate(tables) if i != index]
+        self.barrier = barrier
+
+        self.populated = set()  # owned cells reported with creatures last frame
+        self.fresh = True  # first report sends every owned cell's food
+        self.sprites_sent = 0
+
+    def owned(self, cell):
+        return cell.y in self.rows
+
+    def neighbours(self, reach):
+        """
+        The other workers' HaloTables with border creatures near any of our
+        populated cells. A ghost reaches the cells within its radius plus
+        reach of it, so at most 2 * reach: tables with nothing in the rows
+        that close hold no ghost that could touch us, and are not read.
+        """
+        grid = world.grid_cells
+        span = int(2 * reach // world.cell_size) + 1
+
+        near = np.zeros(grid, dtype=bool)
+        for row in {cell.y for cell in world.cells() if cell.creatures}:
+            near[[(row + k) % grid for k in range(-span, span + 1)]] = True
+
+        return [table for table in self.others if (table.rows & near).any()]
+
+    def rows_near(self, rows, span):
+        """Every cell row within span rows of one of rows, wrapping."""
+        grid = world.grid_cells
+        return {(row + k) % grid for row in rows for k in range(-span, span + 1)}
+
+    def step(self, creatures, food, reach):
+        """
+        First half of a frame: take delivered creatures and food, swap the
+        food near the strip's edges with the other workers, then step and
+        migrate. reach is the largest creature radius last frame: a mouth
+        eats at most reach + Mouth.REACH from its creature's centre.
+        Returns the largest radius and the positions of the neighbours' food
+        eaten here.
+        """
+        receive(creatures, food)
+
+        span = int((reach + Mouth.REACH) // world.cell_size) + 1
+        others = self.rows_near(set(range(world.grid_cells)) - self.rows, span)
+        self.table.write_food([cell for cell in world.cells() if self.owned(cell) and cell.y in others])
+        self.barrier.wait()
+
+        copies = self.place_food(self.rows_near(self.rows, span))
+
+        world.run_creatures()
+
+        # ✅ Eaten copies go to their owner; the rest just disappear, unlogged
+        eaten = []
+        for copy in copies:
+            if copy.store is None:
+                eaten.append(copy.position)
+            else:
+                copy.store.remove(copy)
+
+        world.migrate()
+
+        return max((c.radius for cell in world.cells() for c in cell.creatures), default=0), eaten
+
+    def place_food(self, rows):
+        """
+        Copy the other workers' shared food in rows into our cells there, in
+        the same bucket order as theirs so mouths pick the same item. Returns
+        the copies.
+        """
+        from .food import Food
+
+        copies = []
+        ranks = {}
+        for table in self.others:
+            for x, y, rank in table.read_food():
+                cell = world.cell_at((x, y))
+                if cell.y not in rows: continue
+
+                copy = Food(position=[x, y])
+                cell.food.add(copy)
+                copies.append(copy)
+                ranks.setdefault(cell, []).append(int(rank))
+
+        for cell, cell_ranks in ranks.items():
+            cell.food.order_buckets(cell_ranks)
+
+        return copies
+
+    def settle(self, eaten):
+        """Remove our food that other workers' mouths ate as copies. Food already eaten here is skipped."""
+        for position in eaten:
+            cell = world.cell_at(position)
+            for food_obj in cell.food.query(position[0], position[1], 0):
+                if list(food_obj.position) == position:
+                    cell.remove(food_obj)
+                    break
+
+    def collide(self, reach, eaten):
+        """
+        Second half of a frame: settle our food eaten by other workers, share
+        border creatures, wait for every worker to do the same, then collide
+        against our own creatures plus theirs. reach is the largest creature
+        radius in the whole world.
+        """
+        from .creatures import Creature
+
+        self.settle(eaten)
+        self.publish(reach)
+        self.barrier.wait()
+
+        halos = world.build_halos()
+
+        for table in self.neighbours(reach):
+            for ghost in table.read():
+                x, y = ghost.position.tolist()
+                for cell in world.cells_near(x, y, ghost.radius + reach):
+                    if cell.creatures:
+                        halos[cell].append(ghost)
+
+        for cell in world.cells():
+            if cell.creatures:
+                cell.run_collisions(halo=halos[cell])
+
+        world.apply_commands()
+
+        report = self.report()
+
+        # Deltas are served by the main process, so there are no buffers to swap here:
+        # this frame's records went out with the report
+        for cell in world.cells():
+            cell.log.clear()
+
+        world.frame += 1
+        Creature.sprites.evict(world.frame, config.SPRITE_GRACE_FRAMES)
+
+        return report
+
+    def publish(self, reach):
+        border = []
+
+        for cell in world.cells():
+            for creature in cell.creatures:
+                if not creature.isAlive: continue
+
+                if not self.owned(cell):
+                    border.append(creature)
+                    continue
+
+                x, y = creature.position.tolist()
+                if any(not self.owned(near) for near in world.cells_near(x, y, creature.radius + reach)):
+                    border.append(creature)
+
+        self.table.write(border)
+
+    def report(self):
+        from .creatures import Creature
+
+        frame = world.get_frame()
+        cells = []
+
+        for cell in world.cells():
+            if not self.owned(cell): continue
+
+            if not (cell.creatures or cell in self.populated or self.fresh or len(cell.log)):
+                continue
+
+            food = None
+            if self.fresh or cell.log.kinds() & set(deltas.FOOD_KINDS):
+                food = [list(f.position) for f in cell.food]
+
+            creatures = [CreatureView.fields(c) for c in cell.creatures if c.isAlive]
+            cells.append((cell.x, cell.y, cell.log.export(), creatures, food))
+
+            if creatures:
+                self.populated.add(cell)
+            else:
+                self.populated.discard(cell)
+
+        self.fresh = False
+
+        # ✅ Whatever ended up outside the strip goes back to be re-routed
+        creatures = []
+        food = []
+        for cell in world.cells():
+            if self.owned(cell): continue
+
+            with cell.lock:
+                for creature in cell.creatures:
+                    creatures.append(("migrate", creature.to_record()))
+                    world.physics.release(creature.slot)
+                    Creature.sprites.release(creature.sprite_id)
+                    creature.cell = None
+                cell.creatures = []
+
+                for f in list(cell.food):
+                    food.append(("spawn", list(f.position)))
+                    cell.food.remove(f)
+
+        sprites = Creature.sprites.added_since(self.sprites_sent)
+        self.sprites_sent = Creature.sprites.version
+
+        return {"frame": frame, "cells": cells, "creatures": creatures, "food": food, "sprites": sprites,
+                "sprite_refs": Creature.sprites.take_changes()}
+
+    def digest_items(self):
+        return {(cell.x, cell.y): world.digest_items(cell) for cell in world.cells() if self.owned(cell)}
+
+    def checkpoint_cells(self):
+        """(checkpoint.capture_cells() of the owned cells, this process's next creature id)."""
+        from .checkpoint import capture_cells
+        from .creatures import Creature
+
+        return capture_cells([cell for cell in world.cells() if self.owned(cell)], world.physics), Creature.counter
+
+    def close(self):
+        self.table.close()
+        for table in self.others:
+            table.close()
+
+
+def worker_main(index, lane, lanes, rows, tables, barrier, conn, seed, frame, counter, max_food):
+    """Entry point of a worker process: answer step / collide / digest / checkpoint requests until told to stop."""
+    from .creatures import Creature
+
+    worker = None
+    try:
+        world.reseed(None if seed is None else f"{seed}:{lane}")
+        world.frame = frame
+        world.max_food = max_food  # ✅ a fresh process only knows config's
+        Creature.use_id_lane(lane, lanes, counter)
+
+        worker = CellWorker(index, rows, tables, barrier)
+
+        while True:
+            command, *args = conn.recv()
+
+            if command == "step":
+                conn.send(("ok", worker.step(*args)))
+            elif command == "collide":
+                conn.send(("ok", worker.collide(*args)))
+            elif command == "digest":
+                receive(*args)
+                conn.send(("ok", worker.digest_items()))
+            elif command == "checkpoint":
+                receive(*args)
+                conn.send(("ok", worker.checkpoint_cells()))
+            elif command == "stop":
+                break
+    except Exception:
+        barrier.abort()  # don't leave the other workers waiting on us
+        conn.send(("error", traceback.format_exc()))
+    finally:
+        if worker is not None:
+            worker.close()
+
+
+class ParallelStepper:
+    """
+    Steps the world's cells in worker processes, one horizontal strip of
+    cell rows per worker.
+
+    Each frame every worker shares the food near its strip's edges through
+    a HaloTable in shared memory and steps its own creatures, mouths seeing
+    the neighbours' food as well as their own; then it shares the creatures
+    near its edges and resolves collisions against its neighbours' border
+    creatures. Creatures that left a strip are handed to their new worker at
+    the start of the next frame. This process keeps the world's cells as a
+    mirror of what the workers report, so the API reads them exactly as
+    before, and it spawns food.
+
+    Creature ids come from per-process lanes (Creature.use_id_lane) so nothing
+    collides; this process keeps lane 0 for uploads. Sprite ids are hashes of
+    the layout, the same in every process.
+
+    Runs are repeatable for a given seed and worker count, but not identical
+    to stepping on one thread: each worker draws from its own RNG stream
+    (food dropped by the dead, offspring and their mutations), newborns get
+    ids from the worker's lane, and a food item by a strip's edge can be
+    eaten from both sides in the same frame. Until the first death or birth
+    the two agree to rounding (tests/test_parallel.py); after that they
+    drift apart like two seeds, with the same population dynamics. The
+    workers' RNG states are not checkpointed: after --restore, each worker's
+    stream starts again from the seed, so only a restored world stepped on
+    one thread carries on exactly as the original.
+
+    Whether this beats one thread depends on the machine and the population
+    (every frame makes two round trips to each worker), so the simulation
+    only keeps it after a ParallelTrial; bench --workers uses it outright.
+    """
+
+    def __init__(self, world, workers):
+        self.world = world
+        self.workers = max(1, min(int(workers), world.grid_cells))
+
+        bounds = [round(i * world.grid_cells / self.workers) for i in range(self.workers + 1)]
+        self.rows = [range(bounds[i], bounds[i + 1]) for i in range(self.workers)]
+        self.worker_of_row = {row: i for i, rows in enumerate(self.rows) for row in rows}
+
+        self.lock = threading.Lock()  # guards the inbox
+        self.step_lock = threading.Lock()  # one exchange with the workers at a time
+        self.inbox = self._empty_inbox()
+
+        self.processes = []
+        self.conns = []
+        self.tables = []
+        self.barrier = None
+        self.reach = 0  # largest creature radius last frame
+
+    def _empty_inbox(self):
+        return [([], []) for _ in range(self.workers)]
+
+    def _worker_of(self, position):
+        col, row = self.world.cell_index(position[0], position[1])
+        return self.worker_of_row[row]
+
+    def start(self):
+        """Move every creature and food into the workers and start them. Returns self."""
+        from .creatures import Creature
+
+        world = self.world
+        lanes = self.workers + 1
+        counter = Creature.counter
+        Creature.use_id_lane(0, lanes)
+
+        # ✅ From here on adds are queued for the workers; anything added before is collected below
+        world.stepper = self
+
+        for cell in world.cells():
+            with cell.lock:
+                views = []
+                for creature in cell.creatures:
+                    if not creature.isAlive: continue
+
+                    self.reach = max(self.reach, creature.radius)
+
+                    self.inbox[self._worker_of(creature.position)][0].append(("load", creature.to_record()))
+                    views.append(CreatureView(*CreatureView.fields(creature)))
+                    world.physics.release(creature.slot)
+                    Creature.sprites.release(creature.sprite_id)  # ✅ counted again by the worker that loads it
+                    creature.cell = None
+                cell.creatures = views
+
+                for f in cell.food:
+                    self.inbox[self._worker_of(f.position)][1].append(("load", list(f.position)))
+
+        context = multiprocessing.get_context("spawn")
+        # Kept on self: the semaphore must outlive start() for the workers to open it
+        self.barrier = context.Barrier(self.workers)
+        self.tables = [HaloTable() for _ in range(self.workers)]
+        names = [table.name for table in self.tables]
+
+        for index in range(self.workers):
+            conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=worker_main,
+                args=(index, index + 1, lanes, list(self.rows[index]), names, self.barrier, child_conn,
+                      world.seed, world.frame, counter, world.max_food),
+                daemon=True
+            )
+            process.start()
+            self.processes.append(process)
+            self.conns.append(conn)
+
+        atexit.register(self._stop_workers)
+
+        print(f"✅ Stepping {world.grid_cells} cell rows in {self.workers} worker processes")
+        return self
+
+    def _recv(self, conn):
+        status, payload = conn.recv()
+        if status == "error":
+            raise RuntimeError(f"Simulation worker failed:\n{payload}")
+        return payload
+
+    # ---- Routing into the workers (delivered at the start of the next frame) ----
+
+    def submit_creature(self, creature, log_spawn=True):
+        record = creature.to_record()
+
+        # ✅ The creature lives on in a worker; free its slot here
+        if creature.isAlive:
+            creature.physics, creature.slot = creature.physics.detach(creature.slot)
+            creature.sprites.release(creature.sprite_id)
+
+        with self.lock:
+            self.inbox[self._worker_of(record["position"])][0].append(("spawn" if log_spawn else "load", record))
+
+    def submit_food(self, food_obj):
+        self.submit_food_batch([list(food_obj.position)])
+
+    def submit_food_batch(self, positions):
+        with self.lock:
+            for position in positions:
+                self.inbox[self._worker_of(position)][1].append(("spawn", list(position)))
+
+    # ---- Stepping ----
+
+    def step(self, timings=None):
+        with self.step_lock:
+            if self.processes:
+                self._step(timings)
+
+    def _step(self, timings):
+        from .creatures import Creature
+        from .food import spawn_food
+
+        start = time.perf_counter()
+
+        # ✅ Uploads become creatures here and are submitted to their workers below
+        self.world.apply_commands()
+
+        with self.lock:
+            inbox, self.inbox = self.inbox, self._empty_inbox()
+
+        for conn, (creatures, food) in zip(self.conns, inbox):
+            conn.send(("step", creatures, food, self.reach))
+        steps = [self._recv(conn) for conn in self.conns]
+
+        # ✅ Food eaten across a strip's edge is settled by the worker owning it
+        self.reach = max(reach for reach, _ in steps)
+        eaten = [[] for _ in self.conns]
+        for _, positions in steps:
+            for position in positions:
+                eaten[self._worker_of(position)].append(position)
+
+        for conn, positions in zip(self.conns, eaten):
+            conn.send(("collide", self.reach, positions))
+        reports = [self._recv(conn) for conn in self.conns]
+
+        workers_done = time.perf_counter()
+
+        for report in reports:
+            Creature.sprites.update(report["sprites"])
+            Creature.sprites.apply_changes(report["sprite_refs"])
+
+            for x, y, delta, creatures, food in report["cells"]:
+                cell = self.world.cell_grid[y][x]
+                cell.mirror(report["frame"], delta, [CreatureView(*fields) for fields in creatures], food)
+
+            with self.lock:
+                for kind, record in report["creatures"]:
+                    self.inbox[self._worker_of(record["position"])][0].append((kind, record))
+                for kind, position in report["food"]:
+                    self.inbox[self._worker_of(position)][1].append((kind, position))
+
+        mirrored = time.perf_counter()
+
+        spawn_food(self.world)
+        food_done = time.perf_counter()
+
+        self.world.advance_frame()
+        advanced = time.perf_counter()
+
+        self.world.publish()
+        end = time.perf_counter()
+
+        if timings is not None:
+            for name, seconds in (("workers", workers_done - start), ("mirror", mirrored - workers_done),
+                                  ("food", food_done - mirrored), ("advance_frame", advanced - food_done),
+                                  ("publish", end - advanced)):
+                timings[name] = timings.get(name, 0.0) + seconds
+
+    def digest(self):
+        """Same hash as World.digest(), gathered from the workers (after delivering their inbox, like checkpoint_cells)."""
+        items = {}
+        with self.step_lock:
+            with self.lock:
+                inbox, self.inbox = self.inbox, self._empty_inbox()
+            for conn, (creatures, food) in zip(self.conns, inbox):
+                conn.send(("digest", creatures, food))
+            for conn in self.conns:
+                items.update(self._recv(conn))
+
+        h = hashlib.sha256()
+        h.update(str(self.world.frame).encode())
+
+        for cell in self.world.cells():
+            for item in items.get((cell.x, cell.y), []):
+                h.update(item)
+
+        return h.hexdigest()
+
+    def checkpoint_cells(self):
+        """
+        checkpoint.capture_cells() of every cell, gathered from the workers
+        (their strips are consecutive rows, in order), and each worker's next
+        creature id. Creatures and food on their way to a worker are
+        delivered first, as the next frame would have.
+        """
+        from .checkpoint import merge
+
+        with self.step_lock:
+            with self.lock:
+                inbox, self.inbox = self.inbox, self._empty_inbox()
+            for conn, (creatures, food) in zip(self.conns, inbox):
+                conn.send(("checkpoint", creatures, food))
+            parts, counters = zip(*(self._recv(conn) for conn in self.conns))
+
+        return merge(parts), list(counters)
+
+    def recall(self):
+        """
+        Bring every creature and food item back from the workers into this
+        process's world (as a checkpoint capture), stop them, and leave the
+        world to be stepped on one thread again. Between frames only; does
+        nothing once the workers are gone.
+        """
+        from .checkpoint import capture, load
+        from .creatures import Creature
+        from .food import FoodStore
+
+        if not self.processes:
+            return
+
+        world = self.world
+        scalars, arrays = capture(world)
+        with self.lock:
+            inbox, self.inbox = self.inbox, self._empty_inbox()
+        self._stop_workers()
+
+        # ✅ The cells only hold mirrors of the workers' cells: empty them for the real creatures and food
+        for cell in world.cells():
+            with cell.lock:
+                for view in cell.creatures:
+                    Creature.sprites.release(view.sprite_id)  # ✅ counted again when rebuilt
+                cell.creatures = []
+                cell.food = FoodStore(config.WORLD_SIZE, config.WORLD_SIZE, config.FOOD_CELL_SIZE)
+
+        world.stepper = None
+        load(world, scalars, arrays)
+        Creature.use_id_lane(0, 1, Creature.counter)
+
+        # Whatever was on its way to a worker is delivered here instead
+        for creatures, food in inbox:
+            receive(creatures, food)
+
+    def stop(self):
+        """Stop the workers, handing the world back to be stepped on one thread (recall)."""
+        self.recall()
+
+    def _stop_workers(self):
+        # At exit there is no world to hand back, so just the processes and the shared memory
+        with self.step_lock:
+            if not self.processes:
+                return
+
+            for conn, process in zip(self.conns, self.processes):
+                if process.is_alive():
+                    conn.send(("stop",))
+            for process in self.processes:
+                process.join(timeout=5)
+            for table in self.tables:
+                table.close()
+
+            self.processes = []
+            self.conns = []
+            self.tables = []
+
+
+class ParallelTrial:
+    """
+    Only keeps the worker processes if they pay off on this machine: times
+    frames on one thread, then as many in the workers, and goes back to one
+    thread (ParallelStepper.recall) unless the workers stepped a frame at
+    least min_speedup times faster. Medians, so the workers' start-up
+    doesn't count against them. With a single CPU there is nothing to gain,
+    so no trial is run.
+    """
+
+    def __init__(self, world, workers, frames, min_speedup):
+        self.world = world
+        self.workers = workers
+        self.frames = frames
+        self.min_speedup = min_speedup
+
+        self.serial = []  # seconds per frame on one thread
+        self.parallel = []  # seconds per frame in the workers
+        self.stepper = None
+        self.done = workers <= 0
+
+        if not self.done and (os.cpu_count() or 1) < 2:
+            self.done = True
+            print(f"⚠️ {workers} workers asked for, but this machine has one CPU: stepping on one thread")
+
+    def step(self):
+        """world.step(), timed while the trial lasts."""
+        if self.done:
+            self.world.step()
+            return
+
+        start = time.perf_counter()
+        self.world.step()
+        seconds = time.perf_counter() - start
+
+        if self.stepper is None:
+            self.serial.append(seconds)
+            if len(self.serial) == self.frames:
+                self.stepper = ParallelStepper(self.world, self.workers).start()
+        else:
+            self.parallel.append(seconds)
+            if len(self.parallel) == self.frames:
+                self.decide()
+
+    def decide(self):
+        serial = float(np.median(self.serial))
+        parallel = float(np.median(self.parallel))
+        self.done = True
+
+        if parallel * self.min_speedup <= serial:
+            print(f"✅ {self.workers} workers step a frame in {parallel * 1000:.2f} ms, one thread in {serial * 1000:.2f} ms: keeping the workers")
+            return
+
+        self.stepper.recall()
+        print(f"⚠️ {self.workers} workers step a frame in {parallel * 1000:.2f} ms, one thread in {serial * 1000:.2f} ms: "
+              f"stepping on one thread")
@@ -0,0 +1,124 @@
+import math
+import threading
+
+import numpy as np
+
+import simulation.config as config
+
+
+class PhysicsStore:
+    """
+    Struct-of-arrays storage for creature physics.
+
+    Each live creature owns one slot (row) in every column; Creature
+    attributes like position and velocity are views into its row, and
+    integrate() advances any set of slots in a single vectorised step.
+    """
+
+    COLUMNS = ("position", "velocity", "direction", "angular_velocity", "mass", "inertia", "energy", "last_sent")
+
+    def __init__(self, capacity=256):
+        self.capacity = 0
+        self.size = 0  # high-water mark of slots ever handed out
+
+        self.position = np.zeros((0, 2))
+        self.velocity = np.zeros((0, 2))
+        self.direction = np.zeros(0)
+        self.angular_velocity = np.zeros(0)
+        self.mass = np.zeros(0)
+        self.inertia = np.zeros(0)
+        self.energy = np.zeros(0)
+        self.last_sent = np.zeros((0, 3))  # x, y, direction last written to the delta log
+
+        self.owners = []
+        self.free = []
+        self.lock = threading.Lock()
+
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        for name in PhysicsStore.COLUMNS:
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:])
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+        self.owners.extend([None] * (capacity - self.capacity))
+        self.capacity = capacity
+
+    def allocate(self, owner):
+        """Hand out a free slot for owner, growing the columns if needed."""
+        with self.lock:
+            if self.free:
+                slot = self.free.pop()
+            else:
+                if self.size == self.capacity:
+                    self._grow(max(16, self.capacity * 2))
+                slot = self.size
+                self.size += 1
+
+            self.owners[slot] = owner
+            self.mass[slot] = 1
+            self.inertia[slot] = 1
+
+        return slot
+
+    def release(self, slot):
+        with self.lock:
+            self.owners[slot] = None
+            for name in PhysicsStore.COLUMNS:
+                getattr(self, name)[slot] = 0
+            self.free.append(slot)
+
+    def detach(self, slot):
+        """Move a slot into a private one-row store and free it here. Used when a creature dies."""
+        single = PhysicsStore(capacity=1)
+        new_slot = single.allocate(self.owners[slot])
+
+        for name in PhysicsStore.COLUMNS:
+            getattr(single, name)[new_slot] = getattr(self, name)[slot]
+
+        self.release(slot)
+        return single, new_slot
+
+    def integrate(self, slots, frame):
+        """
+        Apply velocity and rotation to every slot in one step.
+
+        Returns boolean arrays aligned with slots: which of x / y / direction
+        moved far enough to be logged, and which creatures died this step.
+        """
+        position = (self.position[slots] + self.velocity[slots]) % config.WORLD_SIZE
+        direction = (self.direction[slots] + self.angular_velocity[slots]) % (2 * math.pi)
+
+        self.position[slots] = position
+        self.direction[slots] = direction
+
+        # ✅ Log movement only distance from last sent position over threshold
+        last_sent = self.last_sent[slots]
+
+        dtheta = np.abs(direction - last_sent[:, 2])
+        dtheta = np.where(dtheta > math.pi, 2 * math.pi - dtheta, dtheta)
+
+        moved_x = np.abs(position[:, 0] - last_sent[:, 0]) > 0.5
+        moved_y = np.abs(position[:, 1] - last_sent[:, 1]) > 0.5
+        moved_d = dtheta > 0.005
+
+        last_sent[:, 0] = np.where(moved_x, position[:, 0], last_sent[:, 0])
+        last_sent[:, 1] = np.where(moved_y, position[:, 1], last_sent[:, 1])
+        last_sent[:, 2] = np.where(moved_d, direction, last_sent[:, 2])
+        self.last_sent[slots] = last_sent
+
+        # ✅ Apply friction periodically, to creatures that logged a move
+        if frame % config.FRICTION_STEP == 0:
+            moved = slots[moved_x | moved_y | moved_d]
+            self.velocity[moved] *= config.FRICTION
+            self.angular_velocity[moved] *= config.ANGULAR_FRICTION
+
+        # ✅ Kill if spinning too fast, or out of energy after the basal drain
+        energy = self.energy[slots] - config.BMR
+        self.energy[slots] = energy
+
+        dead = (np.abs(self.angular_velocity[slots]) > config.MAX_AV) | (energy <= 0)
+
+        return moved_x, moved_y, moved_d, dead
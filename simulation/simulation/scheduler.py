@@ -0,0 +1,159 @@
+import threading
+import time
+import simulation.config as config
+
+
+class FrameScheduler:
+    """
+    Fixed-timestep driver for the simulation tick.
+
+    Frames are due every 1/FPS seconds of wall time. When the loop falls
+    behind it runs up to max_catchup frames back to back, then drops the
+    rest of the backlog instead of spiralling. Unthrottled mode runs
+    frames back to back with no sleeping, and pause/step hold the loop
+    until frames are requested one at a time.
+    """
+
+    def __init__(self, tick, fps=None, max_catchup=None, unthrottled=None):
+        fps = config.FPS if fps is None else fps
+
+        self.tick = tick
+        self.step_seconds = 1.0 / fps if fps > 0 else 0
+        self.max_catchup = config.MAX_CATCHUP_FRAMES if max_catchup is None else max_catchup
+        self.unthrottled = (config.UNTHROTTLED if unthrottled is None else unthrottled) or fps <= 0
+
+        self.running = False
+        self.paused = False
+        self.pending_steps = 0
+
+        self.lock = threading.Lock()
+        self._wake = threading.Event()
+
+        # Stats
+        self.frames = 0
+        self.dropped_frames = 0
+        self.lateness = 0.0       # how far behind its slot the last frame started (s)
+        self.max_lateness = 0.0
+        self.avg_lateness = 0.0   # exponential moving average
+        self.frame_time = 0.0     # time spent inside the last tick (s)
+        self.avg_frame_time = 0.0
+        self._fps_window_start = time.perf_counter()
+        self._fps_window_frames = 0
+        self.measured_fps = 0.0
+
+    # ---- Control ----
+
+    def pause(self):
+        self.paused = True
+        self._wake.set()
+
+    def resume(self):
+        with self.lock:
+            self.paused = False
+            self.pending_steps = 0
+        self._wake.set()
+
+    def step(self, frames=1):
+        """Queue frames to run while paused."""
+        with self.lock:
+            self.pending_steps += max(0, int(frames))
+        self._wake.set()
+
+    def set_unthrottled(self, enabled):
+        self.unthrottled = bool(enabled) or self.step_seconds == 0
+        self._fps_window_start = time.perf_counter()
+        self._fps_window_frames = 0
+        self._wake.set()
+
+    def stop(self):
+        self.running = False
+        self._wake.set()
+
+    # ---- Loop ----
+
+    def _sleep(self, seconds):
+        # Interruptible, so pause/step/stop take effect immediately
+        self._wake.wait(seconds)
+        self._wake.clear()
+
+    def _take_step(self):
+        with self.lock:
+            if self.pending_steps > 0:
+                self.pending_steps -= 1
+                return True
+        return False
+
+    def _run_tick(self, lateness):
+        start = time.perf_counter()
+        self.tick()
+        end = time.perf_counter()
+
+        self.frames += 1
+        self.frame_time = end - start
+        self.avg_frame_time += (self.frame_time - self.avg_frame_time) * 0.05
+
+        self.lateness = max(0.0, lateness)
+        self.max_lateness = max(self.max_lateness, self.lateness)
+        self.avg_lateness += (self.lateness - self.avg_lateness) * 0.05
+
+        self._fps_window_frames += 1
+        if end - self._fps_window_start >= 1.0:
+            self.measured_fps = self._fps_window_frames / (end - self._fps_window_start)
+            self._fps_window_start = end
+            self._fps_window_frames = 0
+
+    def run(self):
+        """Run the tick until stop() is called. Blocks the calling thread."""
+        self.running = True
+        next_due = time.perf_counter()
+
+        while self.running:
+
+            if self.paused:
+                if self._take_step():
+                    self._run_tick(0.0)
+                else:
+                    self._sleep(0.1)
+
+                # Don't try to catch up on the time spent paused
+                next_due = time.perf_counter()
+                continue
+
+            if self.unthrottled:
+                self._run_tick(0.0)
+                next_due = time.perf_counter()
+                continue
+
+            now = time.perf_counter()
+            if now < next_due:
+                self._sleep(next_due - now)
+                continue
+
+            # ✅ Run every frame that is due, up to the catch-up limit
+            steps = 0
+            while now >= next_due and steps < self.max_catchup and self.running and not self.paused:
+                self._run_tick(now - next_due)
+                next_due += self.step_seconds
+                steps += 1
+                now = time.perf_counter()
+
+            # ✅ Still behind: drop the backlog rather than spiral
+            if now >= next_due and not self.paused:
+                missed = int((now - next_due) // self.step_seconds) + 1
+                self.dropped_frames += missed
+                next_due += missed * self.step_seconds
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "paused": self.paused,
+            "unthrottled": self.unthrottled,
+            "target_fps": round(1.0 / self.step_seconds, 2) if self.step_seconds else None,
+            "measured_fps": round(self.measured_fps, 2),
+            "frame_time_ms": round(self.frame_time * 1000, 3),
+            "avg_frame_time_ms": round(self.avg_frame_time * 1000, 3),
+            "lateness_ms": round(self.lateness * 1000, 3),
+            "avg_lateness_ms": round(self.avg_lateness * 1000, 3),
+            "max_lateness_ms": round(self.max_lateness * 1000, 3),
+            "dropped_frames": self.dropped_frames,
+        }
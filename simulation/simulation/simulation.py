@@ -1,39 +1,63 @@
 # simulation.py
 import threading
+import multiprocessing
 import time
+import simulation.config as config
+from .checkpoint import Checkpointer, restore
 from .creatures import Creature
-from .food import food_spawning_loop
+from .parallel import ParallelTrial
+from .scheduler import FrameScheduler
 from .world import world
 
-SIMULATION_SPEED = 1 / 30.0  # 30 FPS
 PRINT = True
 
-def simulation_loop():
-    initialize_creatures(world)
-    
-    # Setup initial snapshot
-    cell = world.cell_grid[0][0]
-    cell.snapshot = {
-        "creatures": [c.to_dict() for c in cell.creatures],
-        "food": [f.to_dict() for f in cell.food]
-    }
+checkpointer = Checkpointer(world, config.CHECKPOINT_PATH, config.CHECKPOINT_INTERVAL)
+parallel = ParallelTrial(world, config.WORKERS, config.PARALLEL_TRIAL_FRAMES, config.PARALLEL_MIN_SPEEDUP)
+started = False
 
-    while True:
+def step_frame():
+    """One simulation tick."""
+    parallel.step()
+    checkpointer.tick()
 
-        world.cell_grid[0][0].run_creatures()
-        world.cell_grid[0][0].run_collisions()
+scheduler = FrameScheduler(step_frame)
 
-        world.advance_frame()
-        time.sleep(SIMULATION_SPEED)
+def simulation_loop(restored=False):
+    if not restored:
+        initialize_creatures(world)
 
-def initialize_creatures(world):
-    cell = world.cell_grid[0][0]
+    # Setup initial snapshot
+    world.take_snapshots()
+    world.publish()
 
+    scheduler.run()
+
+def initialize_creatures(world):
     def c(pos, organs, name):  # short helper
         creature = Creature(position=pos, organs=organs, name=name)
-        cell.add(creature, log_spawn=False)
+        world.add_creature(creature, log_spawn=False)
+
+def restore_world(path):
+    """Load the checkpoint at path into the (still empty) world."""
+    start = time.perf_counter()
+    restore(world, path)
+    print(f"✅ Restored frame {world.frame} from {path}: {world.count_creatures()} creatures, "
+          f"{world.count_food()} food in {time.perf_counter() - start:.3f}s")
+    if config.WORKERS:
+        # Worker RNG states are not in the checkpoint (see ParallelStepper)
+        print("⚠️ Worker processes restart their RNGs from the seed: the run carries on, but not exactly as the original")
+
+def start_simulation(restore_from=None):
+    """Start the simulation thread once, from the checkpoint at restore_from if given (errors are raised here)."""
+    global started
+
+    # Worker processes re-import the app; only the main process runs the simulation
+    if started or multiprocessing.parent_process() is not None:
+        return
+    started = True
 
-def start_simulation():
     print(f"✅ cell_grid initialized with size {len(world.cell_grid)}x{len(world.cell_grid[0])}")
-    threading.Thread(target=simulation_loop, daemon=True).start()
-    threading.Thread(target=food_spawning_loop, args=(world,), daemon=True).start()
+    if restore_from is not None:
+        restore_world(restore_from)
+
+    threading.Thread(target=simulation_loop, args=(restore_from is not None,), daemon=True).start()
@@ -0,0 +1,637 @@
+"""
+Immutable views of the world for the HTTP read path.
+
+The simulation thread builds a FrameSnapshot at the end of every tick and
+publishes it by assigning world.published. Readers just take that reference
+and never lock anything: nothing a snapshot points at is changed after it
+is published. Formatted responses are worked out on first use and kept on
+the snapshot, so many viewers polling the same frame share one result.
+
+Creatures and food are captured as parallel arrays (CreatureColumns, an
+(n, 2) array of food positions); the per-creature dicts of the default
+format are only built if someone asks for them.
+"""
+import itertools
+
+import numpy as np
+
+from .deltas import DeltaBlock, encode, encode_frames
+
+
+def format_state(buffer):
+    """The snapshot a finished delta block starts from, rounded for the wire."""
+    state = buffer.get("state", {})
+
+    return {
+        "creatures": [
+            {
+                **dict(c),
+                "position": [round(c["position"][0]), round(c["position"][1])],
+                "direction": round(c["direction"], 2),
+                "id": c["id"],
+                "name": c["name"]
+            }
+            for c in state.get("creatures", [])
+        ],
+        "food": state.get("food", [])
+    }
+
+
+def food_positions(positions):
+    """[x, y] positions as an (n, 2) array, rounded like the wire format."""
+    return np.rint(np.array(positions, dtype=np.float64).reshape(-1, 2)).astype(np.int64)
+
+
+def rounded(values):
+    """Whole numbers (as round() gives them) from a float array."""
+    return np.rint(values).astype(np.int64).tolist()
+
+
+def format_columns(creatures, food):
+    """format=columnar: parallel arrays instead of a dict per creature or a pair per food."""
+    return {
+        "creatures": creatures.to_json(),
+        "food": {"xs": food[:, 0].tolist(), "ys": food[:, 1].tolist()}
+    }
+
+
+def state_columns(states):
+    """(CreatureColumns, food positions) of Cell.take_snapshot() states, end to end."""
+    return (
+        CreatureColumns.concat(CreatureColumns.from_dicts(state.get("creatures", [])) for state in states),
+        food_positions([f for state in states for f in state.get("food", [])])
+    )
+
+
+class CreatureColumns:
+    """
+    Creatures as parallel arrays, one entry per creature. Numbers are kept
+    as they are and rounded when sent (whole pixels for JSON positions).
+    """
+    __slots__ = ("ids", "names", "xs", "ys", "directions", "energies", "sprite_ids")
+
+    def __init__(self, ids, names, xs, ys, directions, energies, sprite_ids):
+        self.ids = ids
+        self.names = names  # tuple
+        self.xs = xs
+        self.ys = ys
+        self.directions = directions
+        self.energies = energies
+        self.sprite_ids = sprite_ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def empty(cls):
+        ints = np.zeros(0, dtype=np.int64)
+        floats = np.zeros(0, dtype=np.float64)
+        return cls(ints, (), floats, floats, floats, floats, ints)
+
+    @classmethod
+    def capture(cls, creatures, physics=None):
+        """
+        The live ones among creatures. With physics (the PhysicsStore their
+        slots are in) positions, directions and energies are sliced out of
+        its columns; without it (CreatureViews) they are read one by one.
+        """
+        alive = [c for c in creatures if c.isAlive]
+        n = len(alive)
+
+        ids = np.fromiter((c.id for c in alive), np.int64, n)
+        names = tuple(c.name for c in alive)
+        sprite_ids = np.fromiter((c.sprite_id for c in alive), np.int64, n)
+
+        if physics is not None:
+            slots = np.fromiter((c.slot for c in alive), np.intp, n)
+            positions = physics.position[slots]
+            directions = physics.direction[slots]
+            energies = physics.energy[slots]
+        else:
+            positions = np.array([c.position for c in alive], dtype=np.float64).reshape(n, 2)
+            directions = np.fromiter((c.direction for c in alive), np.float64, n)
+            energies = np.fromiter((c.energy for c in alive), np.float64, n)
+
+        return cls(ids, names, positions[:, 0], positions[:, 1], directions, energies, sprite_ids)
+
+    @classmethod
+    def from_dicts(cls, creatures):
+        """From Creature.to_dict() entries, as in a delta block's starting state."""
+        n = len(creatures)
+        positions = np.array([c["position"] for c in creatures], dtype=np.float64).reshape(n, 2)
+
+        return cls(
+            np.fromiter((c["id"] for c in creatures), np.int64, n),
+            tuple(c["name"] for c in creatures),
+            positions[:, 0],
+            positions[:, 1],
+            np.fromiter((c["direction"] for c in creatures), np.float64, n),
+            np.fromiter((c["energy"] for c in creatures), np.float64, n),
+            np.fromiter((c["sprite_id"] for c in creatures), np.int64, n)
+        )
+
+    @classmethod
+    def concat(cls, parts):
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            return cls.empty()
+        if len(parts) == 1:
+            return parts[0]
+
+        return cls(*(
+            tuple(itertools.chain.from_iterable(part.names for part in parts)) if name == "names"
+            else np.concatenate([getattr(part, name) for part in parts])
+            for name in cls.__slots__
+        ))
+
+    def slice(self, lo, hi):
+        """Entries lo..hi, sharing this one's arrays."""
+        return CreatureColumns(*(getattr(self, name)[lo:hi] for name in CreatureColumns.__slots__))
+
+    def take(self, mask):
+        """The entries a boolean mask selects."""
+        if mask.all():
+            return self
+        names = tuple(itertools.compress(self.names, mask.tolist()))
+        return CreatureColumns(*(names if name == "names" else getattr(self, name)[mask] for name in CreatureColumns.__slots__))
+
+    def rows(self):
+        """The default format: one dict per creature."""
+        return [
+            {
+                "id": id,
+                "name": name,
+                "position": [x, y],
+                "direction": round(direction, 2),
+                "energy": energy,
+                "sprite_id": sprite_id
+            }
+            for id, name, x, y, direction, energy, sprite_id in zip(
+                self.ids.tolist(), self.names, rounded(self.xs), rounded(self.ys),
+                self.directions.tolist(), self.energies.tolist(), self.sprite_ids.tolist()
+            )
+        ]
+
+    def to_json(self):
+        return {
+            "ids": self.ids.tolist(),
+            "names": list(self.names),
+            "xs": rounded(self.xs),
+            "ys": rounded(self.ys),
+            "directions": np.round(self.directions, 2).tolist(),
+            "energies": np.round(self.energies, 2).tolist(),
+            "sprite_ids": self.sprite_ids.tolist()
+        }
+
+
+def format_deltas(buffer):
+    """A finished block's non-empty deltas, keyed by absolute frame number."""
+    if "deltas" not in buffer:
+        return {}
+
+    return {
+        str(frame): delta
+        for frame, delta in encode_frames(buffer["deltas"], buffer["count"]).items()
+    }
+
+
+def merge_deltas(per_cell):
+    """Concatenate several cells' deltas frame by frame."""
+    # Migrations are only meaningful per cell: across the whole world a creature just moved
+    merged = {}
+    for deltas in per_cell:
+        for frame, delta in deltas.items():
+            target = merged.setdefault(frame, {"new_food": "", "deleted_food": "", "creatures": ""})
+            for key in target:
+                target[key] += delta.get(key, "")
+
+    return {
+        frame: delta for frame, delta in merged.items()
+        if delta["creatures"] or delta["new_food"] or delta["deleted_food"]
+    }
+
+
+def encode_selected(selected):
+    """
+    {frame: delta} of [(block, lo, hi, keep, inside)] records (Viewport.select),
+    merged across cells frame by frame. What is left of migrations is
+    creatures entering or leaving the selection: they are sent as spawns and
+    removals, in order with the creature's other records.
+    """
+    merged = {}
+    for block, lo, hi, keep, inside in selected:
+        if hi <= lo or not keep.any():
+            continue
+
+        frames = block.frame[lo:hi]
+        starts = np.flatnonzero(np.diff(frames)) + 1
+        bounds = np.concatenate(([0], starts, [hi - lo])).tolist()
+
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            if keep[start:end].any():
+                delta = encode(block, lo + start, lo + end, keep[start:end], fold_migrations=True, inside=inside)
+                target = merged.setdefault(int(frames[start]), {"new_food": "", "deleted_food": "", "creatures": ""})
+                for k in target:
+                    target[k] += delta[k]
+
+    return {str(frame): merged[frame] for frame in sorted(merged) if any(merged[frame].values())}
+
+
+def viewed(columns, viewport):
+    """(CreatureColumns, food positions) inside a viewport, from its cells' {cell key: (creatures, food)}."""
+    creatures = CreatureColumns.concat(columns[key][0] for key in viewport.keys)
+    food = np.concatenate([columns[key][1] for key in viewport.keys])
+    return creatures.take(viewport.contains(creatures.xs, creatures.ys)), food[viewport.contains(food[:, 0], food[:, 1])]
+
+
+class BlockSnapshot:
+    """
+    Every cell's last finished delta block (see Cell.swap_buffers). Shared by
+    all the frame snapshots published until the next swap.
+    """
+
+    def __init__(self, built_index, buffers):
+        self.built_index = built_index
+        self.buffers = buffers  # {(x, y): finished state buffer}
+        self.frame = next(iter(buffers.values()), {}).get("frame")
+
+        self._full = {}
+        self._full_columns = {}
+        self._columns = {}
+        self._deltas = {}
+
+        # Encoded forms that only change when the buffers swap (see api/responses.py)
+        self.cache = {}
+
+    def full(self, key=None):
+        """Snapshot plus deltas for one cell, or for the whole world when key is None."""
+        if key not in self._full:
+            if key is not None:
+                buffer = self.buffers[key]
+                self._full[key] = {
+                    "frame": buffer["frame"],
+                    "state": format_state(buffer),
+                    "deltas": self.deltas(key)
+                }
+            else:
+                creatures = []
+                food = []
+                for cell_key in self.buffers:
+                    state = self.full(cell_key)["state"]
+                    creatures.extend(state["creatures"])
+                    food.extend(state["food"])
+
+                self._full[None] = {
+                    "frame": self.frame,
+                    "state": {"creatures": creatures, "food": food},
+                    "deltas": self.deltas(None)
+                }
+
+        return self._full[key]
+
+    def full_columns(self, key=None):
+        """full() with the state in format=columnar."""
+        if key not in self._full_columns:
+            self._full_columns[key] = {
+                "frame": self.buffers[key]["frame"] if key is not None else self.frame,
+                "state": format_columns(*self.columns(key)),
+                "deltas": self.deltas(key)
+            }
+
+        return self._full_columns[key]
+
+    def columns(self, key=None):
+        """(CreatureColumns, food positions) the block starts from, for one cell or the whole world."""
+        if key not in self._columns:
+            keys = [key] if key is not None else self.buffers
+            self._columns[key] = state_columns([self.buffers[cell_key].get("state") or {} for cell_key in keys])
+
+        return self._columns[key]
+
+    def creatures(self, key):
+        """The Creature.to_dict() entries one cell's block starts from."""
+        return (self.buffers[key].get("state") or {}).get("creatures", [])
+
+    def record_ranges(self, key=None):
+        """[(block, lo, hi)]: every record of the block, cell by cell."""
+        keys = [key] if key is not None else self.buffers
+        return [
+            (buffer["deltas"], 0, buffer["count"])
+            for buffer in (self.buffers[cell_key] for cell_key in keys) if "deltas" in buffer
+        ]
+
+    def deltas(self, key=None):
+        if key not in self._deltas:
+            if key is not None:
+                self._deltas[key] = format_deltas(self.buffers[key])
+            else:
+                self._deltas[None] = merge_deltas(self.deltas(cell_key) for cell_key in self.buffers)
+
+        return self._deltas[key]
+
+
+class Keyframe:
+    """
+    The state every cell's building delta block started from (Cell.snapshot,
+    taken at world.keyframe_frame). Shared by the frame snapshots published
+    until the next swap.
+    """
+
+    def __init__(self, frame, states):
+        self.frame = frame
+        self.states = states  # {(x, y): Cell.take_snapshot() dict}
+
+        self._state = {}
+        self._columns = {}
+
+    def state(self, key=None):
+        """The keyframe of one cell, or of the whole world when key is None, rounded for the wire."""
+        if key not in self._state:
+            if key is not None:
+                self._state[key] = format_state({"state": self.states[key] or {}})
+            else:
+                creatures = []
+                food = []
+                for cell_key in self.states:
+                    state = self.state(cell_key)
+                    creatures.extend(state["creatures"])
+                    food.extend(state["food"])
+                self._state[None] = {"creatures": creatures, "food": food}
+
+        return self._state[key]
+
+    def columns(self, key=None):
+        """(CreatureColumns, food positions) of the keyframe, for one cell or the whole world."""
+        if key not in self._columns:
+            keys = [key] if key is not None else self.states
+            self._columns[key] = state_columns([self.states[cell_key] or {} for cell_key in keys])
+
+        return self._columns[key]
+
+    def view(self, viewport):
+        """columns() as seen through a Viewport."""
+        if viewport.key not in self._columns:
+            self._columns[viewport.key] = viewed({key: self.columns(key) for key in viewport.keys}, viewport)
+
+        return self._columns[viewport.key]
+
+
+def log_copy(block, count, old=None):
+    """
+    (copy, block, generation): a DeltaBlock holding the first count records
+    of block, one of a cell's delta blocks. Cells clear their blocks and log
+    into them again (Cell.swap_buffers), so snapshots only ever hold copies.
+    old is the same block's copy in an earlier snapshot: while block has not
+    been cleared since, the copy is extended rather than made again, which
+    never changes the records earlier snapshots read.
+    """
+    if old is not None and old[1] is block and old[2] == block.generation:
+        copy = old[0]
+    else:
+        copy = DeltaBlock(max(count, 16))
+
+    copy.catch_up(block, count)
+    return copy, block, block.generation
+
+
+class CellSnapshot:
+    __slots__ = ("span", "food", "food_source", "used_sprite_ids", "delta", "log", "log_source")
+
+    def __init__(self, span, food, food_source, used_sprite_ids, delta=None, log=None, log_source=None):
+        self.span = span  # (start, end) of the cell's live creatures in FrameSnapshot.creatures
+        self.food = food  # (n, 2) array of rounded food positions
+        self.food_source = food_source  # (store, version) the food array was read from
+        self.used_sprite_ids = used_sprite_ids
+        self.delta = delta  # (block, lo, hi) of what the cell logged during the frame that just ended, or None
+        self.log = log  # (block, count): the building delta block, as far as it had got
+        self.log_source = log_source  # log_copy() the log's block is a copy from
+
+
+class FrameSnapshot:
+    """Everything the endpoints serve, as of the end of one tick."""
+
+    def __init__(self, frame, block, keyframe, cells, creatures):
+        self.frame = frame
+        self.block = block
+        self.keyframe = keyframe
+        self.cells = cells  # {(x, y): CellSnapshot}, in the world's cell order
+        self.creatures = creatures  # CreatureColumns of every cell's live creatures, end to end
+
+        self._columns = {}
+        self._live = {}
+        self._live_columnar = {}
+        self._used_sprite_ids = {}
+        self._frame_deltas = {}
+
+        # Encoded forms of this frame, filled in by whoever serves them (e.g. the push stream)
+        self.cache = {}
+
+    @property
+    def built_index(self):
+        return self.block.built_index
+
+    @classmethod
+    def capture(cls, world, previous=None):
+        """Copy out the world's current state, reusing whatever hasn't changed since previous."""
+        sources = {key: cell.log_source for key, cell in previous.cells.items()} if previous is not None else {}
+
+        finished = {}
+        if previous is not None and previous.block.built_index == world.built_index:
+            block = previous.block
+        else:
+            # ✅ The blocks that just finished were the logs previous copied: finish those copies
+            buffers = {}
+            for cell in world.cells():
+                key = (cell.x, cell.y)
+                buffer = cell.state_buffer[1 - cell.building]
+                if "deltas" in buffer:
+                    finished[key] = log_copy(buffer["deltas"], buffer["count"], sources.get(key))
+                    buffer = {**buffer, "deltas": finished[key][0]}
+                buffers[key] = buffer
+
+            block = BlockSnapshot(world.built_index, buffers)
+
+        if previous is not None and previous.keyframe.frame == world.keyframe_frame:
+            keyframe = previous.keyframe
+        else:
+            keyframe = Keyframe(world.keyframe_frame, {(cell.x, cell.y): cell.snapshot for cell in world.cells()})
+
+        alive = []
+        cells = {}
+        for cell in world.cells():
+            key = (cell.x, cell.y)
+            old = previous.cells.get(key) if previous is not None else None
+
+            with cell.lock:
+                start = len(alive)
+                alive.extend(c for c in cell.creatures if c.isAlive)
+                span = (start, len(alive))
+
+                food_source = (cell.food, cell.food.version)
+                if old is not None and old.food_source[0] is food_source[0] and old.food_source[1] == food_source[1]:
+                    food = old.food
+                else:
+                    food = food_positions([f.position for f in cell.food])
+
+                used_sprite_ids = frozenset(cell.get_used_sprite_ids())
+                source = log_copy(cell.log, len(cell.log), sources.get(key))
+
+            delta = world.frame_deltas.get(key)
+            if delta is not None:
+                # The frame's records are in the log, or in the block the frame just finished
+                copy = source[0] if delta[0] is cell.log else finished.get(key, log_copy(delta[0], delta[2]))[0]
+                delta = (copy, delta[1], delta[2])
+
+            cells[key] = CellSnapshot(span, food, food_source, used_sprite_ids, delta, (source[0], len(source[0])), source)
+
+        # ✅ Every creature in one pass; each cell's are a stretch of the arrays.
+        # Serial stepping keeps creature physics in world.physics; worker mirrors are CreatureViews
+        creatures = CreatureColumns.capture(alive, world.physics if world.stepper is None else None)
+
+        return cls(world.get_frame(), block, keyframe, cells, creatures)
+
+    def columns(self, key=None):
+        """(CreatureColumns, food positions) of one cell, or of the whole world when key is None."""
+        if key not in self._columns:
+            if key is not None:
+                cell = self.cells[key]
+                self._columns[key] = (self.creatures.slice(*cell.span), cell.food)
+            else:
+                self._columns[None] = (self.creatures, np.concatenate([cell.food for cell in self.cells.values()]))
+
+        return self._columns[key]
+
+    def view(self, viewport):
+        """(CreatureColumns, food positions) as seen through a Viewport (see viewport.py)."""
+        if viewport.key not in self._columns:
+            self._columns[viewport.key] = viewed({key: self.columns(key) for key in viewport.keys}, viewport)
+
+        return self._columns[viewport.key]
+
+    def live_state(self, key=None):
+        """Current creatures and food of one cell, or of the whole world when key is None."""
+        if key not in self._live:
+            creatures, food = self.columns(key)
+            self._live[key] = {"creatures": creatures.rows(), "food": food.tolist()}
+
+        return self._live[key]
+
+    def live_columnar(self, key=None):
+        """live_state() in format=columnar."""
+        if key not in self._live_columnar:
+            self._live_columnar[key] = format_columns(*self.columns(key))
+
+        return self._live_columnar[key]
+
+    def frame_delta(self, key=None):
+        """
+        The change from the previous snapshot to this one: one cell's delta,
+        or every cell's concatenated (without migrations) when key is None.
+        """
+        if key not in self._frame_deltas:
+            if key is not None:
+                delta = self.cells[key].delta
+                self._frame_deltas[key] = encode(*delta) if delta else {
+                    "creatures": "", "new_food": "", "deleted_food": "", "migrations": ""
+                }
+            else:
+                merged = {"creatures": [], "new_food": [], "deleted_food": []}
+                for cell_key, cell in self.cells.items():
+                    if cell.delta:
+                        delta = self.frame_delta(cell_key)
+                        for k, parts in merged.items():
+                            parts.append(delta[k])
+                self._frame_deltas[None] = {k: "".join(parts) for k, parts in merged.items()}
+
+        return self._frame_deltas[key]
+
+    @property
+    def history_start(self):
+        """The oldest frame deltas_since() can start from."""
+        return self.built_index if self.built_index is not None else self.keyframe.frame
+
+    def deltas_since(self, since, key=None):
+        """
+        {frame: delta} for every frame from since up to this snapshot, for one
+        cell or (without migrations) the whole world. None when since is not
+        in the history: older than history_start or newer than this frame.
+        """
+        if not (self.history_start <= since <= self.frame):
+            return None
+
+        if key is not None:
+            return self._cell_deltas_since(since, key)
+
+        return merge_deltas(self._cell_deltas_since(since, cell_key) for cell_key in self.cells)
+
+    def _cell_deltas_since(self, since, key):
+        deltas = {}
+        for block, lo, hi in self._cell_ranges_since(since, key):
+            for frame, delta in encode_frames(block, hi, lo).items():
+                deltas[str(frame)] = delta
+
+        return deltas
+
+    def ranges_since(self, since, key=None):
+        """[(block, lo, hi)]: the records behind deltas_since(), cell by cell. None when since is not in the history."""
+        if not (self.history_start <= since <= self.frame):
+            return None
+
+        keys = [key] if key is not None else self.cells
+        return [r for cell_key in keys for r in self._cell_ranges_since(since, cell_key)]
+
+    def _cell_ranges_since(self, since, key):
+        ranges = []
+        if since < self.keyframe.frame:
+            # ✅ The start of the range is in the published block
+            buffer = self.block.buffers[key]
+            ranges.append((buffer["deltas"], buffer["count"]))
+        ranges.append(self.cells[key].log)
+
+        return [(block, block.first_at(since, count), count) for block, count in ranges]
+
+    def view_ranges(self, viewport, since=None):
+        """
+        [(block, lo, hi, keep, inside)]: the records a Viewport sees, of the last
+        finished block, or with since from since on (None when since is not
+        in the history, as for ranges_since).
+        """
+        if since is None:
+            cells = [(self.block.creatures(key), self.block.record_ranges(key)) for key in viewport.keys]
+        elif self.history_start <= since <= self.frame:
+            cells = [self._cell_view_since(since, key) for key in viewport.keys]
+        else:
+            return None
+
+        return viewport.select(cells)
+
+    def _cell_view_since(self, since, key):
+        """(creatures, ranges) for Viewport.select: _cell_ranges_since() and the state its oldest block started from."""
+        ranges = self._cell_ranges_since(since, key)
+        if since < self.keyframe.frame:
+            return self.block.creatures(key), ranges
+        return (self.keyframe.states[key] or {}).get("creatures", []), ranges
+
+    def view_deltas(self, viewport, since=None):
+        """{frame: delta} of view_ranges(), or None when since is not in the history."""
+        selected = self.view_ranges(viewport, since)
+        return encode_selected(selected) if selected is not None else None
+
+    def full(self, key=None):
+        return self.block.full(key)
+
+    def deltas(self, key=None):
+        return self.block.deltas(key)
+
+    def used_sprite_ids(self, key=None):
+        if key not in self._used_sprite_ids:
+            if key is not None:
+                self._used_sprite_ids[key] = self.cells[key].used_sprite_ids
+            else:
+                self._used_sprite_ids[None] = frozenset().union(*(cell.used_sprite_ids for cell in self.cells.values()))
+
+        return self._used_sprite_ids[key]
+
+    def view_sprite_ids(self, viewport):
+        """used_sprite_ids() of the cells a Viewport overlaps."""
+        return frozenset().union(*(self.used_sprite_ids(key) for key in viewport.keys))
@@ -0,0 +1,293 @@
+import bisect
+import hashlib
+import threading
+import uuid
+
+EVICTION_LOG = 4096  # evictions remembered for changes_since(); older versions get everything again
+ID_BITS = 48  # sprite ids stay exact as JSON numbers in JavaScript and in the float delta columns
+
+
+ORGAN_COLORS = {
+    "mouth": "yellow",
+    "eye": "white",
+    "flipper": "orange",
+    "spike": "red"
+}
+
+
+def content_id(layout):
+    """The sprite id a layout hashes to: the same in every process and after every restart."""
+    digest = hashlib.blake2b(layout.encode(), digest_size=ID_BITS // 8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def layout_organs(layout):
+    """The organs of a layout (Creature.serialize_organs), as Organ.to_dict() gives them."""
+    def number(text):
+        value = float(text)
+        return int(value) if value.is_integer() and "." not in text else value
+
+    _, *organs = layout.split("|")
+    return [
+        {"type": organ_type, "position": [number(ox), number(oy)], "size": number(size)}
+        for organ_type, ox, oy, size in (organ.split(",") for organ in organs if organ)
+    ]
+
+
+def render_svg(layout, body_radius, canvas_size=150):
+    """A layout (Creature.serialize_organs) drawn as an SVG document."""
+    body, *organs = layout.split("|")
+    _, bx, by = body.split(",")
+    organs = [organ.split(",") for organ in organs if organ]
+
+    half = canvas_size // 2
+    svg = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{canvas_size}" height="{canvas_size}" viewBox="{-half} {-half} {canvas_size} {canvas_size}">']
+
+    # ➤ Draw connection lines first
+    for _, ox, oy, _ in organs:
+        svg.append(f'<line x1="{bx}" y1="{by}" x2="{ox}" y2="{oy}" stroke="black" stroke-width="1"/>')
+
+    # ➤ Draw body center
+    svg.append(f'<circle cx="{bx}" cy="{by}" r="{body_radius}" fill="blue" stroke="black" stroke-width="1"/>')
+
+    # ➤ Draw organs
+    for organ_type, ox, oy, size in organs:
+        color = ORGAN_COLORS.get(organ_type, "gray")
+        svg.append(f'<circle cx="{ox}" cy="{oy}" r="{size}" fill="{color}" stroke="black" stroke-width="1"/>')
+
+    svg.append('</svg>')
+    return "\n".join(svg)
+
+
+class SpriteRegistry:
+    """
+    Every organ layout (Creature.serialize_organs) a living creature has, and
+    its sprite id: a hash of the layout (content_id), so an id always names
+    the same layout and clients may cache it for good. Layouts are indexed
+    both ways, so finding the id of a layout is one dictionary lookup however
+    many have been seen. One lock guards everything; it is never held for long.
+
+    Should two layouts hash alike, the later one takes the next id no layout
+    has had. Which layout gets which then depends on the order they came in,
+    so every id in the clash is remembered (clashed) with the layout it was
+    given to: it is never given to another one, even once evicted, and is
+    not to be cached for good.
+
+    Each id counts the live creatures using it (acquire/release, called on
+    births, deaths, mutations and organ deaths). A layout nobody has used for
+    a grace period is evicted: clients may still be reading deltas and state
+    that name it until then (see config.SPRITE_GRACE_FRAMES).
+
+    version goes up by one for every layout added or evicted, so a client
+    that remembers it can ask for just what changed since (changes_since).
+    Clients are given it as a token prefixed with the registry's epoch, which
+    is new in every process: a version from before a restart counts from
+    another start, and is never mistaken for one of ours.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.layouts = {}  # {sprite_id: layout}
+        self.ids = {}  # {layout: sprite_id}
+        self.clashed = {}  # {sprite_id: layout} for ids in a hash clash, kept after eviction
+
+        self.refs = {}  # {sprite_id: live creatures using it}, only ids in use
+        self.unused = {}  # {sprite_id: frame it fell out of use}, oldest first
+        self.changes = {}  # {sprite_id: change in refs since take_changes()}
+        self.frame = 0  # as of the last evict()
+
+        self.version = 0  # counts layouts ever added or evicted
+        self.epoch = uuid.uuid4().hex[:12]  # names this run's numbering of versions (see token)
+        self.added = []  # (version, sprite_id) per added layout, in order
+        self.evicted = []  # (version, sprite_id) per eviction, the last EVICTION_LOG of them
+        self.floor = 0  # oldest version changes_since() can answer from
+
+    def __len__(self):
+        return len(self.layouts)
+
+    def id_for(self, layout):
+        """(sprite_id, created): the layout's id, registering it if it is not registered."""
+        with self.lock:
+            sprite_id = self.ids.get(layout)
+            if sprite_id is not None:
+                return sprite_id, False
+
+            sprite_id = content_id(layout)
+            while self._owner(sprite_id, layout) != layout:
+                # Another layout hashed here first: try the next id no other layout has ever had
+                self.clashed.setdefault(sprite_id, self._owner(sprite_id, layout))
+                sprite_id = (sprite_id + 1) % (1 << ID_BITS)
+
+            self._add(sprite_id, layout)
+            return sprite_id, True
+
+    def _owner(self, sprite_id, default):
+        """The layout sprite_id names, or named when it is a clashed one; default if neither."""
+        return self.layouts.get(sprite_id, self.clashed.get(sprite_id, default))
+
+    def is_clashed(self, sprite_id):
+        """Whether sprite_id was handed out in a hash clash, so which layout it names depended on order."""
+        with self.lock:
+            return sprite_id in self.clashed
+
+    def add(self, sprite_id, layout):
+        """Register a layout under the id another process gave it."""
+        with self.lock:
+            self._add(sprite_id, layout)
+
+    def update(self, items):
+        with self.lock:
+            for sprite_id, layout in items:
+                self._add(sprite_id, layout)
+
+    def _add(self, sprite_id, layout):
+        if sprite_id not in self.layouts:
+            self.layouts[sprite_id] = layout
+            # ✅ Should two processes settle a hash clash differently, new lookups keep the first
+            self.ids.setdefault(layout, sprite_id)
+
+            # An id settled away from its hash (here, in another process or before a restore) is clashed
+            first = content_id(layout)
+            if sprite_id != first:
+                self.clashed.setdefault(sprite_id, layout)
+                if first in self.layouts:
+                    self.clashed.setdefault(first, self.layouts[first])
+
+            self.version += 1
+            self.added.append((self.version, sprite_id))
+            if sprite_id not in self.refs:
+                self.unused[sprite_id] = self.frame
+
+    def acquire(self, sprite_id):
+        """One more live creature uses sprite_id."""
+        with self.lock:
+            self._count(sprite_id, 1)
+            self.changes[sprite_id] = self.changes.get(sprite_id, 0) + 1
+
+    def release(self, sprite_id):
+        """One live creature fewer uses sprite_id."""
+        if sprite_id is None:
+            return
+        with self.lock:
+            self._count(sprite_id, -1)
+            self.changes[sprite_id] = self.changes.get(sprite_id, 0) - 1
+
+    def take_changes(self):
+        """{sprite_id: change in use} since the last call, for apply_changes in another process."""
+        with self.lock:
+            changes, self.changes = self.changes, {}
+        return {sprite_id: n for sprite_id, n in changes.items() if n}
+
+    def apply_changes(self, changes):
+        """Count the creatures another process gained and lost (its take_changes())."""
+        with self.lock:
+            for sprite_id, n in changes.items():
+                self._count(sprite_id, n)
+
+    def _count(self, sprite_id, n):
+        refs = self.refs.get(sprite_id, 0) + n
+        if refs > 0:
+            self.refs[sprite_id] = refs
+            self.unused.pop(sprite_id, None)
+        else:
+            # ✅ Re-inserted at the end, so unused stays in the order ids fell out of use
+            self.refs.pop(sprite_id, None)
+            self.unused.pop(sprite_id, None)
+            self.unused[sprite_id] = self.frame
+
+    def evict(self, frame, grace):
+        """Forget layouts unused since more than grace frames before frame. Returns their ids."""
+        evicted = []
+        with self.lock:
+            self.frame = frame
+
+            for sprite_id, since in self.unused.items():
+                if frame - since <= grace:
+                    break
+                evicted.append(sprite_id)
+
+            for sprite_id in evicted:
+                del self.unused[sprite_id]
+                layout = self.layouts.pop(sprite_id, None)
+                if self.ids.get(layout) == sprite_id:
+                    del self.ids[layout]
+
+                self.version += 1
+                self.evicted.append((self.version, sprite_id))
+
+            if evicted and len(self.added) > 2 * len(self.layouts):
+                self.added = [(version, sprite_id) for version, sprite_id in self.added if sprite_id in self.layouts]
+
+            if len(self.evicted) > EVICTION_LOG:
+                dropped = len(self.evicted) - EVICTION_LOG // 2
+                self.floor = self.evicted[dropped - 1][0]
+                del self.evicted[:dropped]
+
+        return evicted
+
+    def get(self, sprite_id):
+        return self.layouts.get(sprite_id)
+
+    def layouts_for(self, sprite_ids):
+        """{sprite_id: layout} for the given ids that are registered."""
+        with self.lock:
+            return {sprite_id: self.layouts[sprite_id] for sprite_id in sprite_ids if sprite_id in self.layouts}
+
+    def all(self):
+        """A copy of every {sprite_id: layout}."""
+        with self.lock:
+            return dict(self.layouts)
+
+    def unused_since(self):
+        """A copy of {sprite_id: frame it fell out of use} for every unused layout, oldest first."""
+        with self.lock:
+            return dict(self.unused)
+
+    def restore_unused(self, unused, frame):
+        """
+        Put back unused_since() as saved with the world at frame (see
+        checkpoint.py), so restored layouts nobody uses get the rest of
+        their grace period rather than being evicted at the next evict().
+        """
+        with self.lock:
+            self.frame = frame
+            for sprite_id, since in unused.items():
+                if sprite_id in self.layouts and sprite_id not in self.refs:
+                    self.unused.pop(sprite_id, None)
+                    self.unused[sprite_id] = since
+
+    def token(self, version):
+        """A version as clients see it: "epoch.version"."""
+        return f"{self.epoch}.{version}"
+
+    def changes_since(self, token):
+        """
+        (token, {sprite_id: layout} added, [sprite_id] evicted, reset) since
+        the version token names (one this method returned). When it is too
+        old, from another run or not a token at all, reset is True and every
+        layout is returned instead, to replace what the caller has.
+        """
+        epoch, _, number = str(token).partition(".")
+        version = int(number) if epoch == self.epoch and number.isdigit() else -1
+
+        with self.lock:
+            if not (self.floor <= version <= self.version):
+                return self.token(self.version), dict(self.layouts), [], True
+
+            start = bisect.bisect_right(self.added, (version, float("inf")))
+            added = {sprite_id: self.layouts[sprite_id] for _, sprite_id in self.added[start:] if sprite_id in self.layouts}
+
+            # ✅ An id evicted and then registered again is simply there
+            start = bisect.bisect_right(self.evicted, (version, float("inf")))
+            evicted = [sprite_id for _, sprite_id in self.evicted[start:] if sprite_id not in self.layouts]
+
+            return self.token(self.version), added, evicted, False
+
+    def added_since(self, version):
+        """(sprite_id, layout) for every layout added after version and not evicted since, oldest first."""
+        with self.lock:
+            start = bisect.bisect_right(self.added, (version, float("inf")))
+            return [(sprite_id, self.layouts[sprite_id]) for _, sprite_id in self.added[start:] if sprite_id in self.layouts]
+
+
+sprites = SpriteRegistry()
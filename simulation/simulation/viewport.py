@@ -0,0 +1,225 @@
+"""
+Viewport queries (?rect=x0,y0,x1,y1 on /getstate and /getdeltas).
+
+The world's cells are the spatial index: a viewport grown by a margin
+overlaps a handful of them, and only those cells' creatures, food and delta
+records are looked at, so what a viewer costs depends on what it can see
+rather than on the size of the world. The rectangle may run past the edges
+of the world; it wraps like everything else does.
+
+Everything is clipped to the grown rectangle. State holds the creatures and
+food inside it. Deltas hold the records of what is inside: select() replays
+the overlapped cells' records from the state their block started with, so
+it knows where every creature is at each record. A creature that moves in
+is sent as a spawn (a MIGRATE_IN with its spawn payload) and one that moves
+out as a removal (MIGRATE_OUT); its other records are sent only while it is
+inside. Positions are the ones clients are sent, which trail the true ones
+by up to half a pixel (PhysicsStore.integrate), so a creature right on the
+margin's edge may be judged differently by state and deltas; the margin
+keeps that out of sight.
+"""
+import math
+
+import numpy as np
+
+import simulation.config as config
+from . import deltas
+
+
+def wrapped_spans(lo, hi, size):
+    """[lo, hi) on a circle of the given size, as one or two spans within [0, size)."""
+    width = hi - lo
+    if width >= size:
+        return [(0, size)]
+
+    lo %= size
+    hi = lo + width
+    if hi <= size:
+        return [(lo, hi)]
+    return [(lo, size), (0, hi - size)]
+
+
+def span_cells(spans, cell_size, grid_cells):
+    """Sorted indices of the cells the spans overlap, along one axis."""
+    cells = set()
+    for lo, hi in spans:
+        first = int(lo // cell_size)
+        last = min(grid_cells - 1, int(math.ceil(hi / cell_size)) - 1)
+        cells.update(range(first, last + 1))
+    return sorted(cells)
+
+
+def spawn_payload(creature):
+    """A SPAWN payload (Cell.spawn_record) from a Creature.to_dict() entry, to be updated as records are replayed."""
+    return {
+        "id": creature["id"],
+        "position": list(creature["position"]),
+        "direction": creature["direction"],
+        "sprite_id": creature["sprite_id"],
+        "name": creature["name"],
+        "parent_ids": list(creature.get("parent_ids") or []),
+        "creator": creature.get("creator")
+    }
+
+
+class Viewport:
+    """A rectangle of the world grown by margin on every side, and the cells it overlaps."""
+
+    def __init__(self, x0, y0, x1, y1, margin=0, world_size=config.WORLD_SIZE, grid_cells=config.GRID_CELLS):
+        if not all(math.isfinite(v) for v in (x0, y0, x1, y1, margin)):
+            raise ValueError("rect must be four finite numbers")
+        if x1 <= x0 or y1 <= y0:
+            raise ValueError("rect must be x0,y0,x1,y1 with x0 < x1 and y0 < y1")
+
+        self.key = ("rect", x0, y0, x1, y1, margin)  # what responses for it are cached under
+        self.world_size = world_size
+
+        self.xs = wrapped_spans(x0 - margin, x1 + margin, world_size)
+        self.ys = wrapped_spans(y0 - margin, y1 + margin, world_size)
+
+        cell_size = world_size / grid_cells
+        cols = span_cells(self.xs, cell_size, grid_cells)
+        rows = span_cells(self.ys, cell_size, grid_cells)
+        self.keys = [(col, row) for row in rows for col in cols]  # overlapped cells, in the world's cell order
+
+    @classmethod
+    def parse(cls, text, margin=0):
+        """From "x0,y0,x1,y1" (world pixels). Raises ValueError when it isn't one."""
+        try:
+            x0, y0, x1, y1 = (float(v) for v in text.split(","))
+        except ValueError:
+            raise ValueError("rect must be x0,y0,x1,y1") from None
+        return cls(x0, y0, x1, y1, margin)
+
+    def contains(self, xs, ys):
+        """Boolean mask of the positions inside the grown rectangle."""
+        xs = np.asarray(xs, dtype=np.float64) % self.world_size
+        ys = np.asarray(ys, dtype=np.float64) % self.world_size
+        return self._within(xs, self.xs) & self._within(ys, self.ys)
+
+    def holds(self, x, y):
+        """contains() for one position."""
+        x %= self.world_size
+        y %= self.world_size
+        return any(lo <= x < hi for lo, hi in self.xs) and any(lo <= y < hi for lo, hi in self.ys)
+
+    @staticmethod
+    def _within(values, spans):
+        inside = np.zeros(len(values), dtype=bool)
+        for lo, hi in spans:
+            inside |= (values >= lo) & (values < hi)
+        return inside
+
+    def select(self, cells):
+        """
+        [(block, 0, n, keep, None)], one per overlapped cell: a new DeltaBlock
+        of the records the viewport sees. cells holds, per overlapped cell,
+        (creatures, ranges): the Creature.to_dict() entries its oldest block
+        started from, and [(block, lo, hi)] record ranges, oldest first, each
+        replayed from the start of its block and sent from lo.
+
+        Migrations of a creature that stays inside while moving between two
+        overlapped cells (its MIGRATE_OUT and MIGRATE_IN in one frame) are
+        left out; what is left of a migration is a creature entering or
+        leaving the viewport, which the client sees as a spawn or a removal.
+        """
+        replayed = [self._replay(creatures, ranges) for creatures, ranges in cells]
+
+        # ✅ {(frame, id): kinds of the migration records that were sent}
+        sent = {}
+        for rows in replayed:
+            for frame, kind, id, *_, migration in rows:
+                if migration:
+                    sent.setdefault((frame, id), set()).add(kind)
+
+        selected = []
+        for rows in replayed:
+            block = deltas.DeltaBlock(max(1, len(rows)))
+            for frame, kind, id, a, b, c, payload, migration in rows:
+                if migration and len(sent[(frame, id)]) > 1:
+                    continue
+                block.append(frame, kind, id, a, b, c, payload)
+            selected.append((block, 0, len(block), np.ones(len(block), dtype=bool), None))
+
+        return selected
+
+    def _replay(self, creatures, ranges):
+        """
+        [(frame, kind, id, a, b, c, payload, migration)]: the records of one
+        cell's ranges the viewport sees, with spawns and removals for the
+        creatures that moved in and out. migration marks the cell's own
+        MIGRATE_OUT and MIGRATE_IN records, which select() pairs up.
+        """
+        known = {creature["id"]: spawn_payload(creature) for creature in creatures}  # {id: where it is now, as a spawn}
+        inside = {id for id, payload in known.items() if self.holds(*payload["position"])}
+
+        rows = []
+        for block, lo, hi in ranges:
+            records = zip(block.frame[:hi].tolist(), block.kind[:hi].tolist(), block.id[:hi].tolist(),
+                          block.a[:hi].tolist(), block.b[:hi].tolist(), block.c[:hi].tolist(), block.ref[:hi].tolist())
+
+            for i, (frame, kind, id, a, b, c, ref) in enumerate(records):
+                send = i >= lo
+
+                if kind == deltas.MOVE:
+                    payload = known.get(id)
+                    if payload is None:
+                        continue
+                    position = payload["position"]
+                    if not math.isnan(a):
+                        position[0] = a
+                    if not math.isnan(b):
+                        position[1] = b
+                    if not math.isnan(c):
+                        payload["direction"] = c
+
+                    was, now = id in inside, self.holds(*position)
+                    if now:
+                        inside.add(id)
+                    else:
+                        inside.discard(id)
+
+                    if send and was and now:
+                        rows.append((frame, kind, id, a, b, c, None, False))
+                    elif send and now:
+                        rows.append((frame, deltas.MIGRATE_IN, id, deltas.NAN, deltas.NAN, deltas.NAN,
+                                     dict(payload, position=list(position), parent_ids=list(payload["parent_ids"])), False))
+                    elif send and was:
+                        rows.append((frame, deltas.MIGRATE_OUT, id, deltas.NAN, deltas.NAN, deltas.NAN, None, False))
+
+                elif kind in (deltas.SPAWN, deltas.MIGRATE_IN):
+                    payload = block.payloads[ref]
+                    known[id] = dict(payload, position=list(payload["position"]), parent_ids=list(payload["parent_ids"]))
+                    if self.holds(*payload["position"]):
+                        inside.add(id)
+                        if send:
+                            rows.append((frame, kind, id, a, b, c, payload, kind == deltas.MIGRATE_IN))
+                    else:
+                        inside.discard(id)
+
+                elif kind in (deltas.REMOVE, deltas.MIGRATE_OUT):
+                    known.pop(id, None)
+                    if id in inside:
+                        inside.discard(id)
+                        if send:
+                            rows.append((frame, kind, id, a, b, c, None, kind == deltas.MIGRATE_OUT))
+
+                elif kind in (deltas.ENERGY, deltas.ORGAN_DEATH):
+                    if kind == deltas.ORGAN_DEATH and id in known:
+                        known[id]["sprite_id"] = int(a)
+                    if send and id in inside:
+                        rows.append((frame, kind, id, a, b, c, None, False))
+
+                elif not send:
+                    continue
+
+                elif kind in (deltas.FOOD_ADD, deltas.FOOD_REMOVE):
+                    if self.holds(a, b):
+                        rows.append((frame, kind, id, a, b, c, None, False))
+
+                elif kind == deltas.FOOD_BATCH:
+                    xy = deltas.batch_positions(block, ref, self.contains)
+                    if len(xy):
+                        rows.append((frame, kind, len(xy), a, b, c, xy, False))
+
+        return rows
@@ -0,0 +1,210 @@
+"""
+Binary wire format (application/octet-stream), version 1.
+
+A message is a header followed by sections, each tagged and length-prefixed
+so a reader can skip sections it does not know:
+
+    "EVW" u8 version  varint frame  { u8 tag  varint length  body }*
+
+    STATE    varint frame  varint n
+             n varint ids, n varint sprite ids,
+             n i16 xs, n i16 ys, n u16 directions, n zigzag energies,
+             n strings (names)
+             varint m  m i16 food xs, m i16 food ys
+    DELTAS   varint base frame  varint n
+             n u8 kinds, n varint (frame - base), n varint ids,
+             then per kind, for its records in order:
+               MOVE         n u8 flags (1 x, 2 y, 4 d), i16 xs, i16 ys, u16 ds of those flagged
+               FOOD_ADD     i16 xs, i16 ys (a FOOD_BATCH is sent as its FOOD_ADDs)
+               FOOD_REMOVE  i16 xs, i16 ys
+               ENERGY       zigzag energies
+               ORGAN_DEATH  varint sprite ids
+               SPAWN, MIGRATE_IN  per record: i16 x, i16 y, u16 direction,
+                            varint sprite id, string name, varint count +
+                            varint parent ids, string creator
+    SPRITES  varint n  n × (varint sprite id, string layout)
+    SINCE    varint frame
+
+Numbers are little-endian. Positions are fixed point (POSITION_SCALE steps
+per pixel), directions are turns in 1/65536ths, energies hundredths.
+Strings are a varint byte length and UTF-8. Varints are unsigned LEB128;
+zigzag maps signed to unsigned (0, -1, 1, -2, ... -> 0, 1, 2, 3, ...).
+"""
+import math
+
+import numpy as np
+
+import simulation.config as config
+from . import deltas
+
+VERSION = 1
+MAGIC = b"EVW"
+MIMETYPE = "application/octet-stream"
+
+STATE, DELTAS, SPRITES, SINCE = 1, 2, 3, 4
+
+POSITION_SCALE = 2 ** int(math.log2(32767 / config.WORLD_SIZE))  # 64 for a 500px world: the largest power of two that fits int16
+DIRECTION_SCALE = 65536 / (2 * math.pi)
+ENERGY_SCALE = 100
+
+MOVE_X, MOVE_Y, MOVE_D = 1, 2, 4
+
+
+def varint(n):
+    out = bytearray()
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+    return bytes(out)
+
+
+def string(s):
+    data = (s or "").encode()
+    return varint(len(data)) + data
+
+
+def varints(values):
+    """Unsigned LEB128 of every value in an integer array, end to end."""
+    values = np.asarray(values, dtype=np.uint64)
+    if not len(values):
+        return b""
+
+    # Bytes each value needs: one per started 7 bits
+    sizes = np.ones(len(values), dtype=np.int64)
+    rest = values >> np.uint64(7)
+    while rest.any():
+        sizes += rest > 0
+        rest >>= np.uint64(7)
+
+    out = np.empty(int(sizes.sum()), dtype=np.uint8)
+    starts = np.cumsum(sizes) - sizes
+    for k in range(int(sizes.max())):
+        has = sizes > k
+        chunk = ((values[has] >> np.uint64(7 * k)) & np.uint64(0x7F)).astype(np.uint8)
+        more = (sizes[has] > k + 1).astype(np.uint8) << 7
+        out[starts[has] + k] = chunk | more
+
+    return out.tobytes()
+
+
+def zigzag(values):
+    values = np.asarray(values, dtype=np.int64)
+    return ((values << 1) ^ (values >> 63)).astype(np.uint64)
+
+
+def positions(values):
+    wrapped = np.asarray(values, dtype=np.float64) % config.WORLD_SIZE
+    return np.rint(wrapped * POSITION_SCALE).astype("<i2").tobytes()
+
+
+def directions(values):
+    turns = np.rint(np.asarray(values, dtype=np.float64) * DIRECTION_SCALE).astype(np.int64) % 65536
+    return turns.astype("<u2").tobytes()
+
+
+def energies(values):
+    return varints(zigzag(np.rint(np.asarray(values, dtype=np.float64) * ENERGY_SCALE)))
+
+
+def section(tag, body):
+    return bytes((tag,)) + varint(len(body)) + body
+
+
+def message(frame, *sections):
+    return MAGIC + bytes((VERSION,)) + varint(frame) + b"".join(sections)
+
+
+def state_section(frame, creatures, food):
+    """STATE from CreatureColumns and an (n, 2) food array."""
+    return section(STATE, b"".join((
+        varint(frame),
+        varint(len(creatures)),
+        varints(creatures.ids),
+        varints(creatures.sprite_ids),
+        positions(creatures.xs),
+        positions(creatures.ys),
+        directions(creatures.directions),
+        energies(creatures.energies),
+        b"".join(string(name) for name in creatures.names),
+        varint(len(food)),
+        positions(food[:, 0]),
+        positions(food[:, 1])
+    )))
+
+
+def spawn(payload):
+    x, y = payload["position"]
+    return b"".join((
+        positions([x, y]),
+        directions([payload["direction"]]),
+        varint(payload["sprite_id"]),
+        string(payload["name"]),
+        varint(len(payload["parent_ids"])),
+        varints(payload["parent_ids"]),
+        string(payload["creator"])
+    ))
+
+
+def deltas_section(ranges, base, migrations=True):
+    """
+    DELTAS from [(block, lo, hi)] record ranges, in order, or [(block, lo,
+    hi, keep, inside)] with a boolean per record and a food filter
+    (Viewport.select). base is the frame record frames are counted from.
+    Without migrations, MIGRATE_OUT and MIGRATE_IN records are left out
+    (whole-world views, see merge_deltas).
+    """
+    columns = {name: [] for name in ("frame", "kind", "id", "a", "b", "c")}
+    payloads = []
+    for block, lo, hi, *selected in ranges:
+        keep, inside = selected or (None, None)
+        kinds = block.kind[lo:hi]
+        mask = np.ones(hi - lo, dtype=bool) if migrations else (kinds != deltas.MIGRATE_OUT) & (kinds != deltas.MIGRATE_IN)
+        if keep is not None:
+            mask &= keep
+
+        frame, kind, ids, a, b, c, refs = deltas.expand_batches(block, lo, hi, mask, inside)
+        for parts, values in zip(columns.values(), (frame, kind, ids, a, b, c)):
+            parts.append(values)
+
+        payloads.extend(block.payloads[r] for r in refs[refs >= 0].tolist())
+
+    frame, kind, ids, a, b, c = (np.concatenate(parts) if parts else np.zeros(0) for parts in columns.values())
+    kind = kind.astype(np.uint8)
+
+    body = [
+        varint(base),
+        varint(len(kind)),
+        kind.tobytes(),
+        varints(frame.astype(np.int64) - base),
+        varints(ids.astype(np.int64))
+    ]
+
+    moves = kind == deltas.MOVE
+    mx, my, md = a[moves], b[moves], c[moves]
+    has_x, has_y, has_d = ~np.isnan(mx), ~np.isnan(my), ~np.isnan(md)
+    flags = has_x * MOVE_X + has_y * MOVE_Y + has_d * MOVE_D
+    body += [flags.astype(np.uint8).tobytes(), positions(mx[has_x]), positions(my[has_y]), directions(md[has_d])]
+
+    for food_kind in (deltas.FOOD_ADD, deltas.FOOD_REMOVE):
+        rows = kind == food_kind
+        body += [positions(a[rows]), positions(b[rows])]
+
+    body.append(energies(a[kind == deltas.ENERGY]))
+    body.append(varints(a[kind == deltas.ORGAN_DEATH].astype(np.int64)))
+
+    # ✅ Only SPAWN and MIGRATE_IN records carry a payload; they are the only ones encoded one by one
+    body.append(b"".join(spawn(payload) for payload in payloads))
+
+    return section(DELTAS, b"".join(body))
+
+
+def sprites_section(layouts):
+    """SPRITES from {sprite_id: layout}."""
+    return section(SPRITES, varint(len(layouts)) + b"".join(
+        varint(sprite_id) + string(layout) for sprite_id, layout in layouts.items()
+    ))
+
+
+def since_section(frame):
+    return section(SINCE, varint(frame))
@@ -1,57 +1,345 @@
-import threading
+import random
+import hashlib
+import json
+import math
+import time
+import numpy as np
+import simulation.config as config
 from .cell import Cell
+from .commands import CommandQueue
+from .grid import SpatialGrid
+from .physics import PhysicsStore
+from .sprites import sprites
 
 class World:
-    def __init__(self):
+    def __init__(self, seed=None):
         self.frame = 0
-        self.creatures = []
-        self.creatures_lock = threading.RLock()
 
-        self.food = []
-        self.food_lock = threading.RLock()
+        # ✅ All simulation randomness comes from this one stream
+        self.seed = seed if seed is not None else config.SEED
+        self.rng = random.Random(self.seed)
+        self.np_rng = self._numpy_rng(self.seed)  # for vectorised draws (food batches)
+        self.food_accumulator = 0.0
+        self.max_food = config.MAX_FOOD  # food each cell holds at most (Cell.add, spawn_food)
+
+        self.physics = PhysicsStore()
+
+        # ✅ The world is split into GRID_CELLS x GRID_CELLS square cells
+        self.grid_cells = config.GRID_CELLS
+        self.cell_size = config.WORLD_SIZE / self.grid_cells
+
+        # ✅ Collision broadphase, reused by each cell in turn (Cell.run_collisions)
+        self.collision_grid = SpatialGrid(config.WORLD_SIZE, config.WORLD_SIZE, config.COLLISION_CELL_SIZE)
 
         self.cell_grid = self._initialize_cells()
         self.built_index = None
+        self.keyframe_frame = 0  # frame every cell's current snapshot (the building block's keyframe) was taken at
+
+        # ✅ The latest FrameSnapshot (see snapshot.py). Only ever replaced
+        # whole, so the HTTP threads read it without taking any lock
+        self.published = None
+        self.on_publish = []  # callbacks given each new snapshot, on the simulation thread
+
+        # ✅ Each cell's delta for the frame that just ended, for the push stream
+        self.frame_deltas = {}
+
+        # ✅ Uploads, births and deaths wait here until apply_commands()
+        self.commands = CommandQueue()
+
+        # ✅ Set by ParallelStepper.start(): cells are then stepped in worker
+        # processes and these cells only mirror what the workers report
+        self.stepper = None
 
     def _initialize_cells(self):
-        grid = [[Cell(x, y) for x in range(10)] for y in range(10)]  # Or however you're partitioning
+        grid = [[Cell(x, y) for x in range(self.grid_cells)] for y in range(self.grid_cells)]
         for row in grid:
             for cell in row:
                 cell.world = self  # Optional backref if needed
         return grid
 
+    def cells(self):
+        """Every cell, in row-major order (the order cells are stepped in)."""
+        for row in self.cell_grid:
+            yield from row
+
+    def cell_index(self, x, y):
+        col = int(x // self.cell_size) % self.grid_cells
+        row = int(y // self.cell_size) % self.grid_cells
+        return col, row
+
+    def cell_at(self, position):
+        """The cell a world position falls in."""
+        col, row = self.cell_index(position[0], position[1])
+        return self.cell_grid[row][col]
+
+    def _span(self, low, high):
+        # Cell indices covering [low, high] along one axis, wrapped and without repeats
+        first = int(math.floor(low / self.cell_size))
+        last = int(math.floor(high / self.cell_size))
+        if last - first + 1 >= self.grid_cells:
+            return range(self.grid_cells)
+        return [i % self.grid_cells for i in range(first, last + 1)]
+
+    def cells_near(self, x, y, radius):
+        """Every cell within radius of (x, y), wrapping at the edges."""
+        for row in self._span(y - radius, y + radius):
+            for col in self._span(x - radius, x + radius):
+                yield self.cell_grid[row][col]
+
+    def _numpy_rng(self, seed):
+        # numpy wants an int; derive one from any seed random.Random accepts
+        return np.random.default_rng(None if seed is None else random.Random(seed).getrandbits(64))
+
+    def reseed(self, seed):
+        """Restart the world's RNG streams from seed."""
+        self.seed = seed
+        self.rng.seed(seed)
+        self.np_rng = self._numpy_rng(seed)
+
     def get_frame(self):
         return self.frame
 
+    def digest(self):
+        """Hash of the full simulation state, for checking two runs are identical."""
+        if self.stepper is not None:
+            return self.stepper.digest()
+
+        h = hashlib.sha256()
+        h.update(str(self.frame).encode())
+
+        for cell in self.cells():
+            for item in self.digest_items(cell):
+                h.update(item)
+
+        return h.hexdigest()
+
+    def digest_items(self, cell):
+        """The encoded pieces of one cell's state that digest() hashes, in order."""
+        items = []
+
+        for c in cell.creatures:
+            state = c.to_dict()
+            state["velocity"] = c.velocity.tolist()
+            state["angular_velocity"] = c.angular_velocity
+            state["energy"] = c.energy
+            state["organs"] = [o.to_dict() for o in c.organs if o.isAlive]
+            items.append(json.dumps(state, sort_keys=True).encode())
+
+        for f in cell.food:
+            items.append(json.dumps(f.to_dict()).encode())
+
+        return items
+
+    # ---- Stepping ----
+
+    def step(self, timings=None):
+        """
+        One simulation tick: every cell steps its own creatures, creatures
+        that crossed a border migrate, then each cell resolves collisions
+        against its own creatures plus a halo from neighbouring cells.
+
+        If timings is a dict, seconds spent per phase are added to it.
+        """
+        if self.stepper is not None:
+            self.stepper.step(timings)
+            return
+
+        from .food import spawn_food
+
+        phases = [
+            ("creatures", self.run_creatures),
+            ("migration", self.migrate),
+            ("collisions", self.run_collisions),
+            ("commands", self.apply_commands),
+            ("food", lambda: spawn_food(self)),
+            ("advance_frame", self.advance_frame),
+            ("publish", self.publish),
+        ]
+
+        for name, phase in phases:
+            if timings is None:
+                phase()
+                continue
+
+            start = time.perf_counter()
+            phase()
+            timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+
+    def run_creatures(self):
+        for cell in self.cells():
+            cell.run_creatures()
+
+    def migrate(self):
+        """Hand creatures that moved out of their cell over to the cell they are now in."""
+        for cell in self.cells():
+            emigrants = cell.emigrants
+            cell.emigrants = []
+
+            for creature in emigrants:
+                if not creature.isAlive or creature.cell is not cell:
+                    continue
+
+                target = self.cell_at(creature.position)
+                if target is not cell:
+                    cell.transfer(creature, target)
+
+    def build_halos(self):
+        """
+        For every cell, the creatures from other cells that could touch one
+        of its own creatures: anything whose bounding circle, grown by the
+        largest creature radius, reaches into the cell.
+        """
+        max_radius = 0
+        for cell in self.cells():
+            for creature in cell.creatures:
+                if creature.radius > max_radius:
+                    max_radius = creature.radius
+
+        halos = {cell: [] for cell in self.cells()}
+
+        for cell in self.cells():
+            for creature in cell.creatures:
+                if not creature.isAlive: continue
+
+                x, y = creature.position.tolist()
+                for neighbour in self.cells_near(x, y, creature.radius + max_radius):
+                    if neighbour is not cell:
+                        halos[neighbour].append(creature)
+
+        return halos
+
+    def run_collisions(self):
+        halos = self.build_halos()
+
+        for cell in self.cells():
+            cell.run_collisions(halo=halos[cell])
+
     def advance_frame(self):
 
+        self.frame_deltas = {}
+        for cell in self.cells():
+            delta = cell.frame_delta(self.frame)
+            if delta is not None:
+                self.frame_deltas[(cell.x, cell.y)] = delta
+
         self.frame += 1
         
         if self.frame % Cell.BUFFER_FRAMES == 0:
 
-            self.cell_grid[0][0].swap_buffers(self.frame)
+            for cell in self.cells():
+                cell.swap_buffers(self.frame)
+
+            self.built_index = self.frame - Cell.BUFFER_FRAMES
+            self.keyframe_frame = self.frame
+
+        # ✅ Layouts no creature has used for longer than clients can still be reading about
+        sprites.evict(self.frame, config.SPRITE_GRACE_FRAMES)
+
+        if config.PRINT and self.frame == Cell.BUFFER_FRAMES:
+            print("Buffered")
+
+    def publish(self):
+        """Capture the state at the end of this tick and make it the one readers see."""
+        from .snapshot import FrameSnapshot
 
-            
-            #for row in self.cell_grid:
-            #    for cell in row:
-            #        cell.swap_buffers(self.frame)
+        self.published = FrameSnapshot.capture(self, self.published)
 
-                # Optional per-frame simulation logic
-                # cell.step(self.frame)
+        for callback in self.on_publish:
+            callback(self.published)
 
-            self.built_index = self.frame - 300
+    def take_snapshots(self):
+        """Start every cell's first delta block from its current contents."""
+        for cell in self.cells():
+            cell.snapshot = cell.take_snapshot()
+        self.keyframe_frame = self.frame
 
-        if (self.frame) == 300:
+    # ---- Adding things ----
 
-            print ("Buffered")
+    def apply_commands(self):
+        """
+        Apply every queued upload, birth and death. Runs on the simulation
+        thread once per tick, after collisions and before food spawns.
+        """
+        from .creatures import Creature
 
-    def add_creature(self, creature):
-        with self.creatures_lock:
-            self.creatures.append(creature)
+        for kind, payload, future in self.commands.drain():
+            if kind == "upload":
+                # ✅ Built here, not on the request thread: ids and sprite ids are only handed out by this thread
+                try:
+                    creature = Creature(**payload)
+                    if not creature.isAlive:
+                        raise ValueError("Creature creation failed (invalid organs or dead)")
+
+                    result = {
+                        "creature_id": creature.id,
+                        "position": creature.position.tolist(),
+                        "organs": [o.to_dict() for o in creature.organs]
+                    }
+                    self.add_creature(creature)
+                except Exception as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+
+            elif kind == "birth":
+                cell, creature = payload
+                cell.add(creature)
+
+            elif kind == "death":
+                payload.bury()
+
+    def add_creature(self, creature, log_spawn=True):
+        """Add a creature to the cell its position falls in (or queue it for the worker owning that cell)."""
+        cell = self.cell_at(creature.position)
+        with cell.lock:
+            # Checked under the lock so ParallelStepper.start() can't miss it
+            if self.stepper is not None:
+                self.stepper.submit_creature(creature, log_spawn=log_spawn)
+                return None
+
+            cell.add(creature, log_spawn=log_spawn)
+        return cell
 
     def add_food(self, food_obj):
-        with self.food_lock:
-            self.food.append(food_obj)
+        """Add food to the cell its position falls in (or queue it for the worker owning that cell)."""
+        cell = self.cell_at(food_obj.position)
+        with cell.lock:
+            if self.stepper is not None:
+                self.stepper.submit_food(food_obj)
+                return None
+
+            cell.add(food_obj)
+        return cell
+
+    def add_food_batch(self, positions):
+        """Add food at every [x, y] in positions, which must all fall in the same cell."""
+        cell = self.cell_at(positions[0])
+        with cell.lock:
+            if self.stepper is not None:
+                self.stepper.submit_food_batch(positions)
+                return None
+
+            cell.add_food_batch(positions)
+        return cell
+
+    def find_food(self, x, y, radius):
+        """First food within radius of (x, y) in any cell, as (cell, food), or None."""
+        for cell in self.cells_near(x, y, radius):
+            if not len(cell.food): continue
+
+            food_obj = next(cell.food.query(x, y, radius), None)
+            if food_obj is not None:
+                return cell, food_obj
+
+        return None
+
+    def count_creatures(self):
+        return sum(len(cell.creatures) for cell in self.cells())
+
+    def count_food(self):
+        return sum(len(cell.food) for cell in self.cells())
+
+    # ---- Whole-world views (every cell merged) ----
 
     def get_state_for_cell(self, x, y):
         return self.cell_grid[y][x].get_state()
@@ -60,4 +348,4 @@ class World:
         return self.built_index
 
 
-world = World()
\ No newline at end of file
+world = World()
@@ -0,0 +1,59 @@
+"""
+A short run of the world, shared by the tests that read what it published.
+The world is a module singleton, so it is built once per test session.
+"""
+import random
+
+import pytest
+
+BLOCK = 10  # delta block length, so the run crosses two block boundaries
+FRAMES = 25
+
+
+@pytest.fixture(scope="session")
+def snapshot():
+    """The snapshot published at frame FRAMES; a birth, a death and some food are added 3 frames before."""
+    from simulation.bench import fill_food, populate
+    from simulation.simulation.cell import Cell
+    from simulation.simulation.creatures import Creature
+    from simulation.simulation.food import Food
+    from simulation.simulation.world import world
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(Cell, "BUFFER_FRAMES", BLOCK)
+        patch.setattr(world, "max_food", 100)
+
+        world.reseed(5)
+        populate(world, 40, random.Random(5))
+        fill_food(world, world.rng, 100)
+        world.take_snapshots()
+        world.publish()
+
+        for _ in range(FRAMES - 3):
+            world.step()
+
+        victim = next(c for c in world.cells() if c.creatures).creatures[0]
+        cell = world.cell_at([10, 10])
+        world.add_creature(Creature(position=[10, 10], organs=[
+            {"type": "flipper", "position": [-30, 0], "size": 10}, {"type": "mouth", "position": [30, 0], "size": 10}
+        ], name="late"))
+        world.add_food_batch([[1, 1], [2, 2], [3, 3]])
+        world.add_food(Food(position=[4, 4]))
+        cell.remove(cell.food[0])
+        victim.die()
+
+        for _ in range(3):
+            world.step()
+
+        yield world.published
+
+
+@pytest.fixture(scope="session")
+def client(snapshot):
+    """A Flask test client for the API, serving snapshot."""
+    from flask import Flask
+    from simulation.api.endpoints import api_bp
+
+    app = Flask(__name__)
+    app.register_blueprint(api_bp)
+    return app.test_client()
@@ -0,0 +1,108 @@
+"""
+World checkpoints (simulation/simulation/checkpoint.py). The world is a
+module singleton, so every run goes through the benchmark CLI in a process
+of its own.
+"""
+import json
+import logging
+import pathlib
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+
+from simulation.simulation import checkpoint
+from simulation.simulation.sprites import SpriteRegistry
+from simulation.simulation.world import World
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+WORLD = ["--creatures", "80", "--food", "150", "--seed", "4"]
+
+
+def bench(*args):
+    """The final state of python -m simulation.bench with args."""
+    done = subprocess.run([sys.executable, "-m", "simulation.bench", "--json", *args],
+                          cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(done.stdout[done.stdout.index("{"):])["final"]
+
+
+def test_restored_run_matches_an_uninterrupted_one(tmp_path):
+    path = str(tmp_path / "world.evc")
+
+    uninterrupted = bench(*WORLD, "--frames", "120")
+    saved = bench(*WORLD, "--frames", "50", "--checkpoint", path)
+    assert bench("--restore", path, "--food", "150", "--frames", "0") == saved
+
+    restored = bench("--restore", path, "--food", "150", "--frames", "70")
+    assert restored == uninterrupted
+
+
+def test_strings_round_trip():
+    values = ["a", None, "", "ünïcødé", "longer name"]
+    blob, lengths = checkpoint.pack_strings(values)
+    assert lengths.tolist() == [1, -1, 0, 11, 11]
+    assert checkpoint.unpack_strings(blob, lengths) == values
+
+    blob, lengths = checkpoint.pack_strings([])
+    assert checkpoint.unpack_strings(blob, lengths) == []
+
+
+def test_number_flags_keep_ints_and_floats():
+    values = [1, 2.5, 3.0, -4]
+    flags = checkpoint.number_flags(values, checkpoint.X_INT)
+    restored = [checkpoint.restored_number(v, f & checkpoint.X_INT) for v, f in zip(np.array(values, float).tolist(), flags.tolist())]
+    assert restored == values
+    assert [type(v) for v in restored] == [int, float, float, int]
+
+
+def test_unused_sprites_keep_their_grace_period():
+    registry = SpriteRegistry()
+    a, b, c = (registry.id_for(layout)[0] for layout in ("[1]", "[2]", "[3]"))
+    registry.acquire(c)
+    registry.restore_unused({b: 40, a: 50, c: 60}, frame=100)
+
+    assert registry.unused_since() == {b: 40, a: 50}
+    assert registry.evict(140, grace=100) == []
+    assert registry.evict(141, grace=100) == [b]
+
+
+def checkpointer_at(path, frame=10):
+    world = World()
+    world.frame = frame
+    return checkpoint.Checkpointer(world, str(path), interval=10)
+
+
+def test_checkpointer_logs_failures_and_carries_on(tmp_path, caplog, capsys):
+    caplog.set_level(logging.ERROR, logger=checkpoint.__name__)
+
+    # ❌ Unwritable: logged from the writer thread, nothing raised
+    checkpointer = checkpointer_at(tmp_path / "missing" / "world.evc")
+    checkpointer.tick()
+    checkpointer.writer.join()
+    assert "Checkpoint at frame 10 not written" in caplog.text
+
+    # ❌ Not even captured: logged on the simulation thread, which carries on
+    caplog.clear()
+    checkpointer = checkpointer_at(tmp_path / "world.evc")
+    checkpointer.world.cells = None
+    checkpointer.tick()
+    assert "Checkpoint at frame 10 not captured" in caplog.text and checkpointer.writer is None
+
+    # ✅ The next one is written as usual
+    checkpointer.world = World()
+    checkpointer.world.frame = 20
+    checkpointer.tick()
+    checkpointer.writer.join()
+    assert checkpoint.read(str(tmp_path / "world.evc"))[0]["frame"] == 20
+
+    assert capsys.readouterr().out == ""
+
+
+def test_checkpointer_skips_quietly_while_writing(tmp_path, capsys):
+    checkpointer = checkpointer_at(tmp_path / "world.evc")
+    checkpointer.writer = SimpleNamespace(is_alive=lambda: True)
+    checkpointer.tick()
+
+    assert not (tmp_path / "world.evc").exists()
+    assert capsys.readouterr().out == ""  # config.PRINT is off
@@ -0,0 +1,91 @@
+"""
+The collision broadphase (SpatialGrid, Cell.run_collisions): it must find
+exactly the pairs that checking every pair would, across the wrap too.
+Creatures are stand-ins with just what the broadphase reads.
+"""
+import math
+import random
+from types import SimpleNamespace
+
+import numpy as np
+
+import simulation.config as config
+from simulation.simulation.cell import Cell
+from simulation.simulation.grid import SpatialGrid
+
+SIZE = config.WORLD_SIZE
+
+
+def creature(creature_id, x, y, radius):
+    return SimpleNamespace(id=creature_id, position=np.array([x, y]), radius=radius, isAlive=True)
+
+
+def wrapped_distance(a, b):
+    dx, dy = np.abs(a.position - b.position)
+    return math.hypot(min(dx, SIZE - dx), min(dy, SIZE - dy))
+
+
+def touching(a, b):
+    return wrapped_distance(a, b) <= a.radius + b.radius
+
+
+def scatter(rng, ids, box=(0, SIZE, 0, SIZE)):
+    x0, x1, y0, y1 = box
+    return [creature(i, rng.uniform(x0, x1) % SIZE, rng.uniform(y0, y1) % SIZE, rng.uniform(3, 40)) for i in ids]
+
+
+def test_grid_query_finds_every_neighbour():
+    rng = random.Random(1)
+    grid = SpatialGrid(SIZE, SIZE, config.COLLISION_CELL_SIZE)
+    creatures = scatter(rng, range(300))
+    for c in creatures:
+        grid.insert(c, *c.position.tolist(), c.radius)
+
+    for c in creatures:
+        x, y = c.position.tolist()
+        found = {other.id for other in grid.query(x, y, c.radius + grid.max_radius) if touching(c, other)}
+        assert found == {other.id for other in creatures if touching(c, other)}
+
+
+def test_grid_query_visits_each_bucket_once():
+    grid = SpatialGrid(SIZE, SIZE, config.COLLISION_CELL_SIZE)
+    grid.insert("a", 10, 10)
+
+    # A radius wider than the world wraps onto itself
+    assert list(grid.query(250, 250, 2 * SIZE)) == ["a"]
+
+
+def collided_pairs(cell, halo):
+    pairs = []
+    cell.collide_pair = lambda creature, other, *rest: pairs.append((creature.id, other.id))
+    cell.run_collisions(halo=halo)
+    return pairs
+
+
+def test_run_collisions_matches_all_pairs_across_the_wrap():
+    rng = random.Random(2)
+    cell = Cell(0, 0)
+    cell.world = SimpleNamespace(collision_grid=SpatialGrid(SIZE, SIZE, config.COLLISION_CELL_SIZE))
+
+    # ✅ The cell's own creatures straddle the world's corner; its halo sits on both sides of the wrap
+    # Interleaved ids: some of the halo's are below a creature's, some above
+    cell.creatures = scatter(rng, range(0, 120, 2), (-25, 25, -25, 25))
+    halo = scatter(rng, range(1, 120, 2), (-80, 80, -80, 80))
+
+    pairs = collided_pairs(cell, halo)
+    assert len(pairs) == len(set(pairs))
+
+    own = cell.creatures
+    expected = {(a.id, b.id) for i, a in enumerate(own) for b in own[i + 1:] if touching(a, b)}
+    expected |= {(a.id, b.id) for a in own for b in halo if a.id < b.id and touching(a, b)}
+    assert set(pairs) == expected
+    assert any(abs(a.position[0] - b.position[0]) > SIZE / 2 for a in own for b in halo if (a.id, b.id) in expected)
+
+
+def test_run_collisions_skips_the_dead():
+    cell = Cell(0, 0)
+    cell.world = SimpleNamespace(collision_grid=SpatialGrid(SIZE, SIZE, config.COLLISION_CELL_SIZE))
+    cell.creatures = [creature(1, 10, 10, 20), creature(2, 15, 10, 20), creature(3, 20, 10, 20)]
+    cell.creatures[1].isAlive = False
+
+    assert collided_pairs(cell, []) == [(1, 3)]
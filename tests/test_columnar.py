@@ -0,0 +1,60 @@
+"""
+format=columnar (/getstate and /getfull): the same creatures and food as
+the default JSON rows, as parallel arrays, on the run in conftest.py.
+"""
+import pytest
+
+CELLS = ["", "&cell=0,0", "&cell=3,4", "&rect=0,0,120,90"]
+
+
+def rows_of(columns):
+    """Columnar creatures and food turned back into the default format's rows."""
+    creatures = columns["creatures"]
+    rows = [
+        {"id": id, "name": name, "position": [x, y], "direction": direction, "energy": energy, "sprite_id": sprite_id}
+        for id, name, x, y, direction, energy, sprite_id in zip(
+            creatures["ids"], creatures["names"], creatures["xs"], creatures["ys"],
+            creatures["directions"], creatures["energies"], creatures["sprite_ids"]
+        )
+    ]
+    food = [[x, y] for x, y in zip(columns["food"]["xs"], columns["food"]["ys"])]
+    return rows, food
+
+
+def assert_same_state(json_state, columnar_state):
+    rows, food = rows_of(columnar_state)
+    expected = json_state["creatures"]
+
+    assert [{k: row[k] for k in ("id", "name", "position", "direction", "sprite_id")} for row in rows] == \
+           [{k: row[k] for k in ("id", "name", "position", "direction", "sprite_id")} for row in expected]
+    # Columnar energies are sent to two places
+    assert [row["energy"] for row in rows] == pytest.approx([row["energy"] for row in expected], abs=0.005)
+    assert food == json_state["food"]
+
+
+@pytest.mark.parametrize("where", CELLS)
+def test_getstate_columnar_matches_rows(client, where):
+    json_state = client.get(f"/getstate?format=json{where}").get_json()
+    columnar = client.get(f"/getstate?format=columnar{where}").get_json()
+
+    assert_same_state(json_state, columnar)
+
+
+def test_getstate_has_something_to_compare(client):
+    state = client.get("/getstate?format=json").get_json()
+    assert state["creatures"] and state["food"]
+
+
+@pytest.mark.parametrize("where", CELLS[:3])
+def test_getfull_columnar_matches_rows(client, where):
+    json_full = client.get(f"/getfull?format=json{where}").get_json()
+    columnar = client.get(f"/getfull?format=columnar{where}").get_json()
+
+    assert columnar["frame"] == json_full["frame"]
+    assert columnar["deltas"] == json_full["deltas"]
+    assert columnar["sprites"] == json_full["sprites"]
+    assert_same_state(json_full["state"], columnar["state"])
+
+
+def test_unknown_format(client):
+    assert client.get("/getstate?format=xml").status_code == 400
@@ -0,0 +1,144 @@
+"""
+The command queue (simulation/simulation/commands.py): uploads, births and
+deaths wait for the simulation thread and are applied there in the order
+they were queued. /uploadcreature answers 202 when the simulation does not
+get to an upload in time. A World of its own stands in for the module
+singleton.
+"""
+import copy
+import threading
+import time
+
+import pytest
+
+import simulation.config as config
+from simulation.simulation import deltas
+from simulation.simulation.commands import CommandQueue
+from simulation.simulation.creatures import Creature
+from simulation.simulation.world import World
+
+LAYOUT = [
+    {"type": "flipper", "position": [-20, 0], "size": 8},
+    {"type": "mouth", "position": [20, 0], "size": 10},
+]
+OVERLAPPING = [{"type": "mouth", "position": [0, 0], "size": 10}]  # sits on the body
+
+
+def upload(name, organs=LAYOUT):
+    return {"position": [70, 60], "organs": copy.deepcopy(organs), "name": name}
+
+
+def test_drain_keeps_each_pushers_order():
+    queue = CommandQueue()
+
+    def pusher(kind):
+        for k in range(200):
+            queue.push(kind, k)
+
+    threads = [threading.Thread(target=pusher, args=(kind,)) for kind in ("upload", "birth", "death")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    drained = [(kind, payload) for kind, payload, _ in queue.drain()]
+    assert len(drained) == 600 and len(queue) == 0
+    for kind in ("upload", "birth", "death"):
+        assert [payload for k, payload in drained if k == kind] == list(range(200))
+
+
+def test_drain_includes_commands_queued_while_draining():
+    queue = CommandQueue()
+    queue.push("death", 0)
+
+    seen = []
+    for _, payload, _ in queue.drain():
+        seen.append(payload)
+        if payload < 3:
+            queue.push("death", payload + 1)
+
+    assert seen == [0, 1, 2, 3]
+
+
+@pytest.fixture
+def fresh(monkeypatch):
+    """A World of its own, used by creatures and the API alike."""
+    world = World()
+    monkeypatch.setattr("simulation.simulation.creatures.world", world)
+    monkeypatch.setattr("simulation.api.endpoints.world", world)
+    yield world
+
+    for cell in world.cells():
+        for creature in cell.creatures:
+            Creature.sprites.release(creature.sprite_id)
+
+
+def test_commands_apply_in_the_order_queued(fresh):
+    cell = fresh.cell_at([60, 60])
+    old = Creature(position=[60, 60], organs=copy.deepcopy(LAYOUT), name="old")
+    fresh.add_creature(old)
+    old.energy = 10  # too little to drop food
+    baby = Creature(position=[65, 60], organs=copy.deepcopy(LAYOUT), name="baby")
+    start = len(cell.log)
+
+    future, = fresh.commands.push_many("upload", [upload("uploaded")])
+    fresh.commands.push("birth", (cell, baby))
+    old.die()
+
+    # ✅ Nothing changes until the simulation thread applies them
+    assert cell.creatures == [old] and not future.done()
+
+    fresh.apply_commands()
+
+    created = future.result(timeout=0)
+    assert [c.name for c in cell.creatures] == ["uploaded", "baby"]
+    assert old.cell is None
+
+    records = list(zip(cell.log.kind[start:len(cell.log)].tolist(), cell.log.id[start:len(cell.log)].tolist()))
+    assert records == [(deltas.SPAWN, created["creature_id"]), (deltas.SPAWN, baby.id), (deltas.REMOVE, old.id)]
+
+
+def simulate(world, until):
+    """Apply the world's commands every few milliseconds, as the simulation thread would, until until() holds."""
+    def run():
+        deadline = time.monotonic() + 5
+        while not until() and time.monotonic() < deadline:
+            world.apply_commands()
+            time.sleep(0.005)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_upload_waits_for_the_simulation(client, fresh):
+    thread = simulate(fresh, lambda: fresh.count_creatures() == 1)
+    response = client.post("/uploadcreature", json=upload("waited"))
+    thread.join()
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [c.id for c in fresh.cell_at(body["position"]).creatures] == [body["creature_id"]]
+
+
+def test_upload_answers_202_when_the_simulation_is_late(client, fresh, monkeypatch):
+    monkeypatch.setattr(config, "UPLOAD_TIMEOUT", 0.05)
+
+    response = client.post("/uploadcreature", json=upload("late"))
+    assert response.status_code == 202
+    assert response.get_json() == {"message": "Creature queued"}
+
+    # ✅ Still queued, and created on a later tick
+    assert len(fresh.commands) == 1
+    fresh.apply_commands()
+    assert [c.name for cell in fresh.cells() for c in cell.creatures] == ["late"]
+
+
+def test_bulk_upload_reports_each_creature(client, fresh):
+    thread = simulate(fresh, lambda: len(fresh.commands) == 0 and fresh.count_creatures() == 2)
+    response = client.post("/uploadcreatures", json=[upload("a"), upload("bad", OVERLAPPING), upload("b")])
+    thread.join()
+
+    body = response.get_json()
+    assert body["created"] == 2
+    assert [r["status"] for r in body["results"]] == [200, 400, 200]
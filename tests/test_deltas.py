@@ -0,0 +1,140 @@
+import numpy as np
+
+from simulation.simulation import deltas
+from simulation.simulation.deltas import DeltaBlock
+from simulation.simulation.snapshot import log_copy
+
+
+def logged():
+    block = DeltaBlock(2)
+    block.append(10, deltas.SPAWN, 1, payload={"id": 1, "name": "a"})
+    block.append(10, deltas.MOVE, 1, a=1.25, c=0.5)
+    block.append_many(11, deltas.ENERGY, np.array([1, 2, 3]), a=np.array([5.0, 6.0, 7.0]))
+    block.append(12, deltas.FOOD_BATCH, 2, payload=np.array([[1.0, 2.0], [300.0, 4.0]]))
+    block.append(12, deltas.FOOD_REMOVE, a=8, b=9)
+    block.append(14, deltas.MIGRATE_OUT, 2)
+    block.append(14, deltas.MIGRATE_IN, 3, payload={"id": 3, "name": "c"})
+    return block
+
+
+def test_append_grows_and_keeps_records():
+    block = logged()
+    assert len(block) == 9
+    assert len(block.frame) >= 9
+    assert block.frame[:9].tolist() == [10, 10, 11, 11, 11, 12, 12, 14, 14]
+    assert block.id[2:5].tolist() == [1, 2, 3]
+    assert block.a[2:5].tolist() == [5.0, 6.0, 7.0]
+    assert np.isnan(block.b[1])
+    assert block.ref[:9].tolist() == [0, -1, -1, -1, -1, 1, -1, -1, 2]
+    assert block.kinds() == {deltas.SPAWN, deltas.MOVE, deltas.ENERGY, deltas.FOOD_BATCH,
+                             deltas.FOOD_REMOVE, deltas.MIGRATE_OUT, deltas.MIGRATE_IN}
+
+
+def test_frame_lookups():
+    block = logged()
+    assert block.frame_range(11) == (2, 5)
+    assert block.frame_range(13) == (7, 7)
+    assert block.first_at(12) == 5
+    assert block.first_at(13) == 7
+    assert block.first_at(99) == 9
+    # A reader that remembered an earlier count does not see later records
+    assert block.first_at(14, count=7) == 7
+    assert block.frame_range(11, count=3) == (2, 3)
+
+
+def test_clear():
+    block = logged()
+    block.encoded[10] = {}
+    generation = block.generation
+    block.clear()
+    assert len(block) == 0 and block.payloads == [] and block.encoded == {}
+    assert block.first_at(10) == 0
+    assert block.generation == generation + 1
+
+
+def test_export_extend_renumbers_payloads():
+    source = logged()
+    target = DeltaBlock(1)
+    target.append(9, deltas.SPAWN, 7, payload={"id": 7, "name": "z"})
+
+    target.extend(source.export(5))
+    assert len(target) == 5
+    assert target.kind[1:5].tolist() == [deltas.FOOD_BATCH, deltas.FOOD_REMOVE, deltas.MIGRATE_OUT, deltas.MIGRATE_IN]
+    assert target.ref[:5].tolist() == [0, 1, -1, -1, 2]
+    assert target.payloads[2] == {"id": 3, "name": "c"}
+    assert target.payloads[1] is source.payloads[1]
+
+    target.extend(source.export(0, 0))
+    assert len(target) == 5
+
+
+def test_expand_batches():
+    block = logged()
+    frame, kind, ids, a, b, c, refs = deltas.expand_batches(block, 4, 7)
+    assert kind.tolist() == [deltas.ENERGY, deltas.FOOD_ADD, deltas.FOOD_ADD, deltas.FOOD_REMOVE]
+    assert frame.tolist() == [11, 12, 12, 12]
+    assert a.tolist() == [7.0, 1.0, 300.0, 8.0]
+    assert b[1:].tolist() == [2.0, 4.0, 9.0]
+    assert refs.tolist() == [-1, -1, -1, -1]
+
+    keep = np.array([False, True, False])
+    inside = lambda xs, ys: xs < 100
+    frame, kind, ids, a, b, c, refs = deltas.expand_batches(block, 4, 7, keep, inside)
+    assert kind.tolist() == [deltas.FOOD_ADD]
+    assert (a.tolist(), b.tolist()) == ([1.0], [2.0])
+
+    # Without batches the columns are plain copies
+    columns = deltas.expand_batches(block, 0, 2)
+    columns[3][0] = 99
+    assert block.a[0] != 99
+
+
+def test_encode():
+    block = logged()
+    encoded = deltas.encode(block, 0, len(block))
+    assert encoded["creatures"] == 'j{"id": 1, "name": "a"},m[1,x1.2,d0.5],e[1,5.0],e[2,6.0],e[3,7.0],'
+    assert encoded["new_food"] == "[1,2],[300,4],"
+    assert encoded["deleted_food"] == "[8,9],"
+    assert encoded["migrations"] == 'r[2],j{"id": 3, "name": "c"},'
+
+    folded = deltas.encode(block, 5, len(block), fold_migrations=True, inside=lambda xs, ys: xs > 100)
+    assert folded["new_food"] == "[300,4],"
+    assert folded["creatures"] == 'r[2],j{"id": 3, "name": "c"},'
+    assert folded["migrations"] == ""
+
+    keep = np.array([True, False, False, False, False, False, True, False, False])
+    assert deltas.encode(block, 0, len(block), keep)["deleted_food"] == "[8,9],"
+
+
+def test_log_copies_outlive_the_block():
+    block = logged()
+    early = log_copy(block, 5)
+    copy, count = early[0], 5
+    expected = deltas.encode_frames(copy, count)
+
+    # ✅ Appending extends the same copy; what the earlier snapshot read is unchanged
+    block.append(15, deltas.REMOVE, 1)
+    later = log_copy(block, len(block), early)
+    assert later[0] is copy and len(copy) == 10
+    assert copy.ref[:10].tolist() == block.ref[:10].tolist()
+    assert copy.payloads[2] is block.payloads[2]
+    assert deltas.encode_frames(copy, count) == expected
+
+    # ✅ Once the cell clears the block and logs into it again, a new copy is made
+    block.clear()
+    block.append(16, deltas.MOVE, 4, a=1.0)
+    fresh = log_copy(block, len(block), later)
+    assert fresh[0] is not copy and len(fresh[0]) == 1
+    assert deltas.encode_frames(copy, count) == expected
+    assert deltas.encode(copy, 0, 2) == deltas.encode(logged(), 0, 2)
+
+
+def test_encode_frames():
+    block = logged()
+    encoded = deltas.encode_frames(block)
+    assert list(encoded) == [10, 11, 12, 14]
+    assert encoded[11] == deltas.encode(block, 2, 5)
+    assert block.encoded[12] is encoded[12]
+
+    assert list(deltas.encode_frames(block, count=7, lo=3)) == [11, 12]
+    assert deltas.encode_frames(block, count=3, lo=3) == {}
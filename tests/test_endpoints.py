@@ -0,0 +1,29 @@
+"""
+The smaller API endpoints (simulation/api/endpoints.py), served from the
+run in conftest.py.
+"""
+from simulation.simulation.sprites import layout_organs
+
+
+def test_layout_organs():
+    assert layout_organs("body,0,0|mouth,30,0,10|flipper,-12.5,0.0,8") == [
+        {"type": "mouth", "position": [30, 0], "size": 10},
+        {"type": "flipper", "position": [-12.5, 0.0], "size": 8},
+    ]
+    assert layout_organs("body,0,0") == []
+
+
+def test_getcreatures(client, snapshot):
+    everyone = client.get("/getcreatures").get_json()
+    creatures, _ = snapshot.columns()
+    assert [c["id"] for c in everyone] == creatures.ids.tolist()
+
+    late = next(c for c in everyone if c["name"] == "late")
+    assert sorted(o["type"] for o in late["organs"]) == ["flipper", "mouth"]
+
+    picked = client.get(f"/getcreatures?id={late['id']}&id={everyone[0]['id']}").get_json()
+    assert {c["id"] for c in picked} == {late["id"], everyone[0]["id"]}
+
+
+def test_getforces(client):
+    assert client.get("/getforces").get_json() == {"forces": {}}
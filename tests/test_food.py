@@ -0,0 +1,147 @@
+"""
+A cell's FoodStore, food spawning (simulation/simulation/food.py) and its
+per-cell cap, World.max_food. A World of its own keeps the module
+singleton untouched.
+"""
+import math
+import random
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+import simulation.config as config
+from simulation.simulation import checkpoint
+from simulation.simulation.food import Food, FoodStore, spawn_food
+from simulation.simulation.world import World
+
+from test_checkpoint import ROOT, bench
+
+SIZE = config.WORLD_SIZE
+
+
+def store_of(positions):
+    store = FoodStore(SIZE, SIZE, config.FOOD_CELL_SIZE)
+    for position in positions:
+        store.add(Food(position))
+    return store
+
+
+def buckets(store):
+    return [bucket for row in store.grid.grid for bucket in row]
+
+
+def assert_consistent(store):
+    for index, food in enumerate(store):
+        assert food.index == index and food.store is store
+        assert food.bucket is store.grid.bucket(*food.position) and food in food.bucket
+    assert sum(len(bucket) for bucket in buckets(store)) == len(store)
+
+
+def test_swap_remove_keeps_every_handle():
+    rng = random.Random(4)
+    store = store_of([[rng.uniform(0, SIZE), rng.uniform(0, SIZE)] for _ in range(200)])
+    kept = list(store)
+
+    for _ in range(150):
+        food = rng.choice(kept)
+        version = store.version
+        store.remove(food)
+        kept.remove(food)
+
+        assert food not in store and food.index is None and food.bucket is None
+        assert store.version > version
+        assert_consistent(store)
+
+    assert set(map(id, store)) == set(map(id, kept))
+
+    # ✅ The last item removes cleanly too
+    store.remove(store[len(store) - 1])
+    assert_consistent(store)
+
+    # ❌ Removing twice is an error, not a silent corruption
+    with pytest.raises(ValueError):
+        store.remove(food)
+
+
+def test_query_measures_across_the_wrap():
+    rng = random.Random(5)
+    positions = [[rng.choice([rng.uniform(0, 15), rng.uniform(485, SIZE), rng.uniform(0, SIZE)]),
+                  rng.choice([rng.uniform(0, 15), rng.uniform(485, SIZE), rng.uniform(0, SIZE)])] for _ in range(400)]
+    store = store_of(positions)
+
+    def distance(food, x, y):
+        dx, dy = abs(food.position[0] - x), abs(food.position[1] - y)
+        return math.hypot(min(dx, SIZE - dx), min(dy, SIZE - dy))
+
+    for x, y, radius in [(2, 3, 20), (498, 499, 25), (250, 1, 30), (0, 250, 12), (123, 321, 40)]:
+        found = list(store.query(x, y, radius))
+        assert len(found) == len(set(map(id, found)))
+        assert set(map(id, found)) == {id(food) for food in store if distance(food, x, y) <= radius}
+
+    # Food just across the corner is found from the opposite corner
+    assert any(food.position[0] > 485 and food.position[1] > 485 for food in store.query(2, 3, 20))
+
+
+def test_bucket_order_survives_a_round_trip():
+    rng = random.Random(6)
+    store = store_of([[rng.uniform(0, 40), rng.uniform(0, 40)] for _ in range(60)])
+    for food in rng.sample(list(store), 20):
+        store.remove(food)
+    ranks = store.bucket_ranks()
+    scan = [list(map(id, bucket)) for bucket in buckets(store)]
+
+    # A copy built in items order scans its buckets the same way once ordered
+    copy = store_of([list(food.position) for food in store])
+    copy.order_buckets(ranks)
+    original = {id(a): id(b) for a, b in zip(copy, store)}
+    assert [[original[f] for f in map(id, bucket)] for bucket in buckets(copy)] == scan
+
+
+
+def test_spawning_fills_every_cell_to_its_cap():
+    world = World()
+    world.max_food = 3
+    world.reseed(1)
+
+    for _ in range(20):
+        spawn_food(world)
+
+    # ✅ Each cell fills up to 3, not the world as a whole
+    counts = [len(cell.food) for cell in world.cells()]
+    assert max(counts) == 3
+    assert sum(counts) > 0.9 * 3 * len(counts)
+
+
+def test_spawning_stops_when_every_cell_is_full():
+    world = World()
+    world.max_food = 1
+    world.reseed(1)
+
+    for cell in world.cells():
+        cell.add(Food([cell.x * world.cell_size, cell.y * world.cell_size]))
+    world.food_accumulator = 5.0
+    spawn_food(world)
+
+    assert world.count_food() == world.grid_cells ** 2
+    assert world.food_accumulator == 0.0
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_death_drops_and_spawns_keep_to_the_cap(tmp_path, workers):
+    path = str(tmp_path / "world.evc")
+    final = bench("--creatures", "200", "--food", "2", "--frames", "300", "--seed", "3",
+                  "--workers", str(workers), "--checkpoint", path)
+
+    cell_food = checkpoint.read(path)[1]["cell_food"]
+    assert cell_food.max() <= 2
+    assert final["food"] == int(np.sum(cell_food)) <= 2 * len(cell_food)
+
+
+def test_bench_leaves_config_alone():
+    script = ("import simulation.config as config; from simulation.bench import run; "
+              "run(creatures=5, food=3, frames=2); print(config.MAX_FOOD)")
+    done = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True)
+
+    assert int(done.stdout.split()[-1]) == config.MAX_FOOD
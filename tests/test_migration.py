@@ -0,0 +1,103 @@
+"""
+Cells handing creatures over as they move (World.migrate) and resolving
+collisions against their halos (World.run_collisions): after any amount
+of migration every touching pair must be resolved exactly once, by one
+cell. A World of its own keeps the module singleton's cells untouched.
+"""
+import copy
+import math
+import random
+
+import pytest
+
+import simulation.config as config
+from simulation.simulation.creatures import Creature
+from simulation.simulation.world import World
+
+SIZE = config.WORLD_SIZE
+LAYOUT = [
+    {"type": "flipper", "position": [-14, 0], "size": 6},
+    {"type": "mouth", "position": [14, 0], "size": 6},
+]
+
+
+def near_a_border(rng, cell_size):
+    """A coordinate within 12 pixels of some cell border, the world's edge included."""
+    return (rng.randrange(int(SIZE // cell_size)) * cell_size + rng.uniform(-12, 12)) % SIZE
+
+
+@pytest.fixture
+def crowd():
+    rng = random.Random(8)
+    world = World()
+    creatures = []
+    for _ in range(90):
+        x = near_a_border(rng, world.cell_size) if rng.random() < 0.7 else rng.uniform(0, SIZE)
+        y = near_a_border(rng, world.cell_size) if rng.random() < 0.7 else rng.uniform(0, SIZE)
+        creature = Creature(position=[x, y], organs=copy.deepcopy(LAYOUT))
+        creature.direction = rng.uniform(0, 2 * math.pi)
+        world.add_creature(creature, log_spawn=False)
+        creatures.append(creature)
+
+    yield world, creatures, rng
+
+    for creature in creatures:
+        creature.physics.release(creature.slot)
+        Creature.sprites.release(creature.sprite_id)
+
+
+def wander(world, creatures, rng):
+    """Move every creature a little, noting leavers the way Cell.integrate does."""
+    for creature in creatures:
+        x, y = creature.position.tolist()
+        creature.position = [(x + rng.uniform(-15, 15)) % SIZE, (y + rng.uniform(-15, 15)) % SIZE]
+        if world.cell_at(creature.position) is not creature.cell:
+            creature.cell.emigrants.append(creature)
+
+
+def wrapped_distance(a, b):
+    dx, dy = abs(a.position - b.position).tolist()
+    return math.hypot(min(dx, SIZE - dx), min(dy, SIZE - dy))
+
+
+def test_migration_lands_every_creature_in_its_cell(crowd):
+    world, creatures, rng = crowd
+    wander(world, creatures, rng)
+    leaving = sum(len(cell.emigrants) for cell in world.cells())
+    assert leaving > 10
+
+    world.migrate()
+
+    assert all(not cell.emigrants for cell in world.cells())
+    for creature in creatures:
+        cell = world.cell_at(creature.position)
+        assert creature.cell is cell and cell.creatures.count(creature) == 1
+    assert world.count_creatures() == len(creatures)
+
+
+def test_every_pair_collides_once_after_migration(crowd):
+    world, creatures, rng = crowd
+
+    by_id = {creature.id: creature for creature in creatures}
+    resolved = []
+    for cell in world.cells():
+        cell.collide_pair = lambda creature, other, *rest, cell=cell: resolved.append((creature.id, other.id, cell))
+
+    for _ in range(3):
+        wander(world, creatures, rng)
+        world.migrate()
+
+        resolved.clear()
+        world.run_collisions()
+
+        pairs = [frozenset((a, b)) for a, b, _ in resolved]
+        assert len(pairs) == len(set(pairs))
+
+        expected = {frozenset((a.id, b.id)) for i, a in enumerate(creatures) for b in creatures[i + 1:]
+                    if wrapped_distance(a, b) <= a.radius + b.radius}
+        assert set(pairs) == expected
+
+        # ✅ Pairs spanning two cells were among them, resolved by the cell of the lower id
+        spanning = [(a, b, cell) for a, b, cell in resolved if world.cell_at(by_id[b].position) is not cell]
+        assert spanning
+        assert all(a < b for a, b, _ in spanning)
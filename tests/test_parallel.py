@@ -0,0 +1,117 @@
+"""
+Stepping in worker processes (simulation/simulation/parallel.py) against
+stepping on one thread. Like the checkpoint tests, every run is a process
+of its own.
+
+Workers and one thread only agree until the first death or birth: from
+then on each worker draws from its own RNG stream. Before that, creatures
+and food match exactly except for positions, which drift by rounding:
+collision forces reach a creature in a different order, and
+Creature.apply_force clamps small spins to zero as they add up. EDGE is a
+world of creatures crowded along both strip edges of two or three
+workers, eating the food there and bumping into each other across the
+edges, and stays free of deaths and births for FRAMES frames.
+"""
+import json
+import random
+import subprocess
+import sys
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from simulation.simulation import checkpoint
+from simulation.simulation.parallel import ParallelTrial
+
+from test_checkpoint import ROOT, bench
+
+FRAMES = 14
+POSITION_TOLERANCE = 0.05  # pixels, after FRAMES frames; measured 0.003
+
+
+@pytest.fixture(scope="module")
+def edge(tmp_path_factory):
+    """Bench arguments for the EDGE world."""
+    rng = random.Random(7)
+    creatures = []
+    for i in range(40):
+        y = rng.choice([rng.uniform(225, 275), rng.uniform(0, 25), rng.uniform(475, 500)])
+        creatures.append({
+            "position": [rng.uniform(0, 500), y],
+            "organs": [{"type": "flipper", "position": [-20, 0], "size": 8},
+                       {"type": "mouth", "position": [20, 0], "size": 10}],
+            "name": f"Edge_{i}"
+        })
+
+    path = tmp_path_factory.mktemp("parallel") / "edge.json"
+    path.write_text(json.dumps(creatures))
+    return ["--creatures", "0", "--food", "300", "--seed", "1", "--upload", str(path)]
+
+
+def final_state(tmp_path, args, workers):
+    path = str(tmp_path / f"{workers}.evc")
+    bench(*args, "--frames", str(FRAMES), "--workers", str(workers), "--checkpoint", path)
+    return checkpoint.read(path)[1]
+
+
+@pytest.mark.parametrize("workers", [2, 3])
+def test_workers_match_one_thread(tmp_path, edge, workers):
+    serial = final_state(tmp_path, edge, 0)
+    parallel = final_state(tmp_path, edge, workers)
+
+    ids = serial["id"].tolist()
+    assert sorted(ids) == sorted(parallel["id"].tolist())
+    order = np.argsort(parallel["id"])[np.argsort(np.argsort(serial["id"]))]
+
+    assert parallel["energy"][order].tolist() == serial["energy"].tolist()
+
+    offset = np.abs(parallel["position"][order] - serial["position"])
+    offset = np.minimum(offset, 500 - offset)
+    assert offset.max() < POSITION_TOLERANCE
+
+    # ✅ Food eaten across a strip's edge is gone on both sides, and nothing else is
+    food = Counter(map(tuple, serial["food_position"].tolist()))
+    assert Counter(map(tuple, parallel["food_position"].tolist())) == food
+
+
+STOP = """
+import json
+from simulation.bench import populate, fill_food
+from simulation.simulation.creatures import Creature
+from simulation.simulation.parallel import ParallelStepper
+from simulation.simulation.world import world
+import random
+
+world.reseed(2)
+populate(world, 60, random.Random(2))
+fill_food(world, world.rng, 200)
+
+stepper = ParallelStepper(world, 2).start()
+for _ in range(5):
+    world.step()
+stepper.stop()
+
+handed_back = world.stepper is None and all(isinstance(c, Creature) for cell in world.cells() for c in cell.creatures)
+frame = world.get_frame()
+for _ in range(5):
+    world.step()
+
+print(json.dumps({"handed_back": handed_back, "frames": world.get_frame() - frame, "creatures": world.count_creatures()}))
+"""
+
+
+def test_stop_hands_the_world_back():
+    done = subprocess.run([sys.executable, "-c", STOP], cwd=ROOT, capture_output=True, text=True, check=True)
+    result = json.loads(done.stdout.splitlines()[-1])
+
+    assert result["handed_back"]
+    assert result["frames"] == 5
+    assert result["creatures"] > 0
+
+
+def test_trial_stays_on_one_thread_with_one_cpu(monkeypatch):
+    monkeypatch.setattr("os.cpu_count", lambda: 1)
+    trial = ParallelTrial(world=None, workers=4, frames=10, min_speedup=1.2)
+
+    assert trial.done and trial.stepper is None
@@ -0,0 +1,99 @@
+"""
+PhysicsStore (simulation/simulation/physics.py) against the per-creature
+step it replaced, written out here one creature at a time.
+"""
+import math
+import random
+
+import numpy as np
+
+import simulation.config as config
+from simulation.simulation.physics import PhysicsStore
+
+
+def scalar_step(c, frame):
+    """One creature, one frame, as Creature.update_position did it before PhysicsStore."""
+    c["x"] = (c["x"] + c["vx"]) % config.WORLD_SIZE
+    c["y"] = (c["y"] + c["vy"]) % config.WORLD_SIZE
+    c["d"] = (c["d"] + c["av"]) % (2 * math.pi)
+
+    dtheta = abs(c["d"] - c["sent_d"])
+    if dtheta > math.pi:
+        dtheta = 2 * math.pi - dtheta
+
+    moved = False
+    if abs(c["x"] - c["sent_x"]) > 0.5:
+        c["sent_x"] = c["x"]
+        moved = True
+    if abs(c["y"] - c["sent_y"]) > 0.5:
+        c["sent_y"] = c["y"]
+        moved = True
+    if dtheta > 0.005:
+        c["sent_d"] = c["d"]
+        moved = True
+
+    if moved and frame % config.FRICTION_STEP == 0:
+        c["vx"] *= config.FRICTION
+        c["vy"] *= config.FRICTION
+        c["av"] *= config.ANGULAR_FRICTION
+
+    c["energy"] -= config.BMR
+    return abs(c["av"]) > config.MAX_AV or c["energy"] <= 0
+
+
+def random_creature(rng):
+    x, y = rng.choice([rng.uniform(0, 2), rng.uniform(498, 500), rng.uniform(0, 500)]), rng.uniform(0, 500)
+    d = rng.choice([rng.uniform(0, 0.01), rng.uniform(2 * math.pi - 0.01, 2 * math.pi), rng.uniform(0, 6)])
+    return {
+        "x": x, "y": y, "d": d,
+        "vx": rng.uniform(-3, 3), "vy": rng.choice([0.0, rng.uniform(-3, 3)]), "av": rng.uniform(-0.05, 0.05),
+        "sent_x": x, "sent_y": y, "sent_d": d,
+        "energy": rng.choice([0.005, 0.5, 50.0])
+    }
+
+
+def test_integrate_matches_the_scalar_step():
+    rng = random.Random(3)
+    creatures = [random_creature(rng) for _ in range(200)]
+    creatures[7]["av"] = config.MAX_AV + 0.01
+
+    store = PhysicsStore(capacity=4)
+    slots = np.array([store.allocate(i) for i in range(len(creatures))])
+    for slot, c in zip(slots, creatures):
+        store.position[slot] = (c["x"], c["y"])
+        store.velocity[slot] = (c["vx"], c["vy"])
+        store.direction[slot] = c["d"]
+        store.angular_velocity[slot] = c["av"]
+        store.energy[slot] = c["energy"]
+        store.last_sent[slot] = (c["x"], c["y"], c["d"])
+
+    for frame in range(12):
+        dead = [scalar_step(c, frame) for c in creatures]
+        moved_x, moved_y, moved_d, store_dead = store.integrate(slots, frame)
+
+        assert store_dead.tolist() == dead
+        for slot, c in zip(slots.tolist(), creatures):
+            assert store.position[slot].tolist() == [c["x"], c["y"]]
+            assert store.velocity[slot].tolist() == [c["vx"], c["vy"]]
+            assert store.direction[slot] == c["d"]
+            assert store.angular_velocity[slot] == c["av"]
+            assert store.last_sent[slot].tolist() == [c["sent_x"], c["sent_y"], c["sent_d"]]
+            assert store.energy[slot] == c["energy"]
+
+    # ✅ Everything stayed on the torus
+    assert ((store.position[slots] >= 0) & (store.position[slots] < config.WORLD_SIZE)).all()
+
+
+def test_slots_are_reused_and_detached():
+    store = PhysicsStore(capacity=1)
+    a, b, c = (store.allocate(owner) for owner in "abc")
+    assert store.capacity >= 3 and len({a, b, c}) == 3
+
+    store.position[b] = (5, 6)
+    store.energy[b] = 7
+    single, slot = store.detach(b)
+    assert single.position[slot].tolist() == [5, 6] and single.energy[slot] == 7 and single.owners[slot] == "b"
+    assert store.owners[b] is None and store.energy[b] == 0
+
+    assert store.allocate("d") == b
+    assert store.mass[b] == 1
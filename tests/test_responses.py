@@ -0,0 +1,82 @@
+"""
+Encoded responses (simulation/api/responses.py): ETags and 304s, gzip and
+Vary, on made-up entries and on /getstate from the run in conftest.py.
+"""
+import gzip
+
+from flask import Flask
+
+from simulation.api.responses import GZIP_MIN_SIZE, cached, encode_json, send
+from simulation.simulation import wire
+
+app = Flask(__name__)
+
+
+def sent(entry, **headers):
+    with app.test_request_context(headers=headers):
+        return send(entry)
+
+
+def test_etag_and_304():
+    entry = encode_json({"creatures": list(range(300))})
+
+    first = sent(entry)
+    assert first.status_code == 200 and first.get_data() == entry.body
+    assert first.get_etag() == (entry.etag, False)
+    assert first.cache_control.no_cache
+
+    again = sent(entry, **{"If-None-Match": f'"{entry.etag}"'})
+    assert again.status_code == 304 and again.get_data() == b""
+    assert again.get_etag() == (entry.etag, False)
+
+    # ✅ The same body encoded again, e.g. a later frame that changed nothing, keeps its ETag
+    assert encode_json({"creatures": list(range(300))}).etag == entry.etag
+    assert sent(entry, **{"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_gzip_only_when_accepted_and_worth_it():
+    big = encode_json({"creatures": list(range(300))})
+    small = encode_json({"creatures": [1]})
+    assert len(big.body) >= GZIP_MIN_SIZE > len(small.body)
+
+    zipped = sent(big, **{"Accept-Encoding": "gzip, deflate"})
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(zipped.get_data()) == big.body
+    assert zipped.get_etag() == sent(big).get_etag()
+
+    assert "Content-Encoding" not in sent(big, **{"Accept-Encoding": "gzip;q=0"}).headers
+    assert "Content-Encoding" not in sent(small, **{"Accept-Encoding": "gzip"}).headers
+
+    # ✅ Caches must key on both, gzipped or not, and JSON or binary
+    for response in (zipped, sent(big), sent(small)):
+        assert {v.strip() for v in response.headers["Vary"].split(",")} == {"Accept", "Accept-Encoding"}
+
+
+def test_cached_builds_once():
+    cache = {}
+    calls = []
+
+    def build():
+        calls.append(1)
+        return {"frame": 1}
+
+    entry = cached(cache, ("getstate", None, "json"), build)
+    assert cached(cache, ("getstate", None, "json"), build) is entry
+    assert len(calls) == 1
+
+
+def test_getstate_revalidates(client, snapshot):
+    first = client.get("/getstate")
+    etag, _ = first.get_etag()
+    assert first.status_code == 200
+
+    assert client.get("/getstate", headers={"If-None-Match": f'"{etag}"'}).status_code == 304
+
+    zipped = client.get("/getstate", headers={"Accept-Encoding": "gzip"})
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(zipped.get_data()) == first.get_data()
+
+    # ✅ Each format has its own ETag, so a 304 never answers for the other one
+    binary = client.get("/getstate", headers={"Accept": wire.MIMETYPE})
+    assert binary.mimetype == wire.MIMETYPE and binary.get_etag()[0] != etag
+    assert client.get("/getstate", headers={"Accept": wire.MIMETYPE, "If-None-Match": f'"{etag}"'}).status_code == 200
@@ -0,0 +1,94 @@
+"""
+/getdeltas?since=FRAME: FrameSnapshot.deltas_since/ranges_since over the
+short run of the world in conftest.py (frames 0 to 25, delta blocks of 10),
+and the keyframe fallback for cursors outside the history.
+"""
+import json
+import re
+from collections import Counter
+
+import pytest
+
+
+def test_history(snapshot):
+    assert snapshot.frame == 25
+    assert snapshot.keyframe.frame == 20
+    assert snapshot.history_start == 10
+
+
+@pytest.mark.parametrize("since", [9, 26])
+def test_outside_history(snapshot, since):
+    assert snapshot.deltas_since(since) is None
+    assert snapshot.ranges_since(since) is None
+    assert snapshot.deltas_since(since, (0, 0)) is None
+
+
+@pytest.mark.parametrize("since", [10, 13, 20, 24, 25])
+def test_frames_since(snapshot, since):
+    everything = snapshot.deltas_since(snapshot.history_start)
+    deltas = snapshot.deltas_since(since)
+    assert deltas == {frame: delta for frame, delta in everything.items() if int(frame) >= since}
+    assert all(since <= int(frame) < snapshot.frame for frame in deltas)
+
+    for block, lo, hi in snapshot.ranges_since(since):
+        assert (block.frame[lo:hi] >= since).all()
+
+
+def test_frames_across_blocks(snapshot):
+    """A cursor in the finished block is answered from it and the block being built."""
+    frames = [int(frame) for frame in snapshot.deltas_since(10)]
+    assert min(frames) < 20 <= max(frames)
+
+
+def test_cell_deltas_add_up(snapshot):
+    """The whole world's deltas are the cells' deltas (without migrations), frame by frame."""
+    merged = {}
+    for key in snapshot.cells:
+        for frame, delta in snapshot.deltas_since(15, key).items():
+            merged[frame] = merged.get(frame, "") + delta["creatures"]
+
+    world = snapshot.deltas_since(15)
+    assert {frame: delta["creatures"] for frame, delta in world.items()} == {
+        frame: creatures for frame, creatures in merged.items() if frame in world
+    }
+
+
+def food(text):
+    return Counter(map(tuple, json.loads("[" + text.rstrip(",") + "]")))
+
+
+def test_keyframe_replays_to_live_state(snapshot):
+    """The keyframe plus every delta since it gives the creatures and food there are now."""
+    state = snapshot.keyframe.state()
+    ids = {creature["id"] for creature in state["creatures"]}
+    stock = Counter(map(tuple, state["food"]))
+    food_then = Counter(stock)
+
+    for frame, delta in sorted(snapshot.deltas_since(snapshot.keyframe.frame).items(), key=lambda item: int(item[0])):
+        for kind, body in re.findall(r"([jr])(\{.*?\}|\[\d+\]),(?=[jmreo]|$)", delta["creatures"]):
+            if kind == "j":
+                ids.add(json.loads(body)["id"])
+            else:
+                ids.discard(json.loads(body)[0])
+        stock += food(delta["new_food"])
+        stock -= food(delta["deleted_food"])
+
+    live = snapshot.live_state()
+    assert len(ids ^ {creature["id"] for creature in state["creatures"]}) == 2
+    assert ids == {creature["id"] for creature in live["creatures"]}
+    assert stock != food_then
+    assert stock == Counter(map(tuple, live["food"]))
+
+
+def test_keyframe_fallback(snapshot):
+    from simulation.api.endpoints import deltas_since
+
+    answer = deltas_since(snapshot, 3, None)
+    assert answer["since"] == 3
+    assert answer["keyframe"]["frame"] == snapshot.keyframe.frame
+    assert answer["deltas"] == snapshot.deltas_since(snapshot.keyframe.frame)
+    assert answer["sprites"] and set(answer["sprites"]) <= snapshot.used_sprite_ids()
+
+    answer = deltas_since(snapshot, 12, None)
+    assert "keyframe" not in answer
+    assert answer["deltas"] == snapshot.deltas_since(12)
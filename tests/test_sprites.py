@@ -0,0 +1,234 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from simulation.simulation import sprites as sprites_module
+from simulation.simulation.sprites import SpriteRegistry
+
+from test_checkpoint import ROOT
+
+
+def registered(*layouts):
+    registry = SpriteRegistry()
+    ids = [registry.id_for(layout)[0] for layout in layouts]
+    return registry, ids
+
+
+def version(token):
+    return int(token.rpartition(".")[2])
+
+
+def test_ids_are_content_hashes():
+    registry, (a, b) = registered("[1]", "[2]")
+    assert registry.id_for("[1]") == (a, False)
+    assert SpriteRegistry().id_for("[1]") == (a, True)
+    assert a != b
+
+
+@pytest.mark.parametrize("token", [None, "", "nonsense", "0", "1", "x.1", "abc.-1"])
+def test_unknown_tokens_reset(token):
+    registry, (a, b) = registered("[1]", "[2]")
+    token, added, evicted, reset = registry.changes_since(token)
+    assert reset
+    assert added == {a: "[1]", b: "[2]"} and evicted == []
+    assert token == registry.token(2)
+
+
+def test_tokens_of_another_run_reset():
+    registry, _ = registered("[1]")
+    other, _ = registered("[1]")
+    assert other.epoch != registry.epoch
+
+    token, *_ = other.changes_since("")
+    assert registry.changes_since(token)[3]
+
+
+def test_future_version_resets():
+    registry, _ = registered("[1]")
+    assert registry.changes_since(registry.token(5))[3]
+
+
+def test_added_since():
+    registry, (a,) = registered("[1]")
+    token, *_ = registry.changes_since("")
+
+    assert registry.changes_since(token) == (token, {}, [], False)
+
+    b, _ = registry.id_for("[2]")
+    token, added, evicted, reset = registry.changes_since(token)
+    assert (added, evicted, reset) == ({b: "[2]"}, [], False)
+    assert version(token) == 2
+
+
+def test_evicted_since():
+    registry, (a, b) = registered("[1]", "[2]")
+    registry.acquire(b)
+    token, *_ = registry.changes_since("")
+
+    # Unused since frame 0: kept for the grace period, then evicted
+    assert registry.evict(10, grace=10) == []
+    assert registry.evict(11, grace=10) == [a]
+
+    token, added, evicted, reset = registry.changes_since(token)
+    assert (added, evicted, reset) == ({}, [a], False)
+    assert version(token) == 3
+    assert registry.get(a) is None and registry.get(b) == "[2]"
+
+
+def test_evicted_then_added_again():
+    registry, (a,) = registered("[1]")
+    token, *_ = registry.changes_since("")
+
+    registry.evict(5, grace=0)
+    assert registry.id_for("[1]") == (a, True)
+
+    _, added, evicted, reset = registry.changes_since(token)
+    assert (added, evicted, reset) == ({a: "[1]"}, [], False)
+
+
+def test_release_restarts_grace():
+    registry, (a,) = registered("[1]")
+    registry.acquire(a)
+    registry.evict(100, grace=10)
+    registry.release(a)
+
+    assert registry.evict(110, grace=10) == []
+    assert registry.evict(111, grace=10) == [a]
+
+
+EYE = "body,0,0|eye,20,0,5"
+
+
+@pytest.fixture
+def clashing(monkeypatch):
+    """Layouts "[a]", "[b]", "[c]" and EYE hash to 5, "[d]" to 6; anything else as usual."""
+    content_id = sprites_module.content_id
+    hashes = {"[a]": 5, "[b]": 5, "[c]": 5, EYE: 5, "[d]": 6}
+    monkeypatch.setattr(sprites_module, "content_id", lambda layout: hashes.get(layout) or content_id(layout))
+
+
+def test_clashes_take_the_next_id_and_never_reuse_it(clashing):
+    registry, (a, b, d, c) = registered("[a]", "[b]", "[d]", "[c]")
+    assert (a, b, d, c) == (5, 6, 7, 8)
+    assert set(registry.clashed) == {5, 6, 7, 8}
+    other, _ = registry.id_for("[1]")
+    assert not registry.is_clashed(other)
+
+    # ✅ Evicted, a clashed id still only ever names the layout it was given to
+    registry.evict(5, grace=0)
+    assert len(registry) == 0
+    assert registry.id_for("[c]") == (8, True)
+    assert registry.id_for("[d]") == (7, True)
+    assert registry.id_for("[b]") == (6, True)
+    assert registry.id_for("[e]")[0] not in (5, 6, 7, 8)
+
+
+def test_ids_settled_elsewhere_are_clashed(clashing):
+    registry, (a,) = registered("[a]")
+    registry.update([(6, "[b]"), (9, "[2]")])
+
+    assert registry.is_clashed(a) and registry.is_clashed(6) and registry.is_clashed(9)
+    assert registry.id_for("[b]") == (6, False)
+
+
+def test_only_unclashed_sprites_are_cached_for_good(client, clashing, monkeypatch):
+    registry, (a, b, other) = registered("[a]", EYE, "body,0,0|mouth,30,0,10")
+    monkeypatch.setattr(sprites_module, "sprites", registry)
+
+    for path in (f"/sprite/{other}", f"/sprite/{other}.svg"):
+        response = client.get(path)
+        assert response.status_code == 200 and response.cache_control.immutable
+
+    for path in (f"/sprite/{a}", f"/sprite/{b}", f"/sprite/{b}.svg"):
+        response = client.get(path)
+        assert response.status_code == 200 and not response.cache_control.immutable
+        assert response.cache_control.no_cache
+
+        etag, _ = response.get_etag()
+        assert client.get(path, headers={"If-None-Match": f'"{etag}"'}).status_code == 304
+
+    assert client.get(f"/sprite/{b}").get_json() == {"id": b, "layout": EYE}
+    assert client.get(f"/sprite/{other}.svg").mimetype == "image/svg+xml"
+
+
+def test_old_versions_reset_once_the_log_is_trimmed(monkeypatch):
+    monkeypatch.setattr(sprites_module, "EVICTION_LOG", 4)
+    registry, ids = registered(*(f"[{i}]" for i in range(6)))
+    token, *_ = registry.changes_since("")
+
+    registry.evict(1, grace=0)
+    assert registry.floor > version(token)
+
+    latest, added, evicted, reset = registry.changes_since(token)
+    assert reset and added == {} and evicted == []
+    assert registry.changes_since(latest) == (latest, {}, [], False)
+
+
+
+# A run where creatures are born, mutate, lose organs and die, then everyone
+# dies: the registry's counts must follow the live creatures throughout, in
+# worker processes too, and every layout go exactly SPRITE_GRACE_FRAMES later.
+LIFETIME = """
+import json
+import random
+from collections import Counter
+
+import simulation.config as config
+from simulation.bench import populate, fill_food
+from simulation.simulation.creatures import Creature
+from simulation.simulation.parallel import ParallelStepper
+from simulation.simulation.world import world
+
+config.SPRITE_GRACE_FRAMES = 30
+sprites = Creature.sprites
+
+world.reseed(4)
+populate(world, 150, random.Random(4))
+fill_food(world, world.rng, 200)
+first_id = Creature.counter
+if {workers}:
+    ParallelStepper(world, {workers}).start()
+
+def live():
+    return dict(Counter(c.sprite_id for cell in world.cells() for c in cell.creatures if c.isAlive))
+
+matched = []
+for _ in range(5):
+    for _ in range(40):
+        world.step()
+    matched.append(sprites.refs == live())
+if world.stepper is not None:
+    world.stepper.stop()
+    matched.append(sprites.refs == live())
+born = Creature.counter > first_id
+
+for cell in world.cells():
+    for creature in list(cell.creatures):
+        creature.die()
+world.step()
+released = sprites.refs
+
+kept = []
+for _ in range(config.SPRITE_GRACE_FRAMES + 1):
+    kept.append(len(sprites))
+    world.step()
+
+print(json.dumps({{"matched": matched, "born": born, "released": released, "kept": kept}}))
+"""
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_counts_follow_the_living_and_evict_after_grace(workers):
+    done = subprocess.run([sys.executable, "-c", LIFETIME.format(workers=workers)],
+                          cwd=ROOT, capture_output=True, text=True, check=True)
+    result = json.loads(done.stdout.splitlines()[-1])
+
+    assert result["born"]
+    assert all(result["matched"])
+
+    # ✅ Every count reached zero, and each layout outlived it by the grace period and no more
+    assert result["released"] == {}
+    kept = result["kept"]
+    assert kept[-2] > 0 and kept[-1] == 0
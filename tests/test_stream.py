@@ -0,0 +1,128 @@
+"""
+The push stream's broadcaster (simulation/api/stream.py): each frame's
+events are encoded once however many subscribers want them, and a
+subscriber that falls behind is resynced with a keyframe, then dropped.
+Snapshots and writers are stand-ins with just what the broadcaster reads.
+"""
+import zlib
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+
+from simulation.api import stream
+from simulation.api.stream import GZIP_HEADER, StreamServer, Subscriber
+
+
+class Snapshot:
+    def __init__(self, frame):
+        self.frame = frame
+        self.cache = {}
+
+    def live_state(self, key):
+        return {"creatures": [{"id": 1, "cell": key}], "food": [[1, 2]]}
+
+    def frame_delta(self, key):
+        return {"creatures": f"m[1,{self.frame},0,0],", "new_food": "", "deleted_food": "", "migrations": ""}
+
+
+def writer():
+    aborted = []
+    return SimpleNamespace(transport=SimpleNamespace(abort=lambda: aborted.append(True)), aborted=aborted)
+
+
+def drained(subscriber):
+    items = []
+    while not subscriber.queue.empty():
+        items.append(subscriber.queue.get_nowait())
+    return items
+
+
+@pytest.fixture
+def counted(monkeypatch):
+    """Counter of encode_event and compress_event calls."""
+    calls = Counter()
+    encode, compress = stream.encode_event, stream.compress_event
+
+    def counting_encode(kind, data):
+        calls["encode", kind] += 1
+        return encode(kind, data)
+
+    def counting_compress(data):
+        calls["compress"] += 1
+        return compress(data)
+
+    monkeypatch.setattr(stream, "encode_event", counting_encode)
+    monkeypatch.setattr(stream, "compress_event", counting_compress)
+    return calls
+
+
+def test_each_event_is_encoded_once_for_every_subscriber(counted):
+    server = StreamServer("localhost", 0, backlog=8)
+    subscribers = [Subscriber(writer(), key, gzipped, 8)
+                   for key in (None, (0, 0)) for gzipped in (False, True) for _ in range(25)]
+    server.subscribers.update(subscribers)
+
+    for frame in range(1, 5):
+        counted.clear()
+        server.broadcast(Snapshot(frame))
+
+        # ✅ One JSON encoding per cell, one compression per cell among the gzipped
+        kind = "keyframe" if frame == 1 else "delta"
+        assert counted == {("encode", kind): 2, "compress": 2}
+
+    # The very same bytes for every subscriber of a cell and encoding
+    first = {}
+    for subscriber in subscribers:
+        items = drained(subscriber)
+        assert [keyframe for _, keyframe in items] == [True, False, False, False]
+
+        expected = first.setdefault((subscriber.key, subscriber.gzipped), items)
+        assert all(data is other for (data, _), (other, _) in zip(items, expected))
+
+
+def test_gzipped_events_join_into_one_stream():
+    events = [stream.keyframe_event(Snapshot(1), None)] + [stream.delta_event(Snapshot(f), None) for f in range(2, 6)]
+
+    body = GZIP_HEADER + b"".join(stream.compress_event(event) for event in events)
+    inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    assert inflater.decompress(body) == b"".join(events)
+
+
+def test_a_gap_in_frames_sends_a_keyframe():
+    server = StreamServer("localhost", 0, backlog=8)
+    subscriber = Subscriber(writer(), None, False, 8)
+    server.subscribers.add(subscriber)
+
+    for frame in (1, 2, 4, 5):
+        server.broadcast(Snapshot(frame))
+
+    assert [keyframe for _, keyframe in drained(subscriber)] == [True, False, True, False]
+
+
+def test_a_slow_subscriber_is_resynced_then_dropped():
+    server = StreamServer("localhost", 0, backlog=3)
+    fast = Subscriber(writer(), None, False, 3)
+    slow = Subscriber(writer(), None, False, 3)
+    server.subscribers.update([fast, slow])
+
+    def frame(n):
+        server.broadcast(Snapshot(n))
+        drained(fast)
+        fast.resyncing = False  # its writer keeps up
+
+    for n in range(1, 4):
+        frame(n)
+    slow.resyncing = False  # the first keyframe was written
+
+    # ✅ A full backlog is thrown away for a keyframe of the latest frame
+    frame(4)
+    assert [(keyframe, b'"frame":4' in data) for data, keyframe in list(slow.queue._queue)] == [(True, True)]
+    assert slow in server.subscribers
+
+    # Still stuck on that keyframe when the backlog fills again: dropped
+    for n in range(5, 8):
+        frame(n)
+    assert slow not in server.subscribers and server.dropped == 1
+    assert slow.writer.aborted and list(slow.queue._queue) == [None]
+    assert fast in server.subscribers and not fast.writer.aborted
@@ -0,0 +1,78 @@
+"""
+The per-frame organ transform cache (Creature.refresh_transform): cached
+world positions must always equal rotating the layout afresh.
+"""
+import copy
+import math
+
+import pytest
+
+from simulation.simulation.cell import Cell
+from simulation.simulation.creatures import Creature
+
+LAYOUT = [
+    {"type": "flipper", "position": [-20, 5], "size": 8},
+    {"type": "mouth", "position": [20, 0], "size": 10},
+    {"type": "eye", "position": [0, 15], "size": 5},
+]
+
+
+def fresh(creature, local):
+    """local (relative to the centre of mass) rotated and moved into the world, without the cache."""
+    px, py = creature.position.tolist()
+    c, s = math.cos(creature.direction), math.sin(creature.direction)
+    return [px + local[0] * c - local[1] * s, py + local[0] * s + local[1] * c]
+
+
+def assert_cache_is_current(creature):
+    assert creature.get_body_position() == pytest.approx(fresh(creature, creature.body_pos))
+    for organ in creature.organs:
+        if organ.isAlive:
+            assert organ.get_absolute_position() == pytest.approx(fresh(creature, organ.position))
+
+
+@pytest.fixture
+def placed():
+    cell = Cell(2, 2)
+    # Creature recentres the organ positions it is given, in place
+    creature = Creature(position=[120, 130], organs=copy.deepcopy(LAYOUT), name="transform")
+    assert creature.isAlive
+    cell.add(creature, log_spawn=False)
+    yield cell, creature
+    creature.physics.release(creature.slot)
+    Creature.sprites.release(creature.sprite_id)
+
+
+def test_setters_invalidate_the_cache(placed):
+    _, creature = placed
+    assert_cache_is_current(creature)
+
+    creature.direction = 1.2
+    assert_cache_is_current(creature)
+
+    creature.position = [140, 110]
+    assert_cache_is_current(creature)
+
+
+def test_integrate_refreshes_every_organ(placed):
+    cell, creature = placed
+    creature.velocity = [2.5, -1.5]
+    creature.angular_velocity = 0.3
+
+    for _ in range(4):
+        cell.integrate([creature])
+        assert creature.transform_valid
+        assert_cache_is_current(creature)
+
+
+def test_organ_death_reshapes_the_cache(placed):
+    _, creature = placed
+    creature.direction = 0.7
+    assert_cache_is_current(creature)
+    layout = [list(organ.position) for organ in creature.organs]
+
+    # ✅ The eye's death recentres the layout on the new centre of mass
+    creature.organs[2].die()
+    assert not creature.organs[2].isAlive
+    assert [list(organ.position) for organ in creature.organs[:2]] != layout[:2]
+    assert_cache_is_current(creature)
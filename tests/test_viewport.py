@@ -0,0 +1,174 @@
+"""
+?rect= viewports (simulation/simulation/viewport.py): clipping state and
+deltas to the grown rectangle, on made-up records and on the run in
+conftest.py, replayed the way a client applies them.
+"""
+import json
+import math
+import re
+
+import numpy as np
+import pytest
+
+from simulation.simulation import deltas
+from simulation.simulation.snapshot import CreatureColumns
+from simulation.simulation.viewport import Viewport, wrapped_spans
+
+RECTS = ["0,0,60,60", "100,100,180,140", "450,450,520,530", "200,0,260,500"]
+TOKENS = re.compile(r"([mreo])\[([^\]]*)\],|j(\{.*?\}),(?=[mjreo]|$)")
+
+
+def test_wrapped_spans():
+    assert wrapped_spans(10, 20, 500) == [(10, 20)]
+    assert wrapped_spans(-10, 20, 500) == [(490, 500), (0, 20)]
+    assert wrapped_spans(490, 520, 500) == [(490, 500), (0, 20)]
+    assert wrapped_spans(-600, 600, 500) == [(0, 500)]
+
+
+def test_cells_and_wrap():
+    viewport = Viewport(-10, 95, 20, 105, margin=0, world_size=500, grid_cells=10)
+    assert viewport.keys == [(0, 1), (9, 1), (0, 2), (9, 2)]
+    assert viewport.contains([495, 5, 25, 495], [100, 100, 100, 110]).tolist() == [True, True, False, False]
+
+
+@pytest.mark.parametrize("text", ["1,2,3", "a,b,c,d", "5,0,1,10", "0,0,nan,1"])
+def test_bad_rects(text):
+    with pytest.raises(ValueError, match="rect"):
+        Viewport.parse(text)
+
+
+def test_holds_matches_contains():
+    viewport = Viewport.parse("480,10,530,90", margin=15)
+    rng = np.random.default_rng(1)
+    xs, ys = rng.uniform(-600, 600, 500), rng.uniform(-600, 600, 500)
+    assert [viewport.holds(x, y) for x, y in zip(xs.tolist(), ys.tolist())] == viewport.contains(xs, ys).tolist()
+
+
+def creature(id, x, y):
+    return {"id": id, "name": f"c{id}", "position": [x, y], "direction": 0.0, "sprite_id": 5,
+            "energy": 100, "isAlive": True, "parent_ids": [], "creator": None}
+
+
+def records(block, lo=0):
+    return [(int(f), int(k), int(i)) for f, k, i in zip(block.frame[lo:len(block)], block.kind[lo:len(block)], block.id[lo:len(block)])]
+
+
+def test_creatures_crossing_the_edge():
+    viewport = Viewport(0, 0, 100, 100)
+    block = deltas.DeltaBlock(8)
+    block.append(1, deltas.MOVE, 1, a=150)  # 1 leaves
+    block.append(1, deltas.MOVE, 2, a=50, c=1.5)  # 2 comes in
+    block.append(1, deltas.ENERGY, 1, a=3)
+    block.append(1, deltas.ENERGY, 2, a=4)
+    block.append(2, deltas.ORGAN_DEATH, 2, a=9)
+    block.append(2, deltas.MOVE, 3, b=20)  # 3 stays out
+    block.append(2, deltas.REMOVE, 3)
+    block.append(3, deltas.MOVE, 2, b=60)
+    block.append(3, deltas.FOOD_ADD, a=10, b=10)
+    block.append(3, deltas.FOOD_ADD, a=110, b=10)
+    block.append(3, deltas.FOOD_BATCH, 2, payload=np.array([[5.0, 5.0], [200.0, 5.0]]))
+
+    (view, lo, hi, keep, inside), = viewport.select([
+        ([creature(1, 50, 50), creature(2, 150, 50), creature(3, 300, 300)], [(block, 0, len(block))])
+    ])
+    assert (lo, hi, keep.all(), inside) == (0, len(view), True, None)
+    assert records(view) == [
+        (1, deltas.MIGRATE_OUT, 1), (1, deltas.MIGRATE_IN, 2), (1, deltas.ENERGY, 2),
+        (2, deltas.ORGAN_DEATH, 2), (3, deltas.MOVE, 2), (3, deltas.FOOD_ADD, 0), (3, deltas.FOOD_BATCH, 1)
+    ]
+
+    spawn = view.payloads[view.ref[1]]
+    assert spawn == {"id": 2, "name": "c2", "position": [50, 50], "direction": 1.5, "sprite_id": 5,
+                     "parent_ids": [], "creator": None}
+    assert view.payloads[view.ref[6]].tolist() == [[5.0, 5.0]]
+
+    # From frame 2 on, the replay still knows where everything went before
+    (view, *_), = viewport.select([
+        ([creature(1, 50, 50), creature(2, 150, 50), creature(3, 300, 300)], [(block, block.first_at(2), len(block))])
+    ])
+    assert records(view)[:2] == [(2, deltas.ORGAN_DEATH, 2), (3, deltas.MOVE, 2)]
+
+
+def test_migrations_between_viewed_cells():
+    """A creature crossing from one overlapped cell to another, inside the rect, is not sent at all."""
+    viewport = Viewport(0, 0, 100, 100)
+    left, right = deltas.DeltaBlock(2), deltas.DeltaBlock(2)
+    for id, x in ((1, 60), (2, 150)):
+        left.append(4, deltas.MIGRATE_OUT, id)
+        right.append(4, deltas.MIGRATE_IN, id, payload={**creature(id, x, 10), "energy": None})
+
+    (a, *_), (b, *_) = viewport.select([
+        ([creature(1, 40, 10), creature(2, 90, 10)], [(left, 0, len(left))]),
+        ([], [(right, 0, len(right))])
+    ])
+    assert records(a) == [(4, deltas.MIGRATE_OUT, 2)]  # 2 left the rect as it changed cells
+    assert records(b) == []
+
+
+def play(creatures, frames):
+    """{id: [x, y]} after a client applies {frame: delta} to the creature rows it has."""
+    have = {c["id"]: list(c["position"]) for c in creatures}
+    for frame in sorted(frames, key=int):
+        for kind, body, spawn in TOKENS.findall(frames[frame]["creatures"]):
+            if spawn:
+                payload = json.loads(spawn)
+                have[payload["id"]] = list(payload["position"])
+            elif kind == "r":
+                del have[int(body)]
+            else:
+                id, *parts = body.split(",")
+                assert int(id) in have, f"frame {frame}: {kind}[{body}] for a creature the client was not sent"
+                for part in parts if kind == "m" else ():
+                    if part[0] in "xy":
+                        have[int(id)]["xy".index(part[0])] = float(part[1:])
+    return have
+
+
+def near_edge(viewport, x, y):
+    """Within a pixel of the grown rectangle's edge: state and deltas may disagree there (see viewport.py)."""
+    return any(viewport.holds(x + dx, y + dy) != viewport.holds(x, y) for dx in (-1, 1) for dy in (-1, 1))
+
+
+@pytest.mark.parametrize("rect", RECTS)
+def test_state_is_clipped(snapshot, rect):
+    viewport = Viewport.parse(rect, 20)
+    creatures, food = snapshot.view(viewport)
+    assert viewport.contains(creatures.xs, creatures.ys).all()
+    assert viewport.contains(food[:, 0], food[:, 1]).all()
+
+    everything, _ = snapshot.columns()
+    assert set(creatures.ids.tolist()) == set(everything.ids[viewport.contains(everything.xs, everything.ys)].tolist())
+
+
+@pytest.mark.parametrize("rect", RECTS)
+@pytest.mark.parametrize("start", ["keyframe", "block"])
+def test_deltas_bring_a_client_to_the_state(snapshot, rect, start):
+    viewport = Viewport.parse(rect, 20)
+    if start == "keyframe":
+        since, creatures = snapshot.keyframe.frame, snapshot.keyframe.view(viewport)[0].rows()
+    else:
+        since = snapshot.history_start
+        columns = CreatureColumns.concat(CreatureColumns.from_dicts(snapshot.block.creatures(key)) for key in viewport.keys)
+        creatures = columns.take(viewport.contains(columns.xs, columns.ys)).rows()
+
+    have = play(creatures, snapshot.view_deltas(viewport, since))
+
+    live, _ = snapshot.view(viewport)
+    expected = {id: (x, y) for id, x, y in zip(live.ids.tolist(), live.xs.tolist(), live.ys.tolist())}
+    assert {id for id, (x, y) in have.items() if not near_edge(viewport, x, y)} == \
+        {id for id, (x, y) in expected.items() if not near_edge(viewport, x, y)}
+    for id in have.keys() & expected.keys():
+        assert math.dist(have[id], expected[id]) <= 1
+
+
+def test_rect_parameter(client):
+    viewport = Viewport.parse("100,100,250,250", 50)
+    state = client.get("/getstate?rect=100,100,250,250").get_json()
+    assert state["creatures"] and len(state["creatures"]) < len(client.get("/getstate").get_json()["creatures"])
+    assert all(viewport.holds(*c["position"]) or near_edge(viewport, *c["position"]) for c in state["creatures"])
+
+    for since in ("", "&since=12", "&since=3"):
+        for accept in ("application/json", "application/octet-stream"):
+            assert client.get(f"/getdeltas?rect=100,100,250,250{since}", headers={"Accept": accept}).status_code == 200
+    assert client.get("/getstate?rect=1,2,3").status_code == 400
+    assert client.get("/getstate?rect=0,0,10,10&x=1&y=1").status_code == 400
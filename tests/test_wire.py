@@ -0,0 +1,289 @@
+"""
+Round trips through the binary wire format (simulation/simulation/wire.py),
+read back with a small reader written from the format in its docstring.
+"""
+import math
+
+import numpy as np
+import pytest
+
+from simulation.simulation import deltas, wire
+from simulation.simulation.snapshot import CreatureColumns
+
+
+class Reader:
+    def __init__(self, data):
+        self.data = data
+        self.i = 0
+
+    def u8(self):
+        value = self.data[self.i]
+        self.i += 1
+        return value
+
+    def varint(self):
+        value = shift = 0
+        while True:
+            byte = self.u8()
+            value |= (byte & 0x7F) << shift
+            shift += 7
+            if byte < 0x80:
+                return value
+
+    def varints(self, n):
+        return [self.varint() for _ in range(n)]
+
+    def zigzags(self, n):
+        return [(v >> 1) ^ -(v & 1) for v in self.varints(n)]
+
+    def array(self, n, dtype):
+        values = np.frombuffer(self.data, dtype=dtype, count=n, offset=self.i)
+        self.i += values.nbytes
+        return values
+
+    def positions(self, n):
+        return self.array(n, "<i2") / wire.POSITION_SCALE
+
+    def directions(self, n):
+        return self.array(n, "<u2") / wire.DIRECTION_SCALE
+
+    def string(self):
+        n = self.varint()
+        value = self.data[self.i:self.i + n].decode()
+        self.i += n
+        return value
+
+    def done(self):
+        return self.i == len(self.data)
+
+
+def read_message(data):
+    """(frame, [(tag, body)]) of a whole message."""
+    assert data[:3] == wire.MAGIC
+    reader = Reader(data)
+    reader.i = 3
+    assert reader.u8() == wire.VERSION
+    frame = reader.varint()
+
+    sections = []
+    while not reader.done():
+        tag = reader.u8()
+        length = reader.varint()
+        sections.append((tag, data[reader.i:reader.i + length]))
+        reader.i += length
+
+    return frame, sections
+
+
+def read_section(data):
+    frame, sections = read_message(wire.message(0, data))
+    assert len(sections) == 1
+    return sections[0]
+
+
+def read_spawn(reader):
+    x, y = reader.positions(2)
+    return {
+        "position": [x, y],
+        "direction": reader.directions(1)[0],
+        "sprite_id": reader.varint(),
+        "name": reader.string(),
+        "parent_ids": reader.varints(reader.varint()),
+        "creator": reader.string()
+    }
+
+
+def read_deltas(body):
+    """The records of a DELTAS body as dicts, in order."""
+    reader = Reader(body)
+    base = reader.varint()
+    n = reader.varint()
+    kinds = reader.array(n, np.uint8).tolist()
+    frames = [base + offset for offset in reader.varints(n)]
+    ids = reader.varints(n)
+    records = [{"frame": f, "kind": k, "id": i} for f, k, i in zip(frames, kinds, ids)]
+
+    moves = [r for r in records if r["kind"] == deltas.MOVE]
+    flags = reader.array(len(moves), np.uint8).tolist()
+    for flag, field, read in ((wire.MOVE_X, "x", reader.positions), (wire.MOVE_Y, "y", reader.positions),
+                              (wire.MOVE_D, "d", reader.directions)):
+        flagged = [r for r, f in zip(moves, flags) if f & flag]
+        for record, value in zip(flagged, read(len(flagged)).tolist()):
+            record[field] = value
+
+    for kind in (deltas.FOOD_ADD, deltas.FOOD_REMOVE):
+        food = [r for r in records if r["kind"] == kind]
+        xs, ys = reader.positions(len(food)), reader.positions(len(food))
+        for record, x, y in zip(food, xs.tolist(), ys.tolist()):
+            record["position"] = [x, y]
+
+    energy = [r for r in records if r["kind"] == deltas.ENERGY]
+    for record, value in zip(energy, reader.zigzags(len(energy))):
+        record["energy"] = value / wire.ENERGY_SCALE
+
+    organs = [r for r in records if r["kind"] == deltas.ORGAN_DEATH]
+    for record, value in zip(organs, reader.varints(len(organs))):
+        record["sprite_id"] = value
+
+    for record in records:
+        if record["kind"] in (deltas.SPAWN, deltas.MIGRATE_IN):
+            record["spawn"] = read_spawn(reader)
+
+    assert reader.done()
+    return base, records
+
+
+@pytest.mark.parametrize("n", [0, 1, 127, 128, 300, 16383, 16384, 2 ** 32, 2 ** 48 - 1])
+def test_varint_round_trip(n):
+    reader = Reader(wire.varint(n))
+    assert reader.varint() == n
+    assert reader.done()
+
+
+def test_varints_match_varint():
+    values = [0, 1, 127, 128, 300, 2 ** 21, 2 ** 48 - 1]
+    assert wire.varints(values) == b"".join(wire.varint(v) for v in values)
+    assert wire.varints([]) == b""
+
+
+def test_zigzag():
+    assert wire.zigzag([0, -1, 1, -2, 2]).tolist() == [0, 1, 2, 3, 4]
+    values = [0, -1, 1, -123456, 123456, -(2 ** 40)]
+    assert Reader(wire.varints(wire.zigzag(values))).zigzags(len(values)) == values
+
+
+def test_positions_round_trip_and_wrap():
+    values = [0, 0.5, 123.4, 499.99, -1, 501]
+    decoded = Reader(wire.positions(values)).positions(len(values))
+    expected = np.asarray(values) % 500
+    assert np.all(np.abs(decoded - expected) <= 0.5 / wire.POSITION_SCALE)
+
+
+def test_directions_round_trip():
+    values = [0, 1, math.pi, -1, 7]
+    decoded = Reader(wire.directions(values)).directions(len(values))
+    error = (decoded - np.asarray(values)) % (2 * math.pi)
+    assert np.all(np.minimum(error, 2 * math.pi - error) <= 1 / wire.DIRECTION_SCALE)
+
+
+def test_message_header():
+    frame, sections = read_message(wire.message(1234, wire.since_section(1200)))
+    assert frame == 1234
+    assert [tag for tag, _ in sections] == [wire.SINCE]
+    assert Reader(sections[0][1]).varint() == 1200
+
+
+def test_state_round_trip():
+    creatures = CreatureColumns(
+        np.array([1, 300, 2 ** 40]),
+        ("a", "", "ünï"),
+        np.array([10.25, 0, 499.5]),
+        np.array([20.5, 250, 1]),
+        np.array([0, 1.5, -1]),
+        np.array([100, -3.25, 0.01]),
+        np.array([7, 2 ** 47, 0])
+    )
+    food = np.array([[1.0, 2.0], [498, 3]])
+
+    tag, body = read_section(wire.state_section(42, creatures, food))
+    assert tag == wire.STATE
+
+    reader = Reader(body)
+    assert reader.varint() == 42
+    n = reader.varint()
+    assert n == 3
+    assert reader.varints(n) == creatures.ids.tolist()
+    assert reader.varints(n) == creatures.sprite_ids.tolist()
+    assert np.allclose(reader.positions(n), creatures.xs)
+    assert np.allclose(reader.positions(n), creatures.ys)
+    assert np.allclose(reader.directions(n), creatures.directions % (2 * math.pi), atol=1e-4)
+    assert [e / wire.ENERGY_SCALE for e in reader.zigzags(n)] == [100, -3.25, 0.01]
+    assert tuple(reader.string() for _ in range(n)) == creatures.names
+    m = reader.varint()
+    assert np.allclose(reader.positions(m), food[:, 0])
+    assert np.allclose(reader.positions(m), food[:, 1])
+    assert reader.done()
+
+
+def spawn_payload(x, y, name):
+    return {"id": 9, "position": [x, y], "direction": 1.0, "sprite_id": 77, "name": name,
+            "parent_ids": [3, 4], "creator": "tester"}
+
+
+@pytest.fixture
+def block():
+    block = deltas.DeltaBlock(4)
+    block.append(100, deltas.SPAWN, 9, payload=spawn_payload(10, 20, "kid"))
+    block.append(100, deltas.MOVE, 5, a=12.5, c=0.5)
+    block.append(101, deltas.FOOD_ADD, a=3, b=4)
+    block.append(101, deltas.FOOD_BATCH, 2, payload=np.array([[30.0, 40.0], [300.0, 400.0]]))
+    block.append(102, deltas.FOOD_REMOVE, a=3, b=4)
+    block.append(102, deltas.ENERGY, 5, a=-12.34)
+    block.append(102, deltas.ORGAN_DEATH, 5, a=2 ** 40)
+    block.append(103, deltas.MIGRATE_OUT, 6)
+    block.append(103, deltas.MIGRATE_IN, 8, payload=spawn_payload(200, 210, "traveller"))
+    block.append(103, deltas.REMOVE, 5)
+    return block
+
+
+def test_deltas_round_trip(block):
+    tag, body = read_section(wire.deltas_section([(block, 0, len(block))], 100))
+    assert tag == wire.DELTAS
+
+    base, records = read_deltas(body)
+    assert base == 100
+    assert [(r["frame"], r["kind"]) for r in records] == [
+        (100, deltas.SPAWN), (100, deltas.MOVE),
+        (101, deltas.FOOD_ADD), (101, deltas.FOOD_ADD), (101, deltas.FOOD_ADD),
+        (102, deltas.FOOD_REMOVE), (102, deltas.ENERGY), (102, deltas.ORGAN_DEATH),
+        (103, deltas.MIGRATE_OUT), (103, deltas.MIGRATE_IN), (103, deltas.REMOVE)
+    ]
+
+    spawn, move, food, batch_1, batch_2, eaten, energy, organ, out, into, removed = records
+    assert spawn["spawn"]["name"] == "kid" and spawn["spawn"]["parent_ids"] == [3, 4]
+    assert spawn["spawn"]["position"] == [10, 20] and spawn["spawn"]["sprite_id"] == 77
+    assert move["id"] == 5 and move["x"] == 12.5 and "y" not in move and abs(move["d"] - 0.5) < 1e-4
+    assert [food["position"], batch_1["position"], batch_2["position"]] == [[3, 4], [30, 40], [300, 400]]
+    assert eaten["position"] == [3, 4]
+    assert energy["id"] == 5 and energy["energy"] == -12.34
+    assert organ["sprite_id"] == 2 ** 40
+    assert (out["id"], into["id"], removed["id"]) == (6, 8, 5)
+    assert into["spawn"]["name"] == "traveller" and into["spawn"]["position"] == [200, 210]
+
+
+def test_deltas_without_migrations(block):
+    _, body = read_section(wire.deltas_section([(block, 0, len(block))], 100, migrations=False))
+    _, records = read_deltas(body)
+    assert deltas.MIGRATE_OUT not in [r["kind"] for r in records]
+    assert deltas.MIGRATE_IN not in [r["kind"] for r in records]
+    assert len(records) == 9
+
+
+def test_deltas_selected_records_and_food(block):
+    """A Viewport.select range: keep per record, inside filtering batch positions."""
+    keep = np.zeros(len(block), dtype=bool)
+    keep[[2, 3, 9]] = True
+    inside = lambda xs, ys: xs < 100
+
+    _, body = read_section(wire.deltas_section([(block, 0, len(block), keep, inside)], 90))
+    base, records = read_deltas(body)
+    assert base == 90
+    assert [(r["kind"], r.get("position")) for r in records] == [
+        (deltas.FOOD_ADD, [3, 4]), (deltas.FOOD_ADD, [30, 40]), (deltas.REMOVE, None)
+    ]
+
+
+def test_empty_deltas():
+    _, body = read_section(wire.deltas_section([], 5))
+    assert read_deltas(body) == (5, [])
+
+
+def test_sprites_round_trip():
+    layouts = {1: '[["mouth",1,2,3]]', 2 ** 47: "[]"}
+    tag, body = read_section(wire.sprites_section(layouts))
+    assert tag == wire.SPRITES
+
+    reader = Reader(body)
+    n = reader.varint()
+    assert {reader.varint(): reader.string() for _ in range(n)} == layouts
+    assert reader.done()